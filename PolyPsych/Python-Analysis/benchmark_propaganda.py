@@ -0,0 +1,243 @@
+"""
+Throughput benchmark for the propaganda pipeline on synthetic corpora.
+
+Generates reproducible responses from the coding-scheme vocabularies and times each
+pipeline stage (preprocessing, keyword coding, step counting, DataFrame construction).
+NLTK resources are replaced by a local stopword list and a suffix-stripping lemmatizer,
+so no corpus downloads are needed.
+
+Usage:
+    python benchmark_propaganda.py --sizes 10000 100000 1000000 --keyword_density 0.15
+    python benchmark_propaganda.py --output bench.json --baseline previous_bench.json
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+import pandas as pd
+
+from propaganda import CodingSchemeLoader, TextPreprocessor, ResponseCoder, DataProcessor
+
+SCHEME_DIR = Path(__file__).resolve().parent.parent / 'json'
+
+STUB_STOP_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'to', 'in', 'on', 'at', 'by', 'for',
+    'with', 'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'it', 'its', 'that',
+    'this', 'these', 'those', 'i', 'you', 'he', 'she', 'we', 'they', 'not', 'no', 'so',
+}
+
+FILLER_WORDS = [
+    'news', 'story', 'article', 'people', 'information', 'social', 'media', 'online', 'content',
+    'claim', 'readers', 'headline', 'report', 'political', 'public', 'opinion', 'share', 'post',
+    'viral', 'network', 'platform', 'truth', 'facts', 'election', 'campaign', 'audience',
+]
+
+NOISE_TOKENS = ['2024', '100%', 'U.S.', '#trending', '@user', 'http://example.com/a?b=1', 'www.example.org']
+
+SEPARATORS = [' ', ' ', ' ', ' ', ', ', '. ', '; ']
+
+class SuffixLemmatizer:
+    """
+    Stand-in for WordNetLemmatizer that strips a plural 's' suffix.
+    """
+    @staticmethod
+    def lemmatize(token: str) -> str:
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            return token[:-1]
+        return token
+
+class SyntheticCorpus:
+    """
+    Reproducible stream of synthetic free-text responses.
+    Each chunk is seeded from (seed, chunk index), so any chunk can be regenerated on its own.
+    """
+    def __init__(self, keywords: List[str], size: int, keyword_density: float = 0.1,
+                 mean_length: int = 20, seed: int = 0):
+        self.keywords = keywords
+        self.size = size
+        self.keyword_density = keyword_density
+        self.mean_length = mean_length
+        self.seed = seed
+        self.filler = FILLER_WORDS + sorted(STUB_STOP_WORDS)
+
+    def generate_response(self, rng: random.Random) -> str:
+        length = max(3, int(rng.gauss(self.mean_length, self.mean_length / 3)))
+        parts = []
+        for _ in range(length):
+            roll = rng.random()
+            if roll < self.keyword_density:
+                word = rng.choice(self.keywords)
+            elif roll < self.keyword_density + 0.02:
+                word = rng.choice(NOISE_TOKENS)
+            else:
+                word = rng.choice(self.filler)
+            parts.append(word.capitalize() if rng.random() < 0.05 else word)
+            parts.append(rng.choice(SEPARATORS))
+        parts[-1] = '.'
+        return ''.join(parts)
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[str]]:
+        for index, start in enumerate(range(0, self.size, chunk_size)):
+            rng = random.Random(f"{self.seed}:{index}")
+            count = min(chunk_size, self.size - start)
+            yield [self.generate_response(rng) for _ in range(count)]
+
+def build_pipeline(definition_scheme_path: Path, verification_scheme_path: Path):
+    loader = CodingSchemeLoader(str(definition_scheme_path), str(verification_scheme_path))
+    definition_scheme = loader.get_definition_scheme()
+    verification_scheme = loader.get_verification_scheme()
+    preprocessor = TextPreprocessor(stop_words=STUB_STOP_WORDS, lemmatizer=SuffixLemmatizer())
+    processor = DataProcessor(preprocessor, ResponseCoder(definition_scheme), ResponseCoder(verification_scheme))
+    keywords = sorted({keyword for scheme in (definition_scheme, verification_scheme)
+                       for words in scheme.values() for keyword in words})
+    return processor, keywords
+
+def pipeline_stages(processor: DataProcessor) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """
+    Stage name -> callable over a chunk state dict. Stages run in order and may read
+    the outputs of earlier stages from the state.
+    """
+    def preprocess(state):
+        state['cleaned'] = processor.preprocessor.preprocess_batch(state['responses'])
+
+    def code_definitions(state):
+        state['definition_codes'] = [processor.definition_coder.code_response(t) for t in state['cleaned']]
+
+    def code_verifications(state):
+        state['verification_codes'] = [processor.verification_coder.code_response(t) for t in state['cleaned']]
+
+    def count_steps(state):
+        state['steps'] = [processor.count_steps(r) for r in state['responses']]
+
+    def build_dataframe(state):
+        rows = [{'Response': r, 'Codes': c, 'Number of Steps': n}
+                for r, c, n in zip(state['responses'], state['verification_codes'], state['steps'])]
+        state['df'] = pd.DataFrame(rows)
+
+    return {
+        'preprocess': preprocess,
+        'code_definitions': code_definitions,
+        'code_verifications': code_verifications,
+        'count_steps': count_steps,
+        'build_dataframe': build_dataframe,
+    }
+
+def run_benchmark(corpus: SyntheticCorpus, processor: DataProcessor, chunk_size: int,
+                  measure_memory: bool = True) -> Dict[str, Dict[str, float]]:
+    """
+    Times every stage over the whole corpus, one chunk at a time.
+    Peak memory is traced separately on the first chunk, since tracemalloc
+    would otherwise distort the throughput numbers.
+    """
+    stages = pipeline_stages(processor)
+    elapsed = {name: 0.0 for name in stages}
+    processed = 0
+    first_chunk = None
+    for chunk in corpus.iter_chunks(chunk_size):
+        if first_chunk is None:
+            first_chunk = chunk
+        state = {'responses': chunk}
+        for name, stage in stages.items():
+            start = time.perf_counter()
+            stage(state)
+            elapsed[name] += time.perf_counter() - start
+        processed += len(chunk)
+
+    peaks = {}
+    if measure_memory and first_chunk is not None:
+        state = {'responses': first_chunk}
+        for name, stage in stages.items():
+            tracemalloc.start()
+            stage(state)
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    results = {}
+    for name, seconds in elapsed.items():
+        results[name] = {
+            'responses': processed,
+            'seconds': round(seconds, 6),
+            'responses_per_sec': round(processed / seconds, 1) if seconds else float('inf'),
+        }
+        if name in peaks:
+            results[name]['peak_mib'] = round(peaks[name] / 2 ** 20, 3)
+    return results
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Lists stages whose throughput dropped by more than ``tolerance`` relative to the baseline.
+    """
+    regressions = []
+    for size, stages in results['runs'].items():
+        for name, stats in stages.items():
+            previous = baseline.get('runs', {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            floor = previous['responses_per_sec'] * (1 - tolerance)
+            if stats['responses_per_sec'] < floor:
+                regressions.append(
+                    f"{name} @ {size}: {stats['responses_per_sec']:.0f}/s vs baseline "
+                    f"{previous['responses_per_sec']:.0f}/s")
+    return regressions
+
+def print_report(size: int, stages: Dict[str, Dict[str, float]]):
+    print(f"\n{size:,} responses")
+    print(f"{'stage':<20}{'responses/sec':>16}{'seconds':>12}{'peak MiB':>12}")
+    for name, stats in stages.items():
+        peak = stats.get('peak_mib')
+        print(f"{name:<20}{stats['responses_per_sec']:>16,.0f}{stats['seconds']:>12.3f}"
+              f"{(f'{peak:.2f}' if peak is not None else '-'):>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the propaganda pipeline on synthetic corpora.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000], help='Corpus sizes to benchmark')
+    parser.add_argument('--keyword_density', type=float, default=0.1, help='Probability that a word is a coding-scheme keyword')
+    parser.add_argument('--mean_length', type=int, default=20, help='Mean response length in words')
+    parser.add_argument('--chunk_size', type=int, default=10_000, help='Responses generated and processed per chunk')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed')
+    parser.add_argument('--definition_scheme', type=str, default=str(SCHEME_DIR / 'definition_coding_scheme.json'), help='Path to definition coding scheme JSON file')
+    parser.add_argument('--verification_scheme', type=str, default=str(SCHEME_DIR / 'verification_coding_scheme.json'), help='Path to verification coding scheme JSON file')
+    parser.add_argument('--no_memory', action='store_true', help='Skip the tracemalloc peak memory pass')
+    parser.add_argument('--output', type=str, help='Write results as JSON to this path')
+    parser.add_argument('--baseline', type=str, help='Compare against a previous JSON result and fail on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed relative throughput drop before failing')
+    args = parser.parse_args()
+
+    processor, keywords = build_pipeline(Path(args.definition_scheme), Path(args.verification_scheme))
+    results = {
+        'config': {
+            'keyword_density': args.keyword_density,
+            'mean_length': args.mean_length,
+            'chunk_size': args.chunk_size,
+            'seed': args.seed,
+        },
+        'runs': {},
+    }
+    for size in args.sizes:
+        corpus = SyntheticCorpus(keywords, size, args.keyword_density, args.mean_length, args.seed)
+        stages = run_benchmark(corpus, processor, args.chunk_size, measure_memory=not args.no_memory)
+        results['runs'][str(size)] = stages
+        print_report(size, stages)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\nThroughput regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
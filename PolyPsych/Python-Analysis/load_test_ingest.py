@@ -0,0 +1,231 @@
+"""
+Load test for the survey ingestion service on localhost.
+
+Opens ``--concurrency`` keep-alive connections and has each POST synthetic responses back to back
+for ``--duration`` seconds. Answers are generated from the survey definition as loaded by the
+service's own survey model, so they pass its validation, and a share of the responses
+(``--invalid_rate``) is made invalid on purpose. Reports sustained accepted responses/sec,
+request latency percentiles, and HTTP status counts, then cross-checks the service's GET /stats.
+Requests finished during the first ``--warmup`` seconds are left out of the numbers.
+
+Usage:
+    python survey-questions.py --serve --port 8765 &
+    python load_test_ingest.py --port 8765 --concurrency 64 --duration 10
+    python load_test_ingest.py --spawn --batch 10 --output ingest.json
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+import importlib.util
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+SURVEY_DEFINITION = HERE.parent / 'json' / 'survey_definition.json'
+
+TEXT_ANSWERS = [
+    "I want to help my community", "To support candidates who share my values",
+    "Because turnout is too low", "It depends on the source", "Not sure", "No comment",
+]
+
+def load_survey_module() -> Any:
+    """survey-questions.py (its file name is not importable), for the survey model the service uses"""
+    module = sys.modules.get('survey_questions')
+    if module is None:
+        spec = importlib.util.spec_from_file_location('survey_questions', HERE / 'survey-questions.py')
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['survey_questions'] = module
+        spec.loader.exec_module(module)
+    return module
+
+class ResponseGenerator:
+    """Random answers to every question of a SurveyCollector that pass its ValidationPlan, with
+    invalid ones mixed in. Likert and scale answers are drawn from Question.option_codes(), the
+    codes the plan's ranges come from."""
+    def __init__(self, survey: Any, invalid_rate: float = 0.0, seed: int = 0):
+        self.questions = [question for question in survey.iter_questions() if question.question_type != 'intro']
+        self.ranges = survey.validation_plan.ranges
+        self.invalid_rate = invalid_rate
+        self.rng = random.Random(seed)
+        # Answers that can be invalid: choice and rating questions (any text is a valid open answer)
+        self._checked = {question.question_id for question in self.questions if question.question_type != 'open_ended'}
+
+    def answer(self, question: Any) -> Any:
+        question_type = question.question_type
+        if question_type == 'multiple_choice':
+            return self.rng.choice(question.options)
+        if question_type in ('likert_scale', 'scale'):
+            low, high = self.ranges[question.question_id]
+            return self.rng.choice(question.option_codes() or range(low, high + 1))
+        return self.rng.choice(TEXT_ANSWERS)
+
+    def response(self) -> Dict[str, Any]:
+        response = {question.question_id: self.answer(question) for question in self.questions
+                    if self.rng.random() < 0.9 or question.required}
+        checked = [question_id for question_id in response if question_id in self._checked]
+        if checked and self.rng.random() < self.invalid_rate:
+            response[self.rng.choice(checked)] = "Not an option (99)"
+        return response
+
+async def post(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+               path: str, payload: Optional[Any] = None) -> Tuple[int, Any]:
+    """One HTTP/1.1 request on a keep-alive connection; returns (status, decoded JSON body)"""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    method = 'POST' if payload is not None else 'GET'
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    content = await reader.readexactly(length) if length else b''
+    return status, json.loads(content) if content else None
+
+async def client(host: str, port: int, generator: ResponseGenerator, batch: int, warmup_end: float,
+                 deadline: float, latencies: List[float], statuses: Counter, totals: Counter) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            responses = [generator.response() for _ in range(batch)]
+            payload = responses[0] if batch == 1 else responses
+            start = time.perf_counter()
+            status, result = await post(reader, writer, host, '/responses', payload)
+            finished = time.perf_counter()
+            if finished < warmup_end:
+                continue
+            latencies.append(finished - start)
+            statuses[status] += 1
+            if status == 201:
+                totals['accepted'] += 1
+            elif status == 422:
+                totals['rejected'] += 1
+            elif status == 200:
+                totals['accepted'] += result['accepted']
+                totals['rejected'] += len(result['rejected'])
+            if status == 503:
+                await asyncio.sleep(0.05)
+    finally:
+        writer.close()
+
+async def run_load_test(host: str, port: int, survey: Any, concurrency: int, duration: float,
+                        warmup: float, batch: int, invalid_rate: float, seed: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    totals: Counter = Counter()
+    start = time.perf_counter()
+    warmup_end, deadline = start + warmup, start + warmup + duration
+    await asyncio.gather(*(client(host, port, ResponseGenerator(survey, invalid_rate, seed + number), batch,
+                                  warmup_end, deadline, latencies, statuses, totals)
+                           for number in range(concurrency)))
+    elapsed = time.perf_counter() - warmup_end
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, stats = await post(reader, writer, host, '/stats')
+    finally:
+        writer.close()
+
+    latency_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'config': {'concurrency': concurrency, 'duration': duration, 'warmup': warmup, 'batch': batch,
+                   'invalid_rate': invalid_rate, 'seed': seed},
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'requests_per_sec': round(len(latencies) / elapsed, 1),
+        'responses_per_sec': round((totals['accepted'] + totals['rejected']) / elapsed, 1),
+        'accepted_per_sec': round(totals['accepted'] / elapsed, 1),
+        'accepted': totals['accepted'],
+        'rejected': totals['rejected'],
+        'latency_ms': {name: round(float(np.percentile(latency_ms, q)), 3)
+                       for name, q in (('p50', 50), ('p90', 90), ('p99', 99), ('max', 100))},
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'server': stats,
+    }
+
+def wait_for_server(host: str, port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    async def probe():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            await post(reader, writer, host, '/stats')
+        finally:
+            writer.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Ingestion service exited with code {process.returncode}")
+        try:
+            asyncio.run(probe())
+            return
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    sys.exit(f"Ingestion service did not come up on {host}:{port} within {timeout:.0f}s")
+
+def print_report(results: Dict[str, Any]):
+    latency = results['latency_ms']
+    print(f"\n{results['config']['concurrency']} connections, {results['config']['batch']} responses per request, "
+          f"{results['seconds']:.1f}s")
+    print(f"{'responses/sec':<20}{results['responses_per_sec']:>14,.0f}")
+    print(f"{'accepted/sec':<20}{results['accepted_per_sec']:>14,.0f}")
+    print(f"{'requests/sec':<20}{results['requests_per_sec']:>14,.0f}")
+    for name in ('p50', 'p90', 'p99', 'max'):
+        print(f"{name + ' latency ms':<20}{latency[name]:>14.2f}")
+    print(f"{'statuses':<20}{', '.join(f'{status} x{count}' for status, count in results['statuses'].items()):>14}")
+    server = results['server']
+    print(f"{'server stored':<20}{server['stored_responses']:>14,} ({server['flushes']} flushes, "
+          f"{server['mean_flush_ms']:.1f} ms mean)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the survey ingestion service on localhost.")
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Ingestion service host')
+    parser.add_argument('--port', type=int, default=8765, help='Ingestion service port')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=10.0, help='Measured seconds of load')
+    parser.add_argument('--warmup', type=float, default=1.0, help='Seconds of load before measuring')
+    parser.add_argument('--batch', type=int, default=1, help='Responses per POST (1 sends a single object)')
+    parser.add_argument('--invalid_rate', type=float, default=0.05, help='Share of responses made invalid on purpose')
+    parser.add_argument('--seed', type=int, default=0, help='Response generator seed')
+    parser.add_argument('--survey_definition', type=str, default=str(SURVEY_DEFINITION), help='Path to the JSON survey definition')
+    parser.add_argument('--spawn', action='store_true', help='Start the ingestion service in a subprocess for the run')
+    parser.add_argument('--output', type=str, help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    survey = load_survey_module().load_survey_definition(args.survey_definition)
+
+    process = None
+    if args.spawn:
+        process = subprocess.Popen([sys.executable, str(HERE / 'survey-questions.py'), '--serve',
+                                    '--host', args.host, '--port', str(args.port),
+                                    '--survey_definition', args.survey_definition],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        wait_for_server(args.host, args.port, process)
+    try:
+        results = asyncio.run(run_load_test(args.host, args.port, survey, args.concurrency, args.duration,
+                                            args.warmup, args.batch, args.invalid_rate, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=4)
+
+if __name__ == "__main__":
+    main()
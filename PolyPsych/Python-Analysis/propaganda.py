@@ -3,9 +3,16 @@ import csv
 import json
 import argparse
 import logging
+import logging.handlers
+import itertools
+import queue
+import time
+import cProfile
+import pstats
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import List, Dict, Any
-from collections import Counter
+from typing import List, Dict, Any, Callable, Iterable, Optional, Union
+from collections import Counter, defaultdict
 
 import pandas as pd
 import numpy as np
@@ -19,19 +26,180 @@ from sklearn.metrics import cohen_kappa_score
 # Ensure nltk resources are downloaded
 import nltk
 
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('wordnet')
-nltk.download('omw-1.4')
+def download_nltk_resources():
+    # Download required NLTK data
+    nltk.download('punkt')
+    nltk.download('stopwords')
+    nltk.download('wordnet')
+    nltk.download('omw-1.4')
 
-# Configure logging
-logging.basicConfig(
-    filename='processing.log',
-    filemode='a',
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+logger = logging.getLogger('propaganda')
+
+# URLs and every character other than ASCII letters and whitespace, removed in one pass
+CLEAN_PATTERN = re.compile(r'http\S+|www.\S+|[^A-Za-z\s]')
+STEP_SPLIT_PATTERN = re.compile(r'[.,;\n]+')
+# Joins a batch into one string for cleaning. Both characters are whitespace, so cleaning keeps
+# them, and the leading newline stops the URL pattern from running across two responses.
+BATCH_SEPARATOR = '\n\x1e'
+LEMMA_CACHE_SIZE = 100_000
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line.
+    Structured fields passed via ``extra={'fields': {...}}`` are merged into the object.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through one in every ``rate`` records at or below ``level``.
+    Records above ``level`` always pass.
+    """
+    def __init__(self, rate: int, level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = max(1, rate)
+        self.level = level
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level or self.rate == 1:
+            return True
+        return next(self._counter) % self.rate == 0
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that hands records to the listener thread unformatted,
+    so message interpolation happens off the processing thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def configure_logging(log_file: str = 'processing.log', level: int = logging.INFO,
+                      debug_sample_rate: int = 1) -> logging.handlers.QueueListener:
+    """
+    Routes the pipeline logger through a queue to a JSON-lines file writer thread.
+    Returns the started listener; call ``stop()`` on it to flush pending records.
+    """
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+
+    file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    logger.handlers.clear()
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+PROFILE_STAGES = ('read_responses', 'clean_text', 'lemmatize', 'keyword_matching', 'count_steps',
+                  'build_dataframe', 'write_csv', 'analysis', 'plotting')
+
+class NullProfiler:
+    """
+    Profiler used when profiling is off; every hook is a pass-through.
+    """
+    enabled = False
+
+    def stage(self, name: str, items: Union[int, Callable[[], int]]):
+        return nullcontext()
+
+    def call(self, name: str, func, *args):
+        return func(*args)
+
+class StageProfiler:
+    """
+    Collects wall-clock timings per pipeline stage.
+    Per-response stages (timed with ``call``) keep every sample for percentiles;
+    whole stages (timed with ``stage``) are reported per response as a mean only, so they are
+    given the number of responses they handled, or a callable returning it once the stage ends.
+    Optionally runs cProfile around one chosen stage.
+    """
+    enabled = True
+
+    def __init__(self, cprofile_stage: Optional[str] = None):
+        self.samples: Dict[str, List[int]] = defaultdict(list)
+        self.totals: Dict[str, int] = defaultdict(int)
+        self.items: Dict[str, int] = defaultdict(int)
+        self.cprofile_stage = cprofile_stage
+        self.cprofile = cProfile.Profile() if cprofile_stage else None
+
+    def _profile_for(self, name: str) -> Optional[cProfile.Profile]:
+        return self.cprofile if name == self.cprofile_stage else None
+
+    @contextmanager
+    def stage(self, name: str, items: Union[int, Callable[[], int]]):
+        profile = self._profile_for(name)
+        if profile:
+            profile.enable()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            if profile:
+                profile.disable()
+            self.totals[name] += elapsed
+            self.items[name] += items() if callable(items) else items
+
+    def call(self, name: str, func, *args):
+        profile = self._profile_for(name)
+        if profile:
+            profile.enable()
+        start = time.perf_counter_ns()
+        result = func(*args)
+        elapsed = time.perf_counter_ns() - start
+        if profile:
+            profile.disable()
+        self.samples[name].append(elapsed)
+        self.totals[name] += elapsed
+        self.items[name] += 1
+        return result
+
+    def breakdown(self) -> pd.DataFrame:
+        """
+        Per-stage totals, share of profiled time, and per-response mean/p50/p90/p99 in microseconds.
+        """
+        grand_total = sum(self.totals.values()) or 1
+        rows = []
+        for name, total in self.totals.items():
+            items = self.items[name] or 1
+            row = {
+                'stage': name,
+                'responses': self.items[name],
+                'total_s': total / 1e9,
+                'share_%': 100 * total / grand_total,
+                'mean_us': total / items / 1e3,
+            }
+            samples = self.samples.get(name)
+            if samples:
+                p50, p90, p99 = np.percentile(samples, [50, 90, 99]) / 1e3
+                row.update({'p50_us': p50, 'p90_us': p90, 'p99_us': p99})
+            rows.append(row)
+        return pd.DataFrame(rows).set_index('stage').sort_values('total_s', ascending=False)
+
+    def dump_cprofile(self, output_path: str):
+        if self.cprofile is None:
+            return
+        self.cprofile.dump_stats(output_path)
+        logger.info("Saved cProfile stats for stage %s to %s", self.cprofile_stage, output_path)
+        pstats.Stats(output_path).sort_stats('cumulative').print_stats(20)
 
 class CodingSchemeLoader:
     """
@@ -45,10 +213,10 @@ class CodingSchemeLoader:
         try:
             with open(path, 'r', encoding='utf-8') as file:
                 scheme = json.load(file)
-            logging.info(f"Loaded coding scheme from {path}")
+            logger.info("Loaded coding scheme from %s", path)
             return scheme
         except Exception as e:
-            logging.error(f"Error loading coding scheme from {path}: {e}")
+            logger.error("Error loading coding scheme from %s: %s", path, e)
             raise
 
     def get_definition_scheme(self) -> Dict[str, List[str]]:
@@ -60,28 +228,66 @@ class CodingSchemeLoader:
 class TextPreprocessor:
     """
     Preprocesses text data by cleaning, lemmatizing, and removing stopwords.
+    The NLTK stopword list and WordNet lemmatizer are used unless replacements are given
+    (any object with a ``lemmatize(token)`` method works as a lemmatizer).
     """
-    def __init__(self):
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = set(stopwords.words('english'))
+    def __init__(self, stop_words: Optional[Iterable[str]] = None, lemmatizer: Optional[Any] = None):
+        self.lemmatizer = lemmatizer if lemmatizer is not None else WordNetLemmatizer()
+        self.stop_words = set(stop_words) if stop_words is not None else set(stopwords.words('english'))
+        self._lemma_cache: Dict[str, str] = {}
 
     def preprocess(self, text: str) -> str:
-        text = self.clean_text(text)
-        tokens = text.split()
-        tokens = [self.lemmatizer.lemmatize(token) for token in tokens if token not in self.stop_words]
-        preprocessed_text = ' '.join(tokens)
-        logging.debug(f"Preprocessed text: {preprocessed_text}")
+        return self.lemmatize_tokens(self.clean_text(text).split())
+
+    def preprocess_batch(self, texts: List[str]) -> List[str]:
+        """
+        Preprocesses a list of responses; equivalent to ``[preprocess(t) for t in texts]``
+        but cleans the whole batch with a single regex pass and lowercase call.
+        """
+        return [self.lemmatize_tokens(tokens) for tokens in self.tokenize_batch(texts)]
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Cleans and splits every response in the batch into tokens.
+        """
+        if not texts:
+            return []
+        chunks = self.clean_text(BATCH_SEPARATOR.join(texts)).split(BATCH_SEPARATOR)
+        if len(chunks) != len(texts):
+            # A response contains the separator, or cleaning created one (e.g. "\n1\x1e" -> "\n\x1e");
+            # fall back to cleaning one at a time so tokens stay aligned with their responses
+            return [self.clean_text(text).split() for text in texts]
+        return [chunk.split() for chunk in chunks]
+
+    def lemmatize_text(self, cleaned_text: str) -> str:
+        return self.lemmatize_tokens(cleaned_text.split())
+
+    def lemmatize_tokens(self, tokens: List[str]) -> str:
+        """
+        Drops stopwords and lemmatizes in one scan over the tokens, memoizing lemmas.
+        """
+        stop_words = self.stop_words
+        cache = self._lemma_cache
+        lemmas = []
+        for token in tokens:
+            if token in stop_words:
+                continue
+            lemma = cache.get(token)
+            if lemma is None:
+                if len(cache) >= LEMMA_CACHE_SIZE:
+                    cache.clear()
+                lemma = cache[token] = self.lemmatizer.lemmatize(token)
+            lemmas.append(lemma)
+        preprocessed_text = ' '.join(lemmas)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Preprocessed text: %s", preprocessed_text,
+                         extra={'fields': {'event': 'preprocess', 'text': preprocessed_text}})
         return preprocessed_text
 
     @staticmethod
     def clean_text(text: str) -> str:
-        # Remove URLs
-        text = re.sub(r'http\S+|www.\S+', '', text)
-        # Remove special characters and digits
-        text = re.sub(r'[^A-Za-z\s]', '', text)
-        # Convert to lowercase
-        text = text.lower()
-        return text
+        # Remove URLs, special characters and digits, then convert to lowercase
+        return CLEAN_PATTERN.sub('', text).lower()
 
 class ResponseCoder:
     """
@@ -98,54 +304,68 @@ class ResponseCoder:
                 if re.search(r'\b' + re.escape(keyword) + r'\b', text):
                     codes_matched.append(code)
                     break  # Avoid duplicate coding for the same category
-        logging.debug(f"Codes matched for text: {codes_matched}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Codes matched for text: %s", codes_matched,
+                         extra={'fields': {'event': 'code_response', 'codes': codes_matched}})
         return codes_matched
 
 class DataProcessor:
     """
     Processes responses by reading, preprocessing, coding, and analyzing data.
     """
-    def __init__(self, preprocessor: TextPreprocessor, definition_coder: ResponseCoder, verification_coder: ResponseCoder):
+    def __init__(self, preprocessor: TextPreprocessor, definition_coder: ResponseCoder, verification_coder: ResponseCoder,
+                 profiler: Optional[StageProfiler] = None):
         self.preprocessor = preprocessor
         self.definition_coder = definition_coder
         self.verification_coder = verification_coder
+        self.profiler = profiler if profiler is not None else NullProfiler()
 
     @staticmethod
     def read_responses(file_path: str) -> List[str]:
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
                 responses = [line.strip() for line in file if line.strip()]
-            logging.info(f"Read {len(responses)} responses from {file_path}")
+            logger.info("Read %d responses from %s", len(responses), file_path)
             return responses
         except Exception as e:
-            logging.error(f"Error reading responses from {file_path}: {e}")
+            logger.error("Error reading responses from %s: %s", file_path, e)
             raise
 
     @staticmethod
     def count_steps(response: str) -> int:
-        steps = re.split(r'[.,;\n]+', response)
+        steps = STEP_SPLIT_PATTERN.split(response)
         steps = [step.strip() for step in steps if step.strip()]
         return len(steps)
 
+    def _preprocess_all(self, responses: List[str]) -> List[str]:
+        if not self.profiler.enabled:
+            return self.preprocessor.preprocess_batch(responses)
+        with self.profiler.stage('clean_text', len(responses)):
+            token_lists = self.preprocessor.tokenize_batch(responses)
+        return [self.profiler.call('lemmatize', self.preprocessor.lemmatize_tokens, tokens)
+                for tokens in token_lists]
+
     def process_definitions(self, responses: List[str]) -> pd.DataFrame:
+        profiler = self.profiler
         data = []
-        for response in responses:
-            cleaned_text = self.preprocessor.preprocess(response)
-            codes = self.definition_coder.code_response(cleaned_text)
+        for response, cleaned_text in zip(responses, self._preprocess_all(responses)):
+            codes = profiler.call('keyword_matching', self.definition_coder.code_response, cleaned_text)
             data.append({'Response': response, 'Codes': codes})
-        df = pd.DataFrame(data)
-        logging.info("Processed definitions responses")
+        with profiler.stage('build_dataframe', len(data)):
+            df = pd.DataFrame(data)
+        logger.info("Processed definitions responses", extra={'fields': {'count': len(df)}})
         return df
 
     def process_verifications(self, responses: List[str]) -> pd.DataFrame:
+        profiler = self.profiler
         data = []
-        for response in responses:
-            cleaned_text = self.preprocessor.preprocess(response)
-            codes = self.verification_coder.code_response(cleaned_text)
-            num_steps = self.count_steps(response)
+        for response, cleaned_text in zip(responses, self._preprocess_all(responses)):
+            codes = profiler.call('keyword_matching', self.verification_coder.code_response, cleaned_text)
+            num_steps = profiler.call('count_steps', self.count_steps, response)
             data.append({'Response': response, 'Codes': codes, 'Number of Steps': num_steps})
-        df = pd.DataFrame(data)
-        logging.info("Processed verifications responses")
+        with profiler.stage('build_dataframe', len(data)):
+            df = pd.DataFrame(data)
+        logger.info("Processed verifications responses", extra={'fields': {'count': len(df)}})
         return df
 
 class Analyzer:
@@ -159,13 +379,13 @@ class Analyzer:
     def compute_frequency(df: pd.DataFrame, column_name: str) -> pd.Series:
         all_codes = df[column_name].explode()
         frequency = all_codes.value_counts()
-        logging.info(f"Computed frequency for {column_name}")
+        logger.info("Computed frequency for %s", column_name)
         return frequency
 
     @staticmethod
     def compute_descriptive_stats(series: pd.Series) -> pd.Series:
         stats = series.describe()
-        logging.info("Computed descriptive statistics")
+        logger.info("Computed descriptive statistics")
         return stats
 
     @staticmethod
@@ -178,7 +398,7 @@ class Analyzer:
         plt.tight_layout()
         plt.savefig(output_path)
         plt.close()
-        logging.info(f"Saved frequency plot to {output_path}")
+        logger.info("Saved frequency plot to %s", output_path)
 
     @staticmethod
     def plot_descriptive_stats(series: pd.Series, title: str, output_path: str):
@@ -190,7 +410,7 @@ class Analyzer:
         plt.tight_layout()
         plt.savefig(output_path)
         plt.close()
-        logging.info(f"Saved descriptive statistics plot to {output_path}")
+        logger.info("Saved descriptive statistics plot to %s", output_path)
 
     @staticmethod
     def compute_cohens_kappa(ratings1: List[str], ratings2: List[str], coding_categories: List[str]) -> float:
@@ -199,7 +419,7 @@ class Analyzer:
         binary_ratings1 = [1 if category in codes else 0 for codes in ratings1 for category in coding_categories]
         binary_ratings2 = [1 if category in codes else 0 for codes in ratings2 for category in coding_categories]
         kappa = cohen_kappa_score(binary_ratings1, binary_ratings2)
-        logging.info(f"Computed Cohen's Kappa: {kappa}")
+        logger.info("Computed Cohen's Kappa: %s", kappa)
         return kappa
 
 class Visualizer:
@@ -221,8 +441,23 @@ def main():
     parser.add_argument('--definitions_output', type=str, default='processed_definitions.csv', help='Path to definitions output CSV file')
     parser.add_argument('--verifications_output', type=str, default='processed_verifications.csv', help='Path to verifications output CSV file')
     parser.add_argument('--plots_dir', type=str, default='plots', help='Directory to save plots')
+    parser.add_argument('--log_file', type=str, default='processing.log', help='Path to JSON-lines log file')
+    parser.add_argument('--log_level', type=str, default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='Minimum level written to the log')
+    parser.add_argument('--debug_sample_rate', type=int, default=100, help='Keep one in N per-response DEBUG records')
+    parser.add_argument('--profile', action='store_true', help='Time each pipeline stage and print a per-stage breakdown')
+    parser.add_argument('--profile_stage', type=str, choices=PROFILE_STAGES, help='Run cProfile around this stage (e.g. lemmatize, keyword_matching, write_csv)')
+    parser.add_argument('--profile_dump', type=str, default='pipeline.pstats', help='Path for the cProfile stats dump of --profile_stage')
     args = parser.parse_args()
 
+    download_nltk_resources()
+    listener = configure_logging(args.log_file, getattr(logging, args.log_level), args.debug_sample_rate)
+    try:
+        run_pipeline(args)
+    finally:
+        listener.stop()
+
+def run_pipeline(args: argparse.Namespace):
+
     # Ensure plots directory exists
     Path(args.plots_dir).mkdir(parents=True, exist_ok=True)
 
@@ -232,46 +467,61 @@ def main():
     verification_scheme = loader.get_verification_scheme()
 
     # Initialize components
+    profile = args.profile or args.profile_stage is not None
+    profiler = StageProfiler(args.profile_stage) if profile else NullProfiler()
     preprocessor = TextPreprocessor()
     definition_coder = ResponseCoder(definition_scheme)
     verification_coder = ResponseCoder(verification_scheme)
-    processor = DataProcessor(preprocessor, definition_coder, verification_coder)
+    processor = DataProcessor(preprocessor, definition_coder, verification_coder, profiler)
     analyzer = Analyzer()
 
     # Read responses
-    definitions_responses = processor.read_responses(args.definitions_input)
-    verifications_responses = processor.read_responses(args.verifications_input)
+    with profiler.stage('read_responses', lambda: len(definitions_responses) + len(verifications_responses)):
+        definitions_responses = processor.read_responses(args.definitions_input)
+        verifications_responses = processor.read_responses(args.verifications_input)
 
     # Process and code responses
     definitions_df = processor.process_definitions(definitions_responses)
     verifications_df = processor.process_verifications(verifications_responses)
 
     # Save processed data
-    definitions_df.to_csv(args.definitions_output, index=False)
-    verifications_df.to_csv(args.verifications_output, index=False)
-    logging.info(f"Saved processed definitions to {args.definitions_output}")
-    logging.info(f"Saved processed verifications to {args.verifications_output}")
+    with profiler.stage('write_csv', len(definitions_df) + len(verifications_df)):
+        definitions_df.to_csv(args.definitions_output, index=False)
+        verifications_df.to_csv(args.verifications_output, index=False)
+    logger.info("Saved processed definitions to %s", args.definitions_output)
+    logger.info("Saved processed verifications to %s", args.verifications_output)
 
     # Perform analysis
     # Definitions
     print("Definitions - Code Frequencies:")
-    def_freq = analyzer.compute_frequency(definitions_df, 'Codes')
+    with profiler.stage('analysis', len(definitions_df)):
+        def_freq = analyzer.compute_frequency(definitions_df, 'Codes')
     print(def_freq)
-    analyzer.plot_frequency(def_freq, 'Definitions Code Frequencies', f"{args.plots_dir}/definitions_code_frequencies.png")
+    with profiler.stage('plotting', len(definitions_df)):
+        analyzer.plot_frequency(def_freq, 'Definitions Code Frequencies', f"{args.plots_dir}/definitions_code_frequencies.png")
 
     # Definitions Descriptive Statistics (if numerical coding is added)
     # Placeholder: Assuming numerical coding not implemented yet
 
     # Verifications
     print("\nVerifications - Code Frequencies:")
-    ver_freq = analyzer.compute_frequency(verifications_df, 'Codes')
+    with profiler.stage('analysis', len(verifications_df)):
+        ver_freq = analyzer.compute_frequency(verifications_df, 'Codes')
     print(ver_freq)
-    analyzer.plot_frequency(ver_freq, 'Verifications Code Frequencies', f"{args.plots_dir}/verifications_code_frequencies.png")
+    with profiler.stage('plotting', len(verifications_df)):
+        analyzer.plot_frequency(ver_freq, 'Verifications Code Frequencies', f"{args.plots_dir}/verifications_code_frequencies.png")
 
     print("\nVerifications - Number of Steps Statistics:")
-    steps_stats = analyzer.compute_descriptive_stats(verifications_df['Number of Steps'])
+    with profiler.stage('analysis', len(verifications_df)):
+        steps_stats = analyzer.compute_descriptive_stats(verifications_df['Number of Steps'])
     print(steps_stats)
-    analyzer.plot_descriptive_stats(verifications_df['Number of Steps'], 'Number of Steps Distribution', f"{args.plots_dir}/verifications_steps_distribution.png")
+    with profiler.stage('plotting', len(verifications_df)):
+        analyzer.plot_descriptive_stats(verifications_df['Number of Steps'], 'Number of Steps Distribution', f"{args.plots_dir}/verifications_steps_distribution.png")
+
+    if profiler.enabled:
+        print("\nPipeline Profile (times per response in microseconds):")
+        print(profiler.breakdown().to_string(float_format=lambda value: f"{value:,.2f}"))
+        profiler.dump_cprofile(args.profile_dump)
 
     # Reliability Analysis Placeholder
     # Assuming we have ratings from two coders
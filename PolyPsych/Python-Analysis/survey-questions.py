@@ -1,65 +1,240 @@
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Callable, Iterable, Iterator
 import csv
 import json
-import statistics
+import re
+import sys
+import pickle
+import hashlib
 from wsgiref import validate
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import logging
+import math
+import warnings
+import random
+import time
+import argparse
+from collections import Counter, abc
 from datetime import datetime
+from pathlib import Path
 import os
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+from survey_correlations import CorrelationEngine
+from survey_segments import SegmentationCube
+from survey_text_index import TextResponseIndex
+from survey_ingest import serve
+
 @dataclass
 class SurveyCollector:
     survey_id: str
     title: str
     blocks: List['Block']
-    responses: List[Dict[str, Any]] = None
 
     def __init__(self, survey_id, title):
         self.survey_id = survey_id
         self.title = title
         self.blocks = []
-        self.responses = []
+        self._block_index: Dict[str, 'Block'] = {}
+        self._question_index: Dict[str, 'Question'] = {}
+        self._store = ResponseStore(self._question_index.get)
+        self._aggregates: Dict[str, 'QuestionAggregate'] = {}
+        self._analyzer: Optional['ResponseAnalyzer'] = None
+        self._validation_plan: Optional['ValidationPlan'] = None
+        self._listeners: List[Any] = []
+        self._correlation_engines: Dict[tuple, CorrelationEngine] = {}  # Least recently used first
+        self._text_indexes: Dict[str, TextResponseIndex] = {}
+        self.version = 0  # Bumped on every collected response
+
+    @property
+    def responses(self) -> 'ResponseRows':
+        """Read-only, row-oriented view of the collected responses"""
+        return ResponseRows(self._store)
+
+    @property
+    def store(self) -> 'ResponseStore':
+        return self._store
+
+    @property
+    def analyzer(self) -> 'ResponseAnalyzer':
+        """Shared analyzer whose cached frame and results persist across exports"""
+        if self._analyzer is None:
+            self._analyzer = ResponseAnalyzer(self)
+        return self._analyzer
+
+    @property
+    def validation_plan(self) -> 'ValidationPlan':
+        """Validation rules compiled from the current questions, recompiled after questions are added"""
+        if self._validation_plan is None:
+            self._validation_plan = ValidationPlan(self.iter_questions())
+        return self._validation_plan
+
+    CORRELATION_ENGINES = 4  # Engines kept attached by correlation_engine(); older ones are dropped
+
+    @property
+    def correlations(self) -> CorrelationEngine:
+        """Correlation engine over all the scale and Likert questions, see correlation_engine().
+        Raises ValueError for surveys too large for CorrelationEngine.max_bytes."""
+        return self.correlation_engine([question.question_id for question in self.iter_questions()
+                                        if question.question_type in ('likert_scale', 'scale')])
+
+    def correlation_engine(self, question_ids: List[str]) -> CorrelationEngine:
+        """Correlation engine over just ``question_ids`` (scale and Likert questions), attached as a
+        listener and shared by later calls for the same questions. Only the CORRELATION_ENGINES most
+        recently used engines stay attached."""
+        key = tuple(question_ids)
+        engine = self._correlation_engines.pop(key, None)
+        if engine is None:
+            questions = [self.get_question(question_id) for question_id in key]
+            other = [question.question_id for question in questions if question.question_type not in ('likert_scale', 'scale')]
+            if other:
+                raise ValueError(f"Questions {other} are not scale or Likert questions")
+            likert = [question for question in questions if question.question_type == 'likert_scale']
+            codes = [code for question in likert for code in question.option_codes()]
+            likert_range = (min(codes), max(codes)) if codes else (1, 7)
+            engine = CorrelationEngine(key, [question.question_id for question in likert], likert_range).attach(self)
+        self._correlation_engines[key] = engine
+        while len(self._correlation_engines) > self.CORRELATION_ENGINES:
+            self._correlation_engines.pop(next(iter(self._correlation_engines))).detach()
+        return engine
+
+    def segmentation_cube(self, dimensions: Union[List[str], Dict[str, Callable]], measures: Optional[List[str]] = None,
+                          batch_size: int = 1000) -> SegmentationCube:
+        """Cube of counts and sums over ``dimensions`` (question ids, or question id -> binner),
+        attached as a listener. Measures default to the scale and Likert questions."""
+        if measures is None:
+            measures = [question.question_id for question in self.iter_questions()
+                        if question.question_type in ('likert_scale', 'scale')]
+        return SegmentationCube(dimensions, measures, batch_size).attach(self)
+
+    def text_index(self, question_id: str) -> TextResponseIndex:
+        """Deduplicated, searchable index of one question's free-text answers, shared and kept
+        up to date as a listener"""
+        index = self._text_indexes.get(question_id)
+        if index is None:
+            self.get_question(question_id)
+            index = self._text_indexes[question_id] = TextResponseIndex().attach(self, question_id)
+        return index
+
+    def add_listener(self, listener: Any) -> None:
+        """Register ``listener.on_collect(survey, start, stop)``, called after rows [start, stop)
+        were collected. Listeners read the new rows from the column store themselves."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Any) -> None:
+        self._listeners.remove(listener)
+
+    def _notify(self, start: int) -> None:
+        """Tell listeners about rows [start, end); the rows are collected by now, so a failing
+        listener is logged rather than failing the collect"""
+        for listener in self._listeners:
+            try:
+                listener.on_collect(self, start, len(self._store))
+            except Exception as e:
+                logging.error(f"Listener {type(listener).__name__} failed on rows {start}-{len(self._store)}: {e}")
 
     def add_block(self, block):
         self.blocks.append(block)
+        self._block_index.setdefault(block.block_id, block)
+        block._surveys.append(self)
+        for question in block.questions:
+            self._index_question(question)
+
+    def _index_question(self, question: 'Question') -> None:
+        """Register a question; the first block defining an id wins, as with a linear scan"""
+        self._question_index.setdefault(question.question_id, question)
+        self._validation_plan = None
+
+    def get_question(self, question_id: str) -> 'Question':
+        question = self._question_index.get(question_id)
+        if question is None:
+            raise ValueError(f"Question {question_id} not found")
+        return question
+
+    def iter_questions(self):
+        """Questions in survey order, one per question id"""
+        for block in self.blocks:
+            for question in block.questions:
+                if self._question_index.get(question.question_id) is question:
+                    yield question
     
     def collect_response(self, response):
-        self.responses.append(response)
+        self._store.append(response)
+        self._aggregate(response)
+        self.version += 1
+        if self._listeners:
+            self._notify(len(self._store) - 1)
+
+    def collect_frame(self, frame: pd.DataFrame) -> None:
+        """Collect a batch of responses, one row each, with question ids as columns and NA for
+        unanswered questions. Typed columns (float64 for scales, categorical for choices) are
+        appended to the store and folded into the aggregates without per-response work.
+        All or nothing: if any column fails, neither the store nor the aggregates change."""
+        if frame.empty:
+            return
+        start = len(self._store)
+        # Fold the batch into fresh aggregates first, merged in only once the store took the rows
+        batches: Dict[str, QuestionAggregate] = {}
+        for question_id in frame.columns:
+            answers = frame[question_id]
+            aggregate = self._aggregates.get(question_id)
+            if aggregate is None:
+                present = answers[answers.notna()]
+                if present.empty:
+                    continue
+                first = present.iloc[0]
+                if isinstance(first, np.generic):
+                    first = first.item()
+                aggregate = QuestionAggregate.for_answer(first)
+            batch = batches[question_id] = type(aggregate)()
+            batch.add_many(answers)
+        self._store.extend(frame)
+        for question_id, batch in batches.items():
+            aggregate = self._aggregates.get(question_id)
+            if aggregate is None:
+                self._aggregates[question_id] = batch
+            else:
+                aggregate.merge(batch)
+        self.version += len(frame)
+        if self._listeners:
+            self._notify(start)
+
+    def import_file(self, path: str, chunksize: int = 10_000, column_map: Optional[Dict[str, str]] = None,
+                    validate: bool = True) -> 'ImportReport':
+        """Stream a Qualtrics-style CSV/XLSX export into the survey, see ResponseImporter"""
+        return ResponseImporter(self, chunksize, column_map, validate).import_file(path)
+
+    def to_dataframe(self, start: int = 0) -> pd.DataFrame:
+        """Responses from row ``start`` onwards as a DataFrame backed by the column store"""
+        return self._store.to_dataframe(start)
+
+    def _aggregate(self, response: Dict[str, Any]) -> None:
+        """Fold one response into the running per-question aggregates (None = unanswered)"""
+        for question_id, answer in response.items():
+            if answer is None:
+                continue
+            aggregate = self._aggregates.get(question_id)
+            if aggregate is None:
+                aggregate = self._aggregates[question_id] = QuestionAggregate.for_answer(answer)
+            aggregate.add(answer)
     
     def get_block(self, block_id):
-        for block in self.blocks:
-            if block.block_id == block_id:
-                return block
-        raise ValueError("Block not found")
+        block = self._block_index.get(block_id)
+        if block is None:
+            raise ValueError("Block not found")
+        return block
     
     def process_responses(self):
-        results = {}
-        for response in self.responses:
-            for question_id, answer in response.items():
-                if question_id not in results:
-                    results[question_id] = []
-                results[question_id].append(answer)
-        
-        processed_results = {}
-        for question_id, answers in results.items():
-            if isinstance(answers[0], list):  # For multi-select questions
-                processed_results[question_id] = {option: answers.count([option]) for option in set(answer for answer_list in answers for answer in answer_list)}
-            elif isinstance(answers[0], str):  # For single choice or open-ended
-                processed_results[question_id] = {option: answers.count(option) for option in set(answers)}
-            elif isinstance(answers[0], int) or isinstance(answers[0], float):  # For scale or numerical questions
-                processed_results[question_id] = {
-                    'mean': statistics.mean(answers),
-                    'median': statistics.median(answers),
-                    'mode': statistics.mode(answers) if len(set(answers)) > 1 else answers[0],
-                    'count': len(answers)
-                }
-            else:  # For other types, just count occurrences
-                processed_results[question_id] = {answer: answers.count(answer) for answer in set(answers)}
-        return processed_results
+        """Summarize every question from the running aggregates"""
+        return {question_id: aggregate.summary() for question_id, aggregate in self._aggregates.items()}
 
     def export_results(self, filename='results', format='csv'):
         """Export results with timestamp to PolyPsych/Data folder"""
@@ -93,15 +268,17 @@ class SurveyCollector:
 
     def validate_response(self, response: Dict[str, Any]) -> bool:
         """Validate a complete survey response"""
-        try:
-            for block in self.blocks:
-                for question in block.questions:
-                    if question.question_id in response:
-                        question.validate_response(response[question.question_id])
-            return True
-        except ValueError as e:
-            logging.error(f"Response validation failed: {e}")
+        errors = self.validation_plan.check(response)
+        if errors:
+            details = "; ".join(f"{question_id}: {', '.join(ValidationPlan.describe(code))}"
+                                for question_id, code in errors.items())
+            logging.error(f"Response validation failed: {details}")
             return False
+        return True
+
+    def validate_batch(self, responses: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.Series:
+        """Error code per response (0 = valid) for a list of responses or an imported DataFrame"""
+        return self.validation_plan.validate_batch(responses)
             
     def export_to_spss(self, filename: str) -> None:
         """Export responses to SPSS format with timestamp"""
@@ -113,7 +290,8 @@ class SurveyCollector:
         os.makedirs(data_dir, exist_ok=True)
         
         full_path = os.path.join(data_dir, f"{filename}_{timestamp}.sav")
-        df = pd.DataFrame(self.responses)
+        df = self.to_dataframe()
+        df = df.astype({column: object for column in df.select_dtypes('category').columns})
         df.to_spss(full_path)
         
     def export_to_excel(self, filename: str) -> None:
@@ -129,58 +307,253 @@ class SurveyCollector:
         
         with pd.ExcelWriter(full_path) as writer:
             # Raw responses
-            pd.DataFrame(self.responses).to_excel(writer, sheet_name='Raw Data')
+            analyzer = self.analyzer
+            analyzer.create_dataframe().to_excel(writer, sheet_name='Raw Data')
             
             # Summary statistics
-            analyzer = ResponseAnalyzer(self)
-            summary_data = {}
+            analyzer.summarize().to_excel(writer, sheet_name='Summary Statistics', index=False)
+
+    def export_to_parquet(self, filename: str, row_group_size: int = 10_000) -> str:
+        """Export responses to Parquet with timestamp, straight from the column store"""
+        if not self.responses:
+            raise ValueError("No responses to export")
             
-            for block in self.blocks:
-                for question in block.questions:
-                    try:
-                        summary_data[question.question_id] = analyzer.analyze_question(
-                            question.question_id)
-                    except Exception as e:
-                        logging.warning(f"Could not analyze {question.question_id}: {e}")
-                        
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary Statistics')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        data_dir = os.path.join('PolyPsych', 'Data')
+        os.makedirs(data_dir, exist_ok=True)
+        
+        full_path = os.path.join(data_dir, f"{filename}_{timestamp}.parquet")
+        with ParquetResponseWriter(self, full_path, row_group_size) as writer:
+            writer.flush(final=True)
+        return full_path
+
+    def stream_to_parquet(self, path: str, row_group_size: int = 10_000) -> 'ParquetResponseWriter':
+        """Write a row group to ``path`` every ``row_group_size`` collected responses, starting
+        with those already collected. Close the returned writer to flush the rest."""
+        writer = ParquetResponseWriter(self, path, row_group_size)
+        writer.flush()
+        self.add_listener(writer)
+        return writer
+
+    def export_summary(self, filename: str = 'summary', format: str = 'csv') -> None:
+        """Export the tidy whole-survey summary table with timestamp"""
+        if not self.responses:
+            raise ValueError("No responses to export")
+            
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        data_dir = os.path.join('PolyPsych', 'Data')
+        os.makedirs(data_dir, exist_ok=True)
+        
+        full_path = os.path.join(data_dir, f"{filename}_{timestamp}")
+        summary = self.analyzer.summarize()
+        if format == 'csv':
+            summary.to_csv(f"{full_path}.csv", index=False)
+        elif format == 'json':
+            summary.to_json(f"{full_path}.json", orient='records', indent=4)
+        else:
+            raise ValueError("Unsupported format. Please use 'csv' or 'json'.")
 
 class ResponseAnalyzer:
     """Handles analysis of survey responses"""
     def __init__(self, survey_collector: SurveyCollector):
         self.survey = survey_collector
         self.df: Optional[pd.DataFrame] = None
+        self._df_version = -1
+        # question_id -> (column, column version, result) for analyze_question()
+        self._results: Dict[str, tuple] = {}
+        self._summary: Optional[pd.DataFrame] = None
+        self._summary_version = -1
         
     def create_dataframe(self) -> pd.DataFrame:
-        """Convert responses to pandas DataFrame"""
+        """Convert responses to pandas DataFrame, refreshed only when new responses were collected.
+        The frame is a set of views over the column store, so a refresh only decodes new rows."""
         if not self.survey.responses:
             raise ValueError("No responses to analyze")
             
-        self.df = pd.DataFrame(self.survey.responses)
+        if self.df is None or self._df_version != self.survey.version:
+            self.df = self.survey.to_dataframe()
+            self._df_version = self.survey.version
         return self.df
     
     def analyze_question(self, question_id: str) -> Dict[str, Any]:
         """Analyze responses for a specific question"""
-        if self.df is None:
-            self.create_dataframe()
+        self.create_dataframe()
             
         if question_id not in self.df.columns:
             raise ValueError(f"Question {question_id} not found in responses")
             
+        # Reuse the last result while the question's column is unchanged
+        column = self.survey.store.columns[question_id]
+        cached = self._results.get(question_id)
+        if cached is not None and cached[0] is column and cached[1] == column.version:
+            return cached[2]
+            
         series = self.df[question_id]
         
         # Get question type from survey
         question = self._find_question(question_id)
         
         if question.question_type == 'likert_scale':
-            return self._analyze_likert(series)
+            result = self._analyze_likert(series)
         elif question.question_type == 'multiple_choice':
-            return self._analyze_categorical(series)
+            result = self._analyze_categorical(series)
         elif question.question_type == 'scale':
-            return self._analyze_numerical(series)
+            result = self._analyze_numerical(series)
         else:
-            return self._analyze_text(series)
+            result = self._analyze_text(series)
+        self._results[question_id] = (column, column.version, result)
+        return result
             
+    SUMMARY_COLUMNS = ['question_id', 'question_type', 'statistic', 'category', 'value']
+
+    def summarize(self) -> pd.DataFrame:
+        """Summarize every question in one tidy table (question_id, question_type, statistic,
+        category, value). Questions are grouped by type and each group is summarized with a few
+        vectorized passes over its columns instead of one analyze_question() call per question."""
+        df = self.create_dataframe()
+        if self._summary is not None and self._summary_version == self.survey.version:
+            return self._summary
+            
+        groups: Dict[str, List[str]] = {}
+        for question in self.survey.iter_questions():
+            if question.question_id in df.columns:
+                groups.setdefault(question.question_type, []).append(question.question_id)
+                
+        summarizers = {
+            'likert_scale': self._summarize_likert,
+            'scale': self._summarize_numerical,
+            'multiple_choice': self._summarize_categorical,
+        }
+        parts = []
+        for question_type, question_ids in groups.items():
+            summarize_group = summarizers.get(question_type, self._summarize_text)
+            try:
+                part = summarize_group(df[question_ids])
+            except Exception as e:
+                # Fall back to one question at a time to isolate the failing columns
+                part, failed = [], []
+                for question_id in question_ids:
+                    try:
+                        part.append(summarize_group(df[[question_id]]))
+                    except Exception:
+                        failed.append(question_id)
+                logging.warning(f"Could not summarize {question_type} questions {failed}: {e}")
+                part = pd.concat(part, ignore_index=True) if part else None
+            if part is not None:
+                parts.append(part.assign(question_type=question_type))
+                
+        if parts:
+            summary = pd.concat(parts, ignore_index=True)
+            order = {question_id: position for position, question_id in enumerate(df.columns)}
+            summary = summary.sort_values('question_id', key=lambda ids: ids.map(order), kind='stable')
+            summary = summary[self.SUMMARY_COLUMNS].reset_index(drop=True)
+        else:
+            summary = pd.DataFrame(columns=self.SUMMARY_COLUMNS)
+        self._summary, self._summary_version = summary, self.survey.version
+        return summary
+
+    @staticmethod
+    def _tidy_stats(stats: pd.DataFrame) -> pd.DataFrame:
+        """Statistic-by-question frame to tidy rows"""
+        n_statistics, n_questions = stats.shape
+        return pd.DataFrame({
+            'question_id': np.tile(stats.columns.to_numpy(dtype=object), n_statistics),
+            'statistic': np.repeat(stats.index.to_numpy(dtype=object), n_questions),
+            'category': None,
+            'value': stats.to_numpy(dtype=object).ravel(),
+        })
+
+    @staticmethod
+    def _long(frame: pd.DataFrame, value_name: str) -> pd.DataFrame:
+        """Stack all columns into (question_id, value) rows; a cheaper melt() for wide frames"""
+        if frame.shape[1]:
+            values = np.concatenate([column.to_numpy(dtype=object) for _, column in frame.items()])
+        else:
+            values = np.empty(0, dtype=object)
+        question_ids = np.repeat(frame.columns.to_numpy(dtype=object), len(frame))
+        return pd.DataFrame({'question_id': question_ids, value_name: values})
+
+    def _tidy_counts(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Counts per (question_id, category) over all columns in one value_counts() pass.
+        Multi-select lists are exploded so each chosen option is counted."""
+        long = self._long(frame, 'category')
+        if long['category'].map(type).eq(list).any():
+            long = long.explode('category')
+        long = long.dropna()
+        return long.value_counts(['question_id', 'category'], sort=False).rename('value').reset_index()
+
+    @staticmethod
+    def _tidy_modes(counts: pd.DataFrame) -> pd.DataFrame:
+        """Most frequent category per question (smallest category on ties, as Series.mode())"""
+        ranked = counts.sort_values(['question_id', 'value', 'category'], ascending=[True, False, True])
+        modes = ranked.drop_duplicates('question_id')
+        return pd.DataFrame({'question_id': modes['question_id'], 'statistic': 'mode',
+                             'category': None, 'value': modes['category']})
+
+    @staticmethod
+    def _numeric_matrix(frame: pd.DataFrame) -> np.ndarray:
+        """Respondent-by-question float matrix; only non-numeric columns are coerced"""
+        matrix = np.empty(frame.shape, dtype=np.float64)
+        for position, (_, column) in enumerate(frame.items()):
+            if not pd.api.types.is_numeric_dtype(column):
+                column = pd.to_numeric(column.astype(object), errors='coerce')
+            matrix[:, position] = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        return matrix
+
+    @staticmethod
+    def _column_stats(matrix: np.ndarray, question_ids: List[str], statistics: List[str]) -> pd.DataFrame:
+        """NaN-aware column statistics computed over the whole matrix at once"""
+        reducers = {
+            'mean': lambda: np.nanmean(matrix, axis=0),
+            'median': lambda: np.nanmedian(matrix, axis=0),
+            'std': lambda: np.nanstd(matrix, axis=0, ddof=1),
+            'min': lambda: np.nanmin(matrix, axis=0),
+            'max': lambda: np.nanmax(matrix, axis=0),
+            'count': lambda: np.count_nonzero(~np.isnan(matrix), axis=0),
+        }
+        with warnings.catch_warnings():
+            # Unanswered questions reduce to NaN, as Series.mean() does
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return pd.DataFrame({statistic: reducers[statistic]() for statistic in statistics},
+                                index=question_ids).T
+
+    def _summarize_numerical(self, frame: pd.DataFrame) -> pd.DataFrame:
+        matrix = self._numeric_matrix(frame)
+        stats = self._column_stats(matrix, list(frame.columns), ['mean', 'median', 'std', 'min', 'max', 'count'])
+        return self._tidy_stats(stats)
+
+    def _summarize_likert(self, frame: pd.DataFrame) -> pd.DataFrame:
+        matrix = self._numeric_matrix(frame)
+        stats = self._tidy_stats(self._column_stats(matrix, list(frame.columns), ['mean', 'median', 'std']))
+        long = pd.DataFrame({'question_id': np.repeat(frame.columns.to_numpy(dtype=object), len(frame)),
+                             'category': matrix.T.ravel()}).dropna()
+        counts = long.value_counts(['question_id', 'category'], sort=False).rename('value').reset_index()
+        distribution = counts.assign(statistic='distribution')
+        return pd.concat([stats, self._tidy_modes(counts), distribution], ignore_index=True)
+
+    def _summarize_categorical(self, frame: pd.DataFrame) -> pd.DataFrame:
+        counts = self._tidy_counts(frame)
+        answered = frame.count()
+        percentages = counts.assign(
+            statistic='percentage',
+            value=counts['value'] / counts['question_id'].map(answered).to_numpy() * 100)
+        return pd.concat([counts.assign(statistic='count'), percentages, self._tidy_modes(counts)],
+                         ignore_index=True)
+
+    def _summarize_text(self, frame: pd.DataFrame) -> pd.DataFrame:
+        long = self._long(frame, 'text').dropna()
+        long['text'] = long['text'].astype(str)
+        grouped = long.assign(length=long['text'].str.len()).groupby('question_id', sort=False)
+        stats = pd.DataFrame({
+            'response_count': grouped['text'].count(),
+            'unique_responses': grouped['text'].nunique(),
+            'avg_length': grouped['length'].mean(),
+        }).T
+        samples = long.drop_duplicates(['question_id', 'text']).groupby('question_id', sort=False).head(5)
+        samples = pd.DataFrame({'question_id': samples['question_id'], 'statistic': 'sample_response',
+                                'category': None, 'value': samples['text']})
+        return pd.concat([self._tidy_stats(stats), samples], ignore_index=True)
+
     def _analyze_likert(self, series: pd.Series) -> Dict[str, Any]:
         """Analyze Likert scale responses"""
         return {
@@ -192,9 +565,13 @@ class ResponseAnalyzer:
         }
         
     def _analyze_categorical(self, series: pd.Series) -> Dict[str, Any]:
-        """Analyze categorical/multiple choice responses"""
+        """Analyze categorical/multiple choice responses. Multi-select lists count once per chosen
+        option, with percentages of the respondents who answered, as in summarize()."""
+        answered = series.count()
+        if series.dtype == object and series.map(type).eq(list).any():
+            series = series.explode()
         counts = series.value_counts()
-        percentages = series.value_counts(normalize=True) * 100
+        percentages = counts / answered * 100
         return {
             'counts': counts.to_dict(),
             'percentages': percentages.to_dict(),
@@ -204,8 +581,7 @@ class ResponseAnalyzer:
     def plot_question(self, question_id: str, plot_type: str = 'auto', 
                      title: Optional[str] = None, **kwargs) -> None:
         """Create visualization for question responses"""
-        if self.df is None:
-            self.create_dataframe()
+        self.create_dataframe()
             
         question = self._find_question(question_id)
         data = self.df[question_id]
@@ -225,11 +601,7 @@ class ResponseAnalyzer:
 
     def _find_question(self, question_id: str) -> 'Question':
         """Find a question by its ID across all blocks"""
-        for block in self.survey.blocks:
-            for question in block.questions:
-                if question.question_id == question_id:
-                    return question
-        raise ValueError(f"Question {question_id} not found")
+        return self.survey.get_question(question_id)
 
     def _analyze_numerical(self, series: pd.Series) -> Dict[str, Any]:
         """Analyze numerical responses"""
@@ -239,15 +611,15 @@ class ResponseAnalyzer:
             'std': series.std(),
             'min': series.min(),
             'max': series.max(),
-            'count': len(series)
+            'count': series.count()
         }
 
     def _analyze_text(self, series: pd.Series) -> Dict[str, Any]:
         """Analyze text responses"""
         # Count number of responses
         response_count = series.count()
-        # Get unique responses
-        unique_responses = series.unique().tolist()
+        # Get unique answers; missing ones are left out so the result only depends on answered slots
+        unique_responses = series.dropna().unique().tolist()
         # Calculate average response length
         avg_length = series.str.len().mean()
         
@@ -260,23 +632,29 @@ class ResponseAnalyzer:
 
     def analyze_text_responses(self, question_id: str) -> Dict[str, Any]:
         """Analyze open-ended text responses"""
-        if self.df is None:
-            self.create_dataframe()
+        self.create_dataframe()
             
         if question_id not in self.df.columns:
             raise ValueError(f"Question {question_id} not found in responses")
             
         return self._analyze_text(self.df[question_id])
 
-    def calculate_correlations(self, question_ids: List[str]) -> pd.DataFrame:
-        """Calculate correlations between specified questions"""
-        if self.df is None:
-            self.create_dataframe()
+    def calculate_correlations(self, question_ids: List[str], method: str = 'pearson') -> pd.DataFrame:
+        """Calculate correlations between specified questions ('pearson', 'spearman' or 'polychoric').
+        Scale and Likert questions come from an incrementally updated CorrelationEngine over just
+        these questions; other questions fall back to coercing the materialized frame."""
+        self.create_dataframe()
+        
+        types = {self._find_question(question_id).question_type for question_id in question_ids}
+        if types <= ({'likert_scale'} if method in ('spearman', 'polychoric') else {'likert_scale', 'scale'}):
+            return self.survey.correlation_engine(question_ids).correlation(question_ids, method)
+        if method == 'polychoric':
+            raise ValueError("Polychoric correlations are only available for Likert questions")
             
         # Filter numeric columns only
         numeric_data = self.df[question_ids].apply(pd.to_numeric, errors='coerce')
         
-        return numeric_data.corr()
+        return numeric_data.corr(method=method)
 
 @dataclass
 class Block:
@@ -288,9 +666,17 @@ class Block:
         self.block_id = block_id
         self.title = title
         self.questions = []
+        self._surveys: List[SurveyCollector] = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_surveys'] = []  # Surveys register themselves again in add_block()
+        return state
 
     def add_question(self, question):
         self.questions.append(question)
+        for survey in self._surveys:
+            survey._index_question(question)
 
 @dataclass
 class Question:
@@ -298,294 +684,1373 @@ class Question:
     question_text: str
     question_type: str
     options: List[str] = None
+    required: bool = False
+    statements: List[str] = None  # Matrix rows rated on the same options, answered under one id
+    multi_select: bool = False  # Multiple choice answered with a list of options ("check all that apply")
 
     def validate_response(self, response):
-        if self.question_type == 'multiple_choice':
-            if isinstance(response, list):
-                if not all(r in self.options for r in response):
-                    raise ValueError(f"Invalid response for question: {self.question_text}. Must be one of {self.options}")
-            elif response not in self.options:
-                raise ValueError(f"Invalid response for question: {self.question_text}. Must be one of {self.options}")
-        elif self.question_type == 'open_ended':
-            if not response:
-                raise ValueError(f"Response cannot be empty for question: {self.question_text}")
-        elif self.question_type == 'likert_scale' or self.question_type == 'scale':
-            if not isinstance(response, int) or response < 0 or response > 10:  # Adjust range as needed
-                raise ValueError(f"Response must be an integer between 0 and 10 for question: {self.question_text}")
+        """Check one answer by the same rules as ValidationPlan; raises ValueError if it fails"""
+        plan = ValidationPlan([self])
+        code = plan.check({self.question_id: response}).get(self.question_id, 0)
+        if not code:
+            return True
+        if self.question_id in plan.options:
+            hint = f"Must be one of {self.options}"
+        elif self.question_id in plan.ranges:
+            low, high = plan.ranges[self.question_id]
+            hint = f"Must be a whole number between {low} and {high}"
+        else:
+            hint = "Must be non-empty text or a number"
+        raise ValueError(f"Invalid response for question: {self.question_text} ({', '.join(plan.describe(code))}). {hint}")
+
+    OPTION_CODE = re.compile(r'\((\d+)\)\s*$|^\s*(\d+)(?:\s|$)')  # "Agree (4)" / "4 (Probably is)"
+
+    def option_codes(self) -> List[int]:
+        """Answer codes of the options: the number carried in the label, else the 1-based position"""
+        codes = []
+        for position, option in enumerate(self.options or [], start=1):
+            match = self.OPTION_CODE.search(option)
+            codes.append(int(match.group(1) or match.group(2)) if match else position)
+        return codes
+
+class ValidationPlan:
+    """Survey validation rules compiled once: a frozenset of options per multiple-choice question,
+    an integer range for Likert and scale questions, and the list of required questions.
+    Errors are reported as bit flags per question (0 = valid) and OR-ed together per response.
+    Compile a new plan after changing a question's options or required flag.
+
+    check() (one response) and question_errors() (a batch) apply the same rules:
+
+    - None, NaN and NA mean unanswered, as in the response store. Only MISSING_REQUIRED applies.
+    - Multiple choice: one of the options, or a list of them.
+    - Likert and scale: a whole number between the lowest and highest option code (scale_range
+      when the question lists no options). Whole-valued floats count, since frames hold integer
+      answers with gaps as float64. Booleans do not.
+    - Open-ended: a string or number (INVALID_TYPE for booleans, lists, dicts and other values),
+      and not blank (EMPTY)."""
+    INVALID_OPTION = 1
+    EMPTY = 2
+    NOT_INTEGER = 4
+    OUT_OF_RANGE = 8
+    MISSING_REQUIRED = 16
+    INVALID_TYPE = 32
+    ERROR_NAMES = {
+        INVALID_OPTION: 'invalid option',
+        EMPTY: 'empty response',
+        NOT_INTEGER: 'not an integer',
+        OUT_OF_RANGE: 'out of range',
+        MISSING_REQUIRED: 'missing required answer',
+        INVALID_TYPE: 'invalid type',
+    }
+
+    def __init__(self, questions: Iterable['Question'], scale_range: tuple = (0, 10)):
+        self.options: Dict[str, frozenset] = {}
+        self.ranges: Dict[str, tuple] = {}  # Likert/scale question id -> (lowest, highest) code
+        self.open_ended: set = set()
+        self.required: List[str] = []
+        for question in questions:
+            question_id = question.question_id
+            if question.question_type == 'multiple_choice':
+                self.options[question_id] = frozenset(question.options or ())
+            elif question.question_type in ('likert_scale', 'scale'):
+                codes = question.option_codes()
+                self.ranges[question_id] = (min(codes), max(codes)) if codes else tuple(scale_range)
+            elif question.question_type == 'open_ended':
+                self.open_ended.add(question_id)
+            if question.required:
+                self.required.append(question_id)
+
+    @classmethod
+    def describe(cls, code: int) -> List[str]:
+        """Names of the error flags set in ``code``"""
+        return [name for flag, name in cls.ERROR_NAMES.items() if code & flag]
+
+    # Single answers
+
+    @staticmethod
+    def is_missing(answer: Any) -> bool:
+        return answer is None or answer is pd.NA or (isinstance(answer, (float, np.floating)) and answer != answer)
+
+    @staticmethod
+    def _contains(allowed: frozenset, answer: Any) -> bool:
+        try:
+            if isinstance(answer, list):
+                return allowed.issuperset(answer)
+            return answer in allowed
+        except TypeError:  # Unhashable answers are never valid options
+            return False
+
+    @staticmethod
+    def _whole_number(answer: Any) -> Optional[float]:
+        """The answer as a float when it is a whole number (not a boolean), else None"""
+        if isinstance(answer, (bool, np.bool_)) or not isinstance(answer, (int, float, np.integer, np.floating)):
+            return None
+        value = float(answer)
+        return value if value.is_integer() else None
+
+    def _scale_code(self, question_id: str, answer: Any) -> int:
+        value = self._whole_number(answer)
+        if value is None:
+            return self.NOT_INTEGER
+        low, high = self.ranges[question_id]
+        return self.OUT_OF_RANGE if value < low or value > high else 0
+
+    def _text_code(self, answer: Any) -> int:
+        if isinstance(answer, str):
+            return 0 if answer.strip() else self.EMPTY
+        if isinstance(answer, (bool, np.bool_)) or not isinstance(answer, (int, float, np.integer, np.floating)):
+            return self.INVALID_TYPE
+        return 0
+
+    def check(self, response: Dict[str, Any]) -> Dict[str, int]:
+        """Error code per failing question of one response; empty when the response is valid"""
+        errors = {}
+        for question_id, answer in response.items():
+            if self.is_missing(answer):
+                continue
+            allowed = self.options.get(question_id)
+            if allowed is not None:
+                code = 0 if self._contains(allowed, answer) else self.INVALID_OPTION
+            elif question_id in self.ranges:
+                code = self._scale_code(question_id, answer)
+            elif question_id in self.open_ended:
+                code = self._text_code(answer)
+            else:
+                continue
+            if code:
+                errors[question_id] = code
+        for question_id in self.required:
+            if self.is_missing(response.get(question_id)):
+                errors[question_id] = errors.get(question_id, 0) | self.MISSING_REQUIRED
+        return errors
+
+    def validate(self, response: Dict[str, Any]) -> int:
+        """OR of the error codes of one response (0 = valid)"""
+        code = 0
+        for question_code in self.check(response).values():
+            code |= question_code
+        return code
+
+    # Batches
+
+    def question_errors(self, data: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
+        """Error codes (uint8) for a batch of responses, one column per checked question, by the
+        same rules as check()"""
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        codes: Dict[str, np.ndarray] = {}
+        for question_id in df.columns:
+            series = df[question_id]
+            allowed = self.options.get(question_id)
+            if allowed is not None:
+                codes[question_id] = self._choice_errors(series, allowed)
+            elif question_id in self.ranges:
+                codes[question_id] = self._scale_errors(series, *self.ranges[question_id])
+            elif question_id in self.open_ended:
+                codes[question_id] = self._text_errors(series)
+        for question_id in self.required:
+            if question_id in df.columns:
+                missing = df[question_id].isna().to_numpy()
+            else:
+                missing = np.ones(len(df), dtype=bool)
+            code = codes.get(question_id, np.zeros(len(df), dtype=np.uint8))
+            codes[question_id] = code | (missing * np.uint8(self.MISSING_REQUIRED)).astype(np.uint8)
+        return pd.DataFrame(codes, index=df.index, columns=list(codes))
+
+    def validate_batch(self, data: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.Series:
+        """OR of the error codes per response (0 = valid) for a list of responses or a DataFrame"""
+        errors = self.question_errors(data)
+        if errors.columns.empty:
+            return pd.Series(np.zeros(len(errors), dtype=np.uint8), index=errors.index, name='error_code')
+        return pd.Series(np.bitwise_or.reduce(errors.to_numpy(), axis=1), index=errors.index, name='error_code')
+
+    def _choice_errors(self, series: pd.Series, allowed: frozenset) -> np.ndarray:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Check each category once, then look the codes up (-1, missing, maps to the trailing True)
+            valid = np.fromiter((self._contains(allowed, category) for category in series.cat.categories),
+                                dtype=bool, count=len(series.cat.categories))
+            ok = np.append(valid, True)[series.array.codes]
+        else:
+            ok = series.isna().to_numpy() | series.isin(list(allowed)).to_numpy()
+            values = series.to_numpy(dtype=object)
+            rest = np.flatnonzero(~ok)
+            ok[rest] = [self._contains(allowed, values[index]) for index in rest]
+        return (~ok * np.uint8(self.INVALID_OPTION)).astype(np.uint8)
+
+    def _scale_errors(self, series: pd.Series, low: float, high: float) -> np.ndarray:
+        present = ~series.isna().to_numpy()
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            with np.errstate(invalid='ignore'):
+                not_integer = present & ~(np.isfinite(values) & (values == np.floor(values)))
+        else:
+            # Mixed column: judge each answer as check() does
+            objects = series.to_numpy(dtype=object)
+            values = np.full(len(objects), np.nan)
+            not_integer = np.zeros(len(objects), dtype=bool)
+            for index in np.flatnonzero(present):
+                value = self._whole_number(objects[index])
+                if value is None:
+                    not_integer[index] = True
+                else:
+                    values[index] = value
+        with np.errstate(invalid='ignore'):
+            out_of_range = present & ~not_integer & ((values < low) | (values > high))
+        return (not_integer * np.uint8(self.NOT_INTEGER) | out_of_range * np.uint8(self.OUT_OF_RANGE)).astype(np.uint8)
+
+    def _text_errors(self, series: pd.Series) -> np.ndarray:
+        codes = np.zeros(len(series), dtype=np.uint8)
+        present = np.flatnonzero(~series.isna().to_numpy())
+        if pd.api.types.is_string_dtype(series.dtype) and not series.dtype == object:
+            blank = series.str.strip().eq('').to_numpy(dtype=bool, na_value=False)
+            codes[blank] = self.EMPTY
+            return codes
+        values = series.to_numpy(dtype=object)
+        codes[present] = [self._text_code(values[index]) for index in present]
+        return codes
+
+class QuestionAggregate:
+    """Running summary of one question's answers, updated per collected response"""
+    __slots__ = ()
+
+    @staticmethod
+    def for_answer(answer: Any) -> 'QuestionAggregate':
+        """Pick the aggregate type from the first answer seen for a question"""
+        if isinstance(answer, list):  # For multi-select questions
+            return MultiSelectAggregate()
+        if isinstance(answer, (int, float)) and not isinstance(answer, bool):  # For scale or numerical questions
+            return NumericAggregate()
+        return CategoricalAggregate()  # For single choice, open-ended and other types
+
+    def add(self, answer: Any) -> None:
+        raise NotImplementedError
+
+    def add_many(self, answers: pd.Series) -> None:
+        """Fold a column of answers in at once; missing (NA) answers are skipped"""
+        for answer in answers[answers.notna()]:
+            self.add(answer)
+
+    def merge(self, other: 'QuestionAggregate') -> None:
+        """Fold in another aggregate of the same type"""
+        raise NotImplementedError
+
+    def summary(self) -> Dict[Any, Any]:
+        raise NotImplementedError
+
+class CategoricalAggregate(QuestionAggregate):
+    """Occurrence counts for single-choice and open-ended answers.
+    A list answer counts once for each distinct option in it."""
+    __slots__ = ('counts',)
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, answer: Any) -> None:
+        if isinstance(answer, list):
+            self.counts.update(set(answer))
+        else:
+            self.counts[answer] += 1
+
+    def add_many(self, answers: pd.Series) -> None:
+        if answers.dtype == object and any(isinstance(answer, list) for answer in answers):
+            return super().add_many(answers)  # List answers count per distinct option
+        counts = answers.value_counts(dropna=True, sort=False)
+        self.counts.update({answer: int(count) for answer, count in counts.items() if count})
+
+    def merge(self, other: 'CategoricalAggregate') -> None:
+        self.counts.update(other.counts)
+
+    def summary(self) -> Dict[Any, int]:
+        return dict(self.counts)
+
+class MultiSelectAggregate(CategoricalAggregate):
+    """Per-option tallies for multi-select answers (one count per respondent choosing it)"""
+    __slots__ = ()
+
+class NumericAggregate(QuestionAggregate):
+    """Welford running mean/variance plus value counts for median and mode.
+    Non-numeric answers are ignored."""
+    __slots__ = ('count', 'mean', '_m2', 'value_counts')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.value_counts = Counter()
+
+    def add(self, answer: Any) -> None:
+        if not isinstance(answer, (int, float)) or isinstance(answer, bool) or math.isnan(answer):
+            return
+        self.count += 1
+        delta = answer - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (answer - self.mean)
+        self.value_counts[answer] += 1
+
+    def add_many(self, answers: pd.Series) -> None:
+        if not pd.api.types.is_numeric_dtype(answers.dtype) or pd.api.types.is_bool_dtype(answers.dtype):
+            return super().add_many(answers)
+        values = answers.to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        batch = NumericAggregate()
+        batch.count, batch.mean = len(values), float(values.mean())
+        batch._m2 = float(((values - batch.mean) ** 2).sum())
+        unique, counts = np.unique(values, return_counts=True)
+        if np.array_equal(unique, np.floor(unique)):
+            unique = unique.astype(np.int64)
+        batch.value_counts.update(dict(zip(unique.tolist(), counts.tolist())))
+        self.merge(batch)
+
+    def merge(self, other: 'NumericAggregate') -> None:
+        """Chan et al. merge of the other mean and M2 into the running ones"""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.value_counts.update(other.value_counts)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def median(self) -> Optional[float]:
+        if not self.count:
+            return None
+        lower_rank, upper_rank = (self.count - 1) // 2, self.count // 2
+        seen = 0
+        lower = None
+        for value in sorted(self.value_counts):
+            seen += self.value_counts[value]
+            if lower is None and seen > lower_rank:
+                lower = value
+            if seen > upper_rank:
+                return value if lower == value else (lower + value) / 2
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'mean': self.mean if self.count else None,
+            'median': self.median(),
+            'mode': self.value_counts.most_common(1)[0][0] if self.count else None,
+            'count': self.count,
+            'variance': self.variance,
+            'std': math.sqrt(self.variance)
+        }
+
+MISSING = object()  # Marks a respondent who did not answer a question
+
+class ResponseColumn:
+    """One question's answers stored column-wise, one slot per collected response.
+    ``version`` counts answered (non-missing) slots, so it changes only when the data does."""
+    __slots__ = ('length', 'version')
+
+    def __init__(self):
+        self.length = 0
+        self.version = 0
+
+    @staticmethod
+    def for_question(question: Optional['Question'], value: Any) -> 'ResponseColumn':
+        """Pick the column type from the question definition, or from the first answer if undefined"""
+        if question is not None:
+            if question.question_type in ('likert_scale', 'scale'):
+                return NumericColumn()
+            if question.question_type == 'multiple_choice':
+                if question.multi_select or isinstance(value, list):
+                    return MultiSelectColumn(question.options)
+                return CategoricalColumn(question.options)
+            return ObjectColumn()
+        if isinstance(value, list):
+            return MultiSelectColumn()
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return NumericColumn()
+        return ObjectColumn()
+
+    def append(self, value: Any) -> None:
+        """Store one answer; raises TypeError if the column cannot hold it"""
+        raise NotImplementedError
+
+    def append_missing(self, count: int = 1) -> None:
+        raise NotImplementedError
+
+    def truncate(self, length: int) -> None:
+        """Drop the slots from ``length`` on (the rows of a batch being rolled back)"""
+        raise NotImplementedError
+
+    def extend(self, answers: pd.Series) -> bool:
+        """Append a whole column of answers (NA = missing) at once. Returns False, having appended
+        nothing, when the answers need the per-answer path instead."""
+        return False
+
+    def get(self, index: int) -> Any:
+        """Answer at ``index``, or MISSING"""
+        raise NotImplementedError
+
+    def to_series(self, name: str, start: int = 0) -> pd.Series:
+        raise NotImplementedError
+
+    def promote(self, value: Any) -> 'ResponseColumn':
+        """Copy into a column type that can also hold ``value``"""
+        column = ObjectColumn()
+        for index in range(self.length):
+            answer = self.get(index)
+            column.append_missing() if answer is MISSING else column.append(answer)
+        column.version = self.version
+        return column
+
+class ArrayColumn(ResponseColumn):
+    """Column over a growable numpy buffer. Only slots past ``length`` are ever written,
+    so views handed out by to_series() stay valid while more responses arrive."""
+    __slots__ = ('_data',)
+    dtype = None
+    missing_value = None
+
+    def __init__(self):
+        super().__init__()
+        self._data = np.empty(16, dtype=self.dtype)
+
+    def _reserve(self, count: int) -> None:
+        needed = self.length + count
+        if needed > len(self._data):
+            data = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            data[:self.length] = self._data[:self.length]
+            self._data = data
+
+    def _push(self, value: Any) -> None:
+        self._reserve(1)
+        self._data[self.length] = value
+        self.length += 1
+
+    def append_missing(self, count: int = 1) -> None:
+        self._reserve(count)
+        self._data[self.length:self.length + count] = self.missing_value
+        self.length += count
+
+    def truncate(self, length: int) -> None:
+        self.length = min(length, self.length)
+
+    def view(self, start: int = 0) -> np.ndarray:
+        return self._data[start:self.length]
+
+class NumericColumn(ArrayColumn):
+    """float64 values for scale and Likert answers, NaN when missing"""
+    __slots__ = ('integral',)
+    dtype = np.float64
+    missing_value = np.nan
+
+    def __init__(self):
+        super().__init__()
+        self.integral = True
+
+    def append(self, value: Any) -> None:
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise TypeError(f"Non-numeric answer {value!r}")
+        if isinstance(value, float) and not value.is_integer():
+            self.integral = False
+        self._push(value)
+
+    def extend(self, answers: pd.Series) -> bool:
+        if not pd.api.types.is_numeric_dtype(answers.dtype) or pd.api.types.is_bool_dtype(answers.dtype):
+            return False
+        values = answers.to_numpy(dtype=np.float64, na_value=np.nan)
+        present = values[~np.isnan(values)]
+        if not np.array_equal(present, np.floor(present)):
+            self.integral = False
+        self._reserve(len(values))
+        self._data[self.length:self.length + len(values)] = values
+        self.length += len(values)
+        return True
+
+    def truncate(self, length: int) -> None:
+        super().truncate(length)
+        if not self.integral:
+            values = self.view()
+            values = values[~np.isnan(values)]
+            self.integral = bool(np.array_equal(values, np.floor(values)))
+
+    def get(self, index: int) -> Any:
+        value = self._data[index]
+        if np.isnan(value):
+            return MISSING
+        return int(value) if self.integral else float(value)
+
+    def to_series(self, name: str, start: int = 0) -> pd.Series:
+        return pd.Series(self.view(start), index=pd.RangeIndex(start, self.length), name=name, copy=False)
+
+class CategoricalColumn(ArrayColumn):
+    """Integer codes into ``categories`` (seeded from Question.options), -1 when missing.
+    Codes use the narrowest dtype pandas would pick, so Categorical views share the buffer."""
+    __slots__ = ('categories', '_lookup')
+    dtype = np.int8
+    missing_value = -1
+
+    def __init__(self, options: Optional[List[Any]] = None):
+        super().__init__()
+        self.categories: List[Any] = []
+        self._lookup: Dict[Any, int] = {}
+        for option in options or []:
+            self._add_category(option)
+
+    def _add_category(self, value: Any) -> int:
+        code = self._lookup[value] = len(self.categories)
+        self.categories.append(value)
+        if len(self.categories) >= np.iinfo(self._data.dtype).max:
+            wider = np.int16 if self._data.dtype == np.int8 else np.int32
+            self._data = self._data.astype(wider)
+        return code
+
+    def append(self, value: Any) -> None:
+        code = self._lookup.get(value)  # TypeError for unhashable answers such as lists
+        if code is None:
+            code = self._add_category(value)
+        self._push(code)
+
+    def extend(self, answers: pd.Series) -> bool:
+        if not isinstance(answers.dtype, pd.CategoricalDtype):
+            return False
+        codes = answers.array.codes
+        used = np.unique(codes[codes >= 0])
+        # Translate the batch's codes into this column's, adding only categories that occur
+        recode = np.full(len(answers.cat.categories) + 1, -1, dtype=np.int64)
+        for code in used:
+            value = answers.cat.categories[code]
+            own = self._lookup.get(value)
+            recode[code] = self._add_category(value) if own is None else own
+        self._reserve(len(codes))
+        self._data[self.length:self.length + len(codes)] = recode[codes]
+        self.length += len(codes)
+        return True
+
+    def get(self, index: int) -> Any:
+        code = self._data[index]
+        return MISSING if code < 0 else self.categories[code]
+
+    def to_series(self, name: str, start: int = 0) -> pd.Series:
+        values = pd.Categorical.from_codes(self.view(start), categories=self.categories)
+        return pd.Series(values, index=pd.RangeIndex(start, self.length), name=name, copy=False)
+
+    def promote(self, value: Any) -> ResponseColumn:
+        if not isinstance(value, list):
+            return super().promote(value)
+        column = MultiSelectColumn(self.categories)
+        for index in range(self.length):
+            answer = self.get(index)
+            column.append_missing() if answer is MISSING else column.append([answer])
+        column.version = self.version
+        return column
+
+class MultiSelectColumn(ArrayColumn):
+    """Bitset per response over ``options`` (bit i set when option i was chosen).
+    Uses uint64 words up to 63 options, with the top bit marking a missing answer,
+    and Python ints in an object array beyond that."""
+    __slots__ = ('options', '_lookup', '_decoded')
+    dtype = np.uint64
+    missing_value = np.uint64(1 << 63)
+
+    def __init__(self, options: Optional[List[Any]] = None):
+        super().__init__()
+        self.options: List[Any] = []
+        self._lookup: Dict[Any, int] = {}
+        self._decoded = ObjectColumn()  # Option lists decoded so far, extended on demand
+        for option in options or []:
+            self._add_option(option)
+
+    @property
+    def _missing(self) -> Any:
+        return None if self._data.dtype == object else self.missing_value
+
+    def _add_option(self, value: Any) -> int:
+        code = self._lookup[value] = len(self.options)
+        self.options.append(value)
+        if len(self.options) == 64 and self._data.dtype != object:
+            words = self._data[:self.length]
+            data = np.empty(len(self._data), dtype=object)
+            data[:self.length] = [None if word == self.missing_value else int(word) for word in words]
+            self._data = data
+        return code
+
+    def append(self, value: Any) -> None:
+        if isinstance(value, str):
+            value = [value]
+        elif not isinstance(value, list):
+            raise TypeError(f"Non-list answer {value!r}")
+        bits = 0
+        for option in value:
+            code = self._lookup.get(option)
+            if code is None:
+                code = self._add_option(option)
+            bits |= 1 << code
+        self._push(bits)
+
+    def append_missing(self, count: int = 1) -> None:
+        self._reserve(count)
+        self._data[self.length:self.length + count] = self._missing
+        self.length += count
+
+    def truncate(self, length: int) -> None:
+        super().truncate(length)
+        self._decoded.truncate(length)
+
+    def get(self, index: int) -> Any:
+        bits = self._data[index]
+        if bits is None or (self._data.dtype != object and bits == self.missing_value):
+            return MISSING
+        bits = int(bits)
+        return [option for code, option in enumerate(self.options) if bits >> code & 1]
+
+    def to_series(self, name: str, start: int = 0) -> pd.Series:
+        decoded = self._decoded
+        for index in range(decoded.length, self.length):
+            answer = self.get(index)
+            decoded.append_missing() if answer is MISSING else decoded.append(answer)
+        return decoded.to_series(name, start)
+
+    def to_indicator_frame(self, start: int = 0) -> pd.DataFrame:
+        """One nullable boolean column per option, decoded from the bitsets without building lists"""
+        index = pd.RangeIndex(start, self.length)
+        words = self.view(start)
+        if words.dtype == object:
+            missing = np.array([word is None for word in words], dtype=bool)
+            words = [0 if word is None else word for word in words]
+            chosen = lambda code: np.array([word >> code & 1 for word in words], dtype=bool)
+        else:
+            missing = words == self.missing_value
+            chosen = lambda code: (words >> np.uint64(code) & np.uint64(1)).astype(bool)
+        frame = {option: pd.arrays.BooleanArray(chosen(code), missing.copy())
+                 for code, option in enumerate(self.options)}
+        return pd.DataFrame(frame, index=index)
+
+class ObjectColumn(ArrayColumn):
+    """Python objects in an object-dtype buffer, for open-ended answers and anything the
+    typed columns cannot hold. A None answer is treated as missing."""
+    __slots__ = ()
+    dtype = object
+    missing_value = None
+
+    def append(self, value: Any) -> None:
+        self._push(value)
+
+    def truncate(self, length: int) -> None:
+        self._data[length:self.length] = None  # Release the dropped answers
+        super().truncate(length)
+
+    def extend(self, answers: pd.Series) -> bool:
+        values = answers.to_numpy(dtype=object, copy=True)
+        values[answers.isna().to_numpy()] = None
+        self._reserve(len(values))
+        self._data[self.length:self.length + len(values)] = values
+        self.length += len(values)
         return True
 
-# Creating blocks and questions
-
-# Demographics Block
-demographics = Block("Demographics", "Demographics")
-demographics.add_question(Question("Age", "What is your age?", "open_ended"))
-demographics.add_question(Question("Year", "What year are you in college?", "multiple_choice", 
-                                   ["First Year (1)", "Sophomore (2)", "Junior (3)", "Senior (4)", "5+ Years (5)"]))
-demographics.add_question(Question("Ethnicity", "Are you of Spanish, Hispanic, or Latino origin?", "multiple_choice", 
-                                   ["Yes (1)", "No (2)"]))
-demographics.add_question(Question("Race", "Choose one or more races that you consider yourself to be", "multiple_choice", 
-                                   ["White or Caucasian (1)", "Black or African American (2)", 
-                                    "American Indian/Native American or Alaska Native (3)", "Asian (4)", 
-                                    "Native Hawaiian or Other Pacific Islander (5)", "Other (6)", 
-                                    "Prefer not to say (7)"]))
-demographics.add_question(Question("Household_Income", "What was your total household income before taxes during the past 12 months?", "multiple_choice", 
-                                   ["Less than $25,000 (1)", "$25,000-$49,999 (2)", "$50,000-$74,999 (3)", 
-                                    "$75,000-$99,999 (4)", "$100,000-$149,999 (5)", "$150,000 or more (6)", 
-                                    "Prefer not to say (7)"]))
-
-# Political Demographics Block
-demographics_political = Block("Demographics Political", "Political Views and Affiliation")
-demographics_political.add_question(Question("Election", "Do you plan to vote in the upcoming 2024 election?", "multiple_choice", 
-                                             ["Yes (1)", "No (2)"]))
-demographics_political.add_question(Question("Party_Affiliation", "Generally speaking, do you usually think of yourself as a Republican, a Democrat, an Independent, or something else?", "multiple_choice", 
-                                             ["Republican (1)", "Democrat (2)", "Independent (3)", "Other (4)", "No preference (5)"]))
-demographics_political.add_question(Question("R_Strength", "Would you call yourself a strong Republican or a not very strong Republican?", "multiple_choice", 
-                                             ["Strong (1)", "Not very strong (2)"]))
-demographics_political.add_question(Question("D_Strength", "Would you call yourself a strong Democrat or a not very strong Democrat?", "multiple_choice", 
-                                             ["Strong (1)", "Not very strong (2)"]))
-demographics_political.add_question(Question("Independent_Lean", "Do you think of yourself as closer to the Republican or Democratic party?", "multiple_choice", 
-                                             ["Republican (1)", "Democratic (2)"]))
-demographics_political.add_question(Question("Political_Views", "Here is a 7-point scale on which the political views that people might hold are arranged from extremely liberal (left) to extremely conservative (right). Where would you place yourself on this scale?", "scale", 
-                                             ["0", "1", "2", "3", "4", "5", "6", "7"]))
-demographics_political.add_question(Question("Party_Registration", "What political party are you registered with, if any?", "multiple_choice", 
-                                             ["Republican (1)", "Democratic (2)", "Independent (3)", "Other (4)", "None (5)"]))
-
-# Personal Political Characteristics Block
-personal_political = Block("Personal Political Characteristics", "Political Efficacy and Participation")
-personal_political.add_question(Question("P_Efficacy", "For each question below, please choose the response that best reflects how you feel.", "likert_scale", 
-                                        ["Strongly Disagree (1)", "Somewhat disagree (2)", "Neither agree nor disagree (3)", "Somewhat agree (4)", "Strongly agree (5)"]))
-personal_political.add_question(Question("P_Knowledge_Intro", "Here are a few questions about the federal government. Many people don't know the answers to these questions, so if there are some you don't know, just provide your best guess.", "intro"))
-personal_political.add_question(Question("P_Knowledge_1", "Do you happen to know what job or political office is now held by Kamala Harris?", "open_ended"))
-personal_political.add_question(Question("P_Knowledge_2", "Whose responsibility is it to determine if a law is constitutional or not? Is it the president, the Congress, or the Supreme Court?", "multiple_choice", 
-                                       ["President", "Congress", "Supreme Court"]))
-personal_political.add_question(Question("P_Knowledge_3", "How much of a majority is required for the U.S. Senate and House to override a presidential veto?", "open_ended"))
-personal_political.add_question(Question("P_Knowledge_4", "Do you happen to know which party has the most members in the House of Representatives currently?", "open_ended"))
-personal_political.add_question(Question("P_Knowledge_5", "Would you say that one of the parties is more conservative than the other at the national level? Which party is more conservative?", "open_ended"))
-
-# Perception of News Sources Block
-perception_news = Block("Perception of News Sources", "Perception of Political Information on Social Media")
-# Add all the news sources as individual questions here. For brevity, only one example is shown:
-perception_news.add_question(Question("ABC_News", "ABC News", "likert_scale", 
-                                      ["1 (Definitely not)", "2 (Probably not)", "3 (Might or might not be)", "4 (Probably is)", "5 (Definitely is)"]))
-
-# Social Media Block
-social_media = Block("Perception of Political Information on Social Media", "Media Consumption Questions")
-social_media.add_question(Question("Social_Media", "Social media as a source of political information and news is...", "likert_scale", 
-                                   ["Does not apply at all (1)", "2", "3", "4", "5", "6", "Fully Applies (7)"]))
-
-# Media Consumption Block
-media_consumption = Block("Media Consumption Questions", "Misinformation Threat")
-media_consumption.add_question(Question("News_1", "Where do you typically get your news?", "multiple_choice", 
-                                        ["Print newspapers (1)", "Television (2)", "News websites (3)", "Social media (4)", "Radio (5)", "Podcasts (6)"]))
-media_consumption.add_question(Question("News_frequency", "How often do you consume news?", "multiple_choice", 
-                                       ["Daily", "A few times a week", "Once a week", "A few times a month", "Rarely", "Never"]))
-
-# Misinformation Threat Block
-misinformation_threat = Block("Mis_Threat", "Voting Behavior")
-misinformation_threat.add_question(Question("Disinfo_threat", "On the scale from 0 to 10, where 0 means no risk and 10 means extreme risk, how would you rate the risk of disinformation campaigns to each of the following?", "scale", 
-                                            ["0 (No risk)", "1", "2", "3", "4", "5", "6", "7", "8", "9", "10 (Extreme risk)"]))
-misinformation_threat.add_question(Question("Disinfo_Res", "In your opinion, who is primarily responsible for combating disinformation?", "multiple_choice", 
-                                            ["Government", "Social Media Companies", "Educational Institutions", "News Outlets", "Individuals", "Other (Please specify)"]))
-
-# Voting Behavior Block
-voting_behavior = Block("Voting Behavior", "Trust in Government")
-voting_behavior.add_question(Question("Voted_2020", "Did you vote in the 2020 Presidential Election?", "multiple_choice", 
-                                    ["Yes (1)", "No (2)"]))
-voting_behavior.add_question(Question("Vote_Choice", "If you voted in the 2020 Presidential Election, which candidate did you vote for?", "multiple_choice", 
-                                    ["Joe Biden (1)", "Donald Trump (2)", "Another Candidate (3)", "Did not vote (4)"]))
-voting_behavior.add_question(Question("Voting_Motivation", "What were the main factors that influenced your decision to vote or not vote in the 2020 election?", "multiple_choice", 
-                                    ["Candidate policy positions (1)", "Candidate character (2)", "Party affiliation (3)", 
-                                     "Desire to influence election outcome (4)", "Civic duty (5)", "Social pressure (6)",
-                                     "Availability of time (7)", "Voter suppression concerns (8)", 
-                                     "Lack of trust in the electoral process (9)", "Other (10)"]))
-
-# Adding blocks to survey
-survey = SurveyCollector("PSY_492", "Election Experience Survey")
-survey.add_block(demographics)
-survey.add_block(demographics_political)
-survey.add_block(personal_political)
-survey.add_block(perception_news)
-survey.add_block(social_media)
-survey.add_block(media_consumption)
-survey.add_block(misinformation_threat)
-survey.add_block(voting_behavior)
-
-# Example of collecting a response
-sample_response = {
-    "Age": "23",
-    "Year": "Junior (3)",
-    "Ethnicity": "No (2)",
-    "Race": ["White or Caucasian (1)", "Other (6)"],
-    "Household_Income": "Prefer not to say (7)",
-    "Election": "Yes (1)",
-    "Party_Affiliation": "Democrat (2)",
-    "R_Strength": "Not very strong (2)",
-    "D_Strength": "Strong (1)",
-    "Independent_Lean": "Democratic (2)",
-    "Political_Views": 4,
-    "Party_Registration": "Democratic (2)",
-    "P_Efficacy": 3,
-    "P_Knowledge_1": "Vice President",
-    "P_Knowledge_2": "Supreme Court",
-    "P_Knowledge_3": "Two-thirds",
-    "P_Knowledge_4": "Democratic",
-    "P_Knowledge_5": "Republican",
-    "ABC_News": 4,
-    "Social_Media": 5,
-    "News_1": "Television (2)",
-    "News_frequency": "A few times a week",
-    "Disinfo_threat": 8,
-    "Disinfo_Res": "Social Media Companies"
-}
-
-if survey.collect_response(sample_response):
-    print("Response collected successfully")
-else:
-    print("Failed to collect response")
-
-# Process and export results
-survey.export_results()
-
-print("Here is the continuation of the **PSY 492 Election Experience Survey**:")
-
-print("**Start of Block: Voting Behavior**")
-
-print("Voted_2020 Did you vote in the 2020 Presidential Election?")
-
-print("- Yes (1)")
-print("- No (2)")
-
-print("Vote_Choice If you voted in the 2020 Presidential Election, which candidate did you vote for?")
-
-print("- Joe Biden (1)")
-print("- Donald Trump (2)")
-print("- Another Candidate (3) ______________________________________________________________")
-print("- Did not vote (4)")
-
-print("Voting_Motivation What were the main factors that influenced your decision to vote or not vote in the 2020 election? (Check all that apply)")
-
-print("Voting_Motivation What were the main factors that influenced your decision to vote or not vote in the 2020 election? (Check all that apply)")
-print("- [ ] Candidate policy positions (1)")
-print("- [ ] validate character (2)")
-print("- [ ] Party affiliation (3)")
-print("- [ ] Desire to influence election outcome (4)")
-print("- [ ] Civic duty (5)")
-print("- [ ] Social pressure (6)")
-print("- [ ] Availability of time (7)")
-print("- [ ] Voter suppression concerns (8)")
-print("- [ ] Lack of trust in the electoral process (9)")
-print("- [ ] Other (10) ______________________________________________________________")
-
-print("Election_Outcome How satisfied were you with the outcome of the 2020 Presidential Election?")
-print("- Extremely dissatisfied (1)")
-print("- Somewhat dissatisfied (2)")
-print("- Neither satisfied nor dissatisfied (3)")
-print("- Somewhat satisfied (4)")
-print("- Extremely satisfied (5)")
-
-print("Voting_2024 If you plan to vote in the upcoming 2024 election, what issues will be most important to you when deciding whom to vote for? (Please list in order of importance)")
-print("1. ______________________________________________________________")
-print("2. ______________________________________________________________")
-print("3. ______________________________________________________________")
-
-print("**End of Block: Voting Behavior**")
-
-print("**Start of Block: Political Efficacy and Participation**")
-
-print("Political_Efficacy On a scale from 1 to 7, where 1 means 'Not at all effective' and 7 means 'Extremely effective,' how effective do you feel your vote is in influencing political change?")
-print("- 1 (Not at all effective) (1)")
-print("- 2 (2)")
-print("- 3 (3)")
-print("- 4 (4)")
-print("- 5 (5)")
-print("- 6 (6)")
-print("- 7 (Extremely effective) (7)")
-
-print("Political_Activism Have you engaged in any of the following political activities in the last 12 months? (Check all that apply)")
-print("- [ ] Attended a political rally or protest (1)")
-print("- [ ] Volunteered for a political campaign (2)")
-print("- [ ] Made political donations (3)")
-print("- [ ] Contacted a public official (4)")
-print("- [ ] Signed a political petition (5)")
-print("- [ ] Discussed politics with friends or family (6)")
-print("- [ ] None of the above (7)")
-
-print("Volunteer_Why If you have volunteered for a political campaign or cause, what motivated you to do so?")
-print("- ______________________________________________________________")
-
-print("**End of Block: Political Efficacy and Participation**")
-
-print("**Start of Block: Trust in Government**")
-
-print("Trust_Government Please rate your level of trust in the following government institutions on a scale from 1 (No trust at all) to 5 (Complete trust):")
-print("- Executive branch (President and administration)")
-print("  - 1 (1)")
-print("  - 2 (2)")
-print("  - 3 (3)")
-print("  - 4 (4)")
-print("  - 5 (Complete trust) (5)")
-
-print("- Legislative branch (Congress)")
-print("  - 1 (1)")
-print("  - 2 (2)")
-print("  - 3 (3)")
-print("  - 4 (4)")
-print("  - 5 (Complete trust) (5)")
-
-print("- Judicial branch (Courts)")
-print("  - 1 (1)")
-print("  - 2 (2)")
-print("  - 3 (3)")
-print("  - 4 (4)")
-print("  - 5 (Complete trust) (5)")
-
-print("- Local government")
-print("  - 1 (1)")
-print("  - 2 (2)")
-print("  - 3 (3)")
-print("  - 4 (4)")
-print("  - 5 (Complete trust) (5)")
-
-print("Trust_Loss What, if anything, would increase your trust in the government?")
-print("- ______________________________________________________________")
-
-print("**End of Block: Trust in Government**")
-
-print("**Start of Block: Closing**")
-
-print("Feedback Is there anything else you would like to share about your political views, experiences, or any suggestions for this survey?")
-print("- ______________________________________________________________")
-
-print("Thank you for participating in the PSY 492 Election Experience Survey. Your responses will contribute to valuable research on political behavior and media influence.")
-
-print("**End of Block: Closing**")
-
-def run_analysis():
+    def get(self, index: int) -> Any:
+        value = self._data[index]
+        return MISSING if value is None else value
+
+    def to_series(self, name: str, start: int = 0) -> pd.Series:
+        # dtype=object keeps pandas from inferring (and copying into) a string dtype
+        return pd.Series(self.view(start), index=pd.RangeIndex(start, self.length), name=name,
+                         dtype=object, copy=False)
+
+    def promote(self, value: Any) -> ResponseColumn:
+        return self
+
+class ResponseStore:
+    """Columnar store of collected responses, keyed by question id"""
+    __slots__ = ('columns', 'length', '_question_for')
+
+    def __init__(self, question_for: Callable[[str], Optional['Question']]):
+        self.columns: Dict[str, ResponseColumn] = {}
+        self.length = 0
+        self._question_for = question_for
+
+    def __len__(self) -> int:
+        return self.length
+
+    def append(self, response: Dict[str, Any]) -> None:
+        """Append one response; a None answer counts as unanswered, as NA does in extend()"""
+        columns = self.columns
+        appended = 0
+        for question_id, value in response.items():
+            column = columns.get(question_id)
+            if value is None:
+                if column is not None:
+                    column.append_missing()
+                    appended += 1
+                continue
+            if column is None:
+                column = columns[question_id] = ResponseColumn.for_question(self._question_for(question_id), value)
+                column.append_missing(self.length)
+            try:
+                column.append(value)
+            except TypeError:
+                column = columns[question_id] = column.promote(value)
+                column.append(value)
+            column.version += 1
+            appended += 1
+        self.length += 1
+        if appended < len(columns):
+            for column in columns.values():
+                if column.length < self.length:
+                    column.append_missing()
+
+    def extend(self, frame: pd.DataFrame) -> None:
+        """Append every row of ``frame`` (one column per question, NA = unanswered). If a column
+        fails, the store is rolled back to its previous rows before the error propagates (choice
+        categories first seen in the failed batch stay, unused)."""
+        length = self.length
+        saved = [(question_id, column, column.version) for question_id, column in self.columns.items()]
+        try:
+            self._extend(frame)
+        except BaseException:
+            self.length = length
+            self.columns.clear()
+            for question_id, column, version in saved:
+                self.columns[question_id] = column
+                column.truncate(length)
+                column.version = version
+            raise
+
+    def _extend(self, frame: pd.DataFrame) -> None:
+        columns = self.columns
+        for question_id in frame.columns:
+            answers = frame[question_id]
+            missing = answers.isna().to_numpy()
+            column = columns.get(question_id)
+            if column is None:
+                if missing.all():
+                    continue
+                first = answers.iloc[int(np.argmin(missing))]
+                if isinstance(first, np.generic):
+                    first = first.item()
+                column = columns[question_id] = ResponseColumn.for_question(self._question_for(question_id), first)
+                column.append_missing(self.length)
+            if not column.extend(answers):
+                for value, is_missing in zip(answers.to_numpy(dtype=object), missing):
+                    if is_missing:
+                        column.append_missing()
+                        continue
+                    try:
+                        column.append(value)
+                    except TypeError:
+                        column = columns[question_id] = column.promote(value)
+                        column.append(value)
+            column.version += int(len(missing) - missing.sum())
+        self.length += len(frame)
+        for column in columns.values():
+            if column.length < self.length:
+                column.append_missing(self.length - column.length)
+
+    def numeric_matrix(self, question_ids: List[str], start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Rows [start, stop) of the given questions as float64 columns, NaN for missing or
+        non-numeric answers"""
+        stop = self.length if stop is None else stop
+        matrix = np.full((stop - start, len(question_ids)), np.nan)
+        for position, question_id in enumerate(question_ids):
+            column = self.columns.get(question_id)
+            if isinstance(column, NumericColumn):
+                matrix[:, position] = column.view(start)[:stop - start]
+            elif column is not None:
+                values = column.to_series(question_id, start).iloc[:stop - start]
+                matrix[:, position] = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        return matrix
+
+    def row(self, index: int) -> Dict[str, Any]:
+        row = {}
+        for question_id, column in self.columns.items():
+            value = column.get(index)
+            if value is not MISSING:
+                row[question_id] = value
+        return row
+
+    def to_dataframe(self, start: int = 0, stop: Optional[int] = None,
+                     question_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """DataFrame of rows [start, stop), all questions or just ``question_ids`` (all-missing
+        columns for questions without answers). Numeric and categorical columns are views of
+        the store's buffers rather than copies."""
+        stop = self.length if stop is None else stop
+        index = pd.RangeIndex(start, stop)
+        if question_ids is None:
+            question_ids = list(self.columns)
+        series = {}
+        for question_id in question_ids:
+            column = self.columns.get(question_id)
+            if column is None:
+                series[question_id] = pd.Series(None, index=index, dtype=object, name=question_id)
+            else:
+                answers = column.to_series(question_id, start)
+                series[question_id] = answers if stop == self.length else answers.iloc[:stop - start]
+        return pd.DataFrame(series, index=index, columns=question_ids, copy=False)
+
+class ResponseRows(abc.Sequence):
+    """Sequence of per-respondent dicts reconstructed on access from a ResponseStore"""
+    __slots__ = ('_store',)
+
+    def __init__(self, store: ResponseStore):
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("response index out of range")
+        return self._store.row(index)
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import"""
+    path: str
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    header_rows_skipped: int = 0
+    columns: List[str] = None
+    unmapped_columns: List[str] = None
+    errors: Counter = None  # (question_id, error name) -> rejected answers
+    rejected_rows: List[int] = None  # Data row numbers (0-based), first MAX_REJECTED_ROWS only
+
+    MAX_REJECTED_ROWS = 100
+
+    def __post_init__(self):
+        self.columns = self.columns or []
+        self.unmapped_columns = self.unmapped_columns or []
+        self.errors = self.errors or Counter()
+        self.rejected_rows = self.rejected_rows or []
+
+class ResponseImporter:
+    """Streams a Qualtrics-style export (CSV, or XLSX detected by its zip signature whatever the
+    extension) into a SurveyCollector chunk by chunk. Columns are matched to questions by id,
+    read with a dtype chosen from the question type, converted, batch-validated against the
+    survey's ValidationPlan and collected with collect_frame(). Only one chunk of the raw file
+    is in memory at a time."""
+    IMPORT_ID_PREFIX = '{"ImportId"'
+
+    def __init__(self, survey: SurveyCollector, chunksize: int = 10_000,
+                 column_map: Optional[Dict[str, str]] = None, validate: bool = True):
+        self.survey = survey
+        self.chunksize = chunksize
+        self.column_map = column_map or {}
+        self.validate = validate
+        self._converters: Dict[str, Callable[[pd.Series], pd.Series]] = {}
+
+    def import_file(self, path: str) -> ImportReport:
+        report = ImportReport(path)
+        plan = self.survey.validation_plan
+        for chunk in self._read_chunks(path, report):
+            if report.rows_read == 0:
+                chunk = self._drop_header_rows(chunk, report)
+                if chunk.empty:
+                    continue
+            start = report.rows_read
+            report.rows_read += len(chunk)
+            frame = pd.DataFrame({question_id: self._convert(question_id, chunk[question_id])
+                                  for question_id in chunk.columns}, index=chunk.index)
+            if self.validate:
+                errors = plan.question_errors(frame)
+                valid = (errors.to_numpy() == 0).all(axis=1) if len(errors.columns) else np.ones(len(frame), dtype=bool)
+                if not valid.all():
+                    self._record_rejections(report, errors, valid, start)
+                    frame = frame[valid]
+            self.survey.collect_frame(frame)
+            report.rows_imported += len(frame)
+        if report.rows_rejected:
+            logging.warning(f"Rejected {report.rows_rejected} of {report.rows_read} rows from {path}")
+        logging.info(f"Imported {report.rows_imported} responses from {path}")
+        return report
+
+    # Reading
+
+    def _question_for_column(self, column: Any) -> Optional[str]:
+        question_id = self.column_map.get(column, column)
+        if isinstance(question_id, str) and question_id in self.survey._question_index:
+            return question_id
+        return None
+
+    def _dtype(self, question_id: str) -> str:
+        """Choice and rating answers repeat a handful of values, so they are read as categories
+        and converted once per distinct value; free text is read as strings"""
+        question_type = self.survey.get_question(question_id).question_type
+        return 'string' if question_type == 'open_ended' else 'category'
+
+    def _map_header(self, header: List[Any], report: ImportReport) -> Dict[Any, str]:
+        mapping, mapped = {}, set()
+        for column in header:
+            question_id = self._question_for_column(column)
+            if question_id is None or question_id in mapped:
+                report.unmapped_columns.append(column)
+            else:
+                mapping[column] = question_id
+                mapped.add(question_id)
+        report.columns = list(mapping.values())
+        return mapping
+
+    def _read_chunks(self, path: str, report: ImportReport):
+        with open(path, 'rb') as file:
+            is_xlsx = file.read(2) == b'PK'
+        if is_xlsx:
+            yield from self._read_xlsx_chunks(path, report)
+            return
+        header = list(pd.read_csv(path, nrows=0).columns)
+        mapping = self._map_header(header, report)
+        reader = pd.read_csv(path, usecols=list(mapping), chunksize=self.chunksize,
+                             dtype={column: self._dtype(question_id) for column, question_id in mapping.items()},
+                             keep_default_na=False, na_values=[''])
+        for chunk in reader:
+            yield chunk.rename(columns=mapping)
+
+    def _read_xlsx_chunks(self, path: str, report: ImportReport):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("Reading XLSX exports requires openpyxl")
+        with open(path, 'rb') as file:  # openpyxl goes by extension, so hand it the file object
+            workbook = load_workbook(file, read_only=True, data_only=True)
+            try:
+                rows = workbook.worksheets[0].iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    return
+                mapping = self._map_header(list(header), report)
+                positions = [index for index, column in enumerate(header) if column in mapping]
+                names = [mapping[header[index]] for index in positions]
+                dtypes = {question_id: self._dtype(question_id) for question_id in names}
+                buffer = []
+                for row in rows:
+                    buffer.append([None if row[index] is None else str(row[index]) for index in positions])
+                    if len(buffer) == self.chunksize:
+                        yield pd.DataFrame(buffer, columns=names).astype(dtypes)
+                        buffer = []
+                if buffer:
+                    yield pd.DataFrame(buffer, columns=names).astype(dtypes)
+            finally:
+                workbook.close()
+
+    def _drop_header_rows(self, chunk: pd.DataFrame, report: ImportReport) -> pd.DataFrame:
+        """Qualtrics exports repeat the question text and an ImportId row under the header"""
+        skip = 0
+        for _, row in chunk.head(2).iterrows():
+            cells = [(question_id, value) for question_id, value in row.items() if isinstance(value, str)]
+            is_header = any(value.startswith(self.IMPORT_ID_PREFIX)
+                            or value == self.survey.get_question(question_id).question_text
+                            for question_id, value in cells)
+            if not is_header:
+                break
+            skip += 1
+        report.header_rows_skipped += skip
+        if not skip:
+            return chunk
+        chunk = chunk.iloc[skip:].copy()
+        for question_id in chunk.columns:
+            if isinstance(chunk[question_id].dtype, pd.CategoricalDtype):
+                chunk[question_id] = chunk[question_id].cat.remove_unused_categories()
+        return chunk
+
+    # Conversion
+
+    def _convert(self, question_id: str, raw: pd.Series) -> pd.Series:
+        converter = self._converters.get(question_id)
+        if converter is None:
+            question = self.survey.get_question(question_id)
+            if question.question_type in ('likert_scale', 'scale'):
+                converter = self._scale_converter(question)
+            elif question.question_type == 'multiple_choice':
+                converter = self._choice_converter(question)
+            else:
+                converter = self._text_converter
+            converter = self._converters[question_id] = converter
+        return converter(raw)
+
+    @classmethod
+    def _option_code(cls, label: str) -> Optional[int]:
+        match = Question.OPTION_CODE.search(label)
+        if match is None:
+            return None
+        return int(match.group(1) or match.group(2))
+
+    @staticmethod
+    def _per_category(raw: pd.Series, convert: Callable[[Any], Any], dtype=object) -> pd.Series:
+        """Convert each distinct value once and broadcast the results through the category codes"""
+        if not isinstance(raw.dtype, pd.CategoricalDtype):
+            raw = raw.astype('category')
+        converted = np.empty(len(raw.cat.categories) + 1, dtype=dtype)
+        for code, category in enumerate(raw.cat.categories):
+            converted[code] = convert(category)
+        converted[-1] = np.nan if dtype == np.float64 else None
+        return pd.Series(converted[raw.array.codes], index=raw.index, name=raw.name)
+
+    def _scale_converter(self, question: 'Question') -> Callable[[pd.Series], pd.Series]:
+        """Ratings arrive as numbers or as option labels carrying their code; anything else is kept
+        as text so that validation reports it"""
+        codes = {}
+        for label in question.options or []:
+            code = self._option_code(label)
+            if code is not None:
+                codes[label] = code
+
+        def to_number(value: str) -> Any:
+            if value in codes:
+                return codes[value]
+            try:
+                number = float(value)
+            except ValueError:
+                return value
+            return int(number) if number.is_integer() else number
+
+        def convert(raw: pd.Series) -> pd.Series:
+            categories = raw.cat.categories if isinstance(raw.dtype, pd.CategoricalDtype) else raw.unique()
+            if all(isinstance(to_number(value), (int, float)) for value in categories if not pd.isna(value)):
+                return self._per_category(raw, lambda value: float(to_number(value)), np.float64)
+            return self._per_category(raw, to_number)
+
+        return convert
+
+    def _choice_converter(self, question: 'Question') -> Callable[[pd.Series], pd.Series]:
+        """Labels map to themselves and recode values ("3") to the option carrying them. Cells
+        that match no option are split on commas, re-joining pieces so that labels containing
+        commas ("$25,000-$49,999 (2)") survive, and become multi-select lists. The first list
+        seen makes the question multi-select for the rest of the import, as does Question.multi_select."""
+        options = list(question.options or [])
+        lookup = {option: option for option in options}
+        for position, option in enumerate(options, start=1):
+            code = self._option_code(option)
+            lookup.setdefault(str(code if code is not None else position), option)
+        state = {'multi_select': question.multi_select}
+
+        def resolve(value: str) -> Any:
+            option = lookup.get(value.strip())
+            if option is not None:
+                return option
+            pieces, selected, pending = value.split(','), [], ''
+            for piece in pieces:
+                pending = f"{pending},{piece}" if pending else piece
+                option = lookup.get(pending.strip())
+                if option is not None:
+                    selected.append(option)
+                    pending = ''
+            return value if pending or len(selected) < 2 else selected
+
+        def convert(raw: pd.Series) -> pd.Series:
+            if not isinstance(raw.dtype, pd.CategoricalDtype):
+                raw = raw.astype('category')
+            resolved = [resolve(str(category)) for category in raw.cat.categories]
+            if any(isinstance(value, list) for value in resolved):
+                state['multi_select'] = True
+            if state['multi_select']:
+                resolved = [value if isinstance(value, list) or value not in options else [value]
+                            for value in resolved]
+                return self._per_category(raw, dict(zip(raw.cat.categories, resolved)).__getitem__)
+            positions = {value: code for code, value in enumerate(dict.fromkeys(options + resolved))}
+            categories = list(positions)
+            codes = np.append([positions[value] for value in resolved], -1)[raw.array.codes]
+            return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=raw.index, name=raw.name)
+
+        return convert
+
+    @staticmethod
+    def _text_converter(raw: pd.Series) -> pd.Series:
+        return raw.astype(object).where(raw.notna(), None)
+
+    # Reporting
+
+    def _record_rejections(self, report: ImportReport, errors: pd.DataFrame, valid: np.ndarray, start: int) -> None:
+        report.rows_rejected += int((~valid).sum())
+        room = ImportReport.MAX_REJECTED_ROWS - len(report.rejected_rows)
+        if room > 0:
+            report.rejected_rows.extend((start + np.flatnonzero(~valid)[:room]).tolist())
+        for question_id in errors.columns:
+            codes = errors[question_id].to_numpy()
+            for flag, name in ValidationPlan.ERROR_NAMES.items():
+                count = int(np.count_nonzero(codes & flag))
+                if count:
+                    report.errors[(question_id, name)] += count
+
+class ParquetResponseWriter:
+    """Streams collected responses to a Parquet file, one row group per ``row_group_size`` rows,
+    read straight from the column store. Choice questions are dictionary-encoded (read back as
+    categoricals), multi-select questions become lists and scale questions float64. The schema
+    metadata carries the survey and block structure, see read_survey_metadata().
+
+    The schema is fixed by the first row group. Survey questions are typed from their definition
+    (Question.multi_select decides between dictionary and list), other columns from the column
+    store. A column whose answers no longer fit its field is written in the field's type instead:
+    lists joined with ", " for choice and text fields, single answers wrapped in a list for
+    list fields, and non-numbers as null for scale fields. A warning is logged once per question."""
+    def __init__(self, survey: SurveyCollector, path: str, row_group_size: int = 10_000):
+        if pa is None:
+            raise ImportError("Parquet export requires pyarrow")
+        self.survey = survey
+        self.path = path
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self.schema = None
+        self._writer = None
+        self._conformed: set = set()  # Questions already warned about in _conform()
+
+    def __enter__(self) -> 'ParquetResponseWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def on_collect(self, survey: SurveyCollector, start: int, stop: int) -> None:
+        if stop - self.rows_written >= self.row_group_size:
+            self.flush()
+
+    def flush(self, final: bool = False) -> None:
+        """Write all complete row groups, plus the remainder when ``final``"""
+        length = len(self.survey.store)
+        while length - self.rows_written >= self.row_group_size or (final and length > self.rows_written):
+            stop = min(self.rows_written + self.row_group_size, length)
+            self._write(self.rows_written, stop)
+            self.rows_written = stop
+
+    def close(self) -> None:
+        if self in self.survey._listeners:
+            self.survey.remove_listener(self)
+        self.flush(final=True)
+        if self._writer is None and self.rows_written == 0:
+            self._writer = pq.ParquetWriter(self.path, self._build_schema())
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    # Schema
+
+    def _question_ids(self) -> List[str]:
+        question_ids = [question.question_id for question in self.survey.iter_questions()]
+        known = set(question_ids)
+        return question_ids + [question_id for question_id in self.survey.store.columns if question_id not in known]
+
+    @staticmethod
+    def _field_type(column: Optional[ResponseColumn], question: Optional['Question']):
+        if question is not None:
+            if question.question_type in ('likert_scale', 'scale'):
+                return pa.float64()
+            if question.question_type == 'multiple_choice':
+                return pa.list_(pa.string()) if question.multi_select else pa.dictionary(pa.int32(), pa.string())
+            return pa.string()
+        if isinstance(column, NumericColumn):
+            return pa.float64()
+        if isinstance(column, CategoricalColumn):
+            return pa.dictionary(pa.int32(), pa.string())
+        if isinstance(column, MultiSelectColumn):
+            return pa.list_(pa.string())
+        return pa.string()
+
+    def _build_schema(self):
+        survey = self.survey
+        block_of = {}
+        for block in reversed(survey.blocks):
+            for question in block.questions:
+                block_of[question.question_id] = block.block_id
+        fields = []
+        for question_id in self._question_ids():
+            question = survey._question_index.get(question_id)
+            metadata = {
+                'question_type': question.question_type if question else '',
+                'block_id': block_of.get(question_id, ''),
+            }
+            fields.append(pa.field(question_id, self._field_type(survey.store.columns.get(question_id), question),
+                                   metadata=metadata))
+        structure = {
+            'survey_id': survey.survey_id,
+            'title': survey.title,
+            'blocks': [{
+                'block_id': block.block_id,
+                'title': block.title,
+                'questions': [{
+                    'question_id': question.question_id,
+                    'question_text': question.question_text,
+                    'question_type': question.question_type,
+                    'options': question.options,
+                    'required': question.required,
+                    'statements': question.statements,
+                    'multi_select': question.multi_select,
+                } for question in block.questions],
+            } for block in survey.blocks],
+        }
+        return pa.schema(fields, metadata={'survey': json.dumps(structure)})
+
+    # Row groups
+
+    @staticmethod
+    def _column_array(column: ResponseColumn, start: int, stop: int):
+        count = stop - start
+        if isinstance(column, NumericColumn):
+            return pa.array(column.view(start)[:count], type=pa.float64(), from_pandas=True)
+        if isinstance(column, CategoricalColumn):
+            codes = column.view(start)[:count].astype(np.int32)
+            dictionary = pa.array([str(category) for category in column.categories], type=pa.string())
+            return pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), dictionary)
+        if isinstance(column, MultiSelectColumn):
+            lists = column.to_series('', start).to_numpy()[:count]
+            return pa.array([None if value is None else [str(option) for option in value] for value in lists],
+                            type=pa.list_(pa.string()))
+        values = column.view(start)[:count]
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+    def _write(self, start: int, stop: int) -> None:
+        if self.schema is None:
+            self.schema = self._build_schema()
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        columns = self.survey.store.columns
+        arrays = []
+        for field in self.schema:
+            column = columns.get(field.name)
+            if column is None:
+                arrays.append(pa.nulls(stop - start, type=field.type))
+                continue
+            array = self._column_array(column, start, stop)
+            if array.type != field.type:
+                try:
+                    array = array.cast(field.type)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    array = self._conform(field, column, start, stop)
+            arrays.append(array)
+        new_columns = set(columns) - set(self.schema.names)
+        if new_columns:
+            logging.warning(f"Columns not in the Parquet schema are skipped: {sorted(new_columns)}")
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def _conform(self, field, column: ResponseColumn, start: int, stop: int):
+        """The column's answers converted to ``field``'s type when a plain cast fails"""
+        if field.name not in self._conformed:
+            self._conformed.add(field.name)
+            logging.warning(f"Answers to {field.name} no longer fit its Parquet type {field.type}; "
+                            f"converting them to it")
+        answers = [None if answer is MISSING else answer for answer in map(column.get, range(start, stop))]
+        if pa.types.is_list(field.type):
+            return pa.array([None if answer is None else [str(option) for option in answer]
+                             if isinstance(answer, list) else [str(answer)] for answer in answers], type=field.type)
+        if pa.types.is_floating(field.type):
+            numbers = pd.to_numeric(pd.Series(answers, dtype=object).where(
+                [not isinstance(answer, bool) for answer in answers]), errors='coerce')
+            return pa.array(numbers.to_numpy(dtype=np.float64), type=field.type, from_pandas=True)
+        text = pa.array([None if answer is None else ', '.join(map(str, answer)) if isinstance(answer, list)
+                         else str(answer) for answer in answers], type=pa.string())
+        return text.dictionary_encode().cast(field.type) if pa.types.is_dictionary(field.type) else text
+
+def read_parquet_responses(path: str, columns: Optional[List[str]] = None, memory_map: bool = True) -> pd.DataFrame:
+    """Read (a subset of the columns of) a Parquet response export, memory-mapped by default"""
+    if pq is None:
+        raise ImportError("Reading Parquet exports requires pyarrow")
+    return pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+
+def read_survey_metadata(path: str) -> Dict[str, Any]:
+    """Survey and block structure stored in a Parquet response export"""
+    if pq is None:
+        raise ImportError("Reading Parquet exports requires pyarrow")
+    metadata = pq.read_schema(path, memory_map=True).metadata or {}
+    return json.loads(metadata.get(b'survey', b'{}'))
+
+SURVEY_DEFINITION = Path(__file__).resolve().parent.parent / 'json' / 'survey_definition.json'
+SURVEY_CACHE_VERSION = 3  # Bump when Block or Question change shape, to retire pickled definitions
+ANSWER_LINE = '_' * 62
+
+def build_survey(spec: Dict[str, Any]) -> SurveyCollector:
+    """SurveyCollector with the blocks and questions of a survey definition dict"""
+    survey = SurveyCollector(spec['survey_id'], spec['title'])
+    for block_spec in spec['blocks']:
+        block = Block(block_spec['block_id'], block_spec['title'])
+        for question_spec in block_spec['questions']:
+            block.add_question(Question(**question_spec))
+        survey.add_block(block)
+    return survey
+
+def load_survey_definition(path: Union[str, Path] = SURVEY_DEFINITION, use_cache: bool = True) -> SurveyCollector:
+    """Load a JSON survey definition into a SurveyCollector. The compiled blocks and validation
+    plan are pickled to __pycache__ next to the definition, keyed by a hash of its content, and
+    reused until the file changes."""
+    path = Path(path)
+    content = path.read_bytes()
+    key = hashlib.sha256(content + f"{SURVEY_CACHE_VERSION}:{__name__}".encode()).hexdigest()[:16]
+    cache_path = path.parent / '__pycache__' / f"{path.stem}.{key}.pickle"
+    if use_cache and cache_path.exists():
+        try:
+            with open(cache_path, 'rb') as file:
+                survey_id, title, blocks, plan = pickle.load(file)
+            survey = SurveyCollector(survey_id, title)
+            for block in blocks:
+                survey.add_block(block)
+            survey._validation_plan = plan
+            return survey
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable survey cache {cache_path}: {e}")
+
+    survey = build_survey(json.loads(content))
+    if use_cache:
+        try:
+            cache_path.parent.mkdir(exist_ok=True)
+            with open(cache_path, 'wb') as file:
+                pickle.dump((survey.survey_id, survey.title, survey.blocks, survey.validation_plan), file)
+        except OSError as e:
+            logging.warning(f"Could not cache survey definition: {e}")
+    return survey
+
+def iter_survey_lines(survey: SurveyCollector) -> Iterator[str]:
+    """The questionnaire as text, generated line by line on demand"""
+    for block in survey.blocks:
+        yield f"**Start of Block: {block.title}**"
+        for question in block.questions:
+            if question.question_type == 'intro':
+                yield question.question_text
+                continue
+            yield f"{question.question_id} {question.question_text}"
+            if question.statements:
+                for statement in question.statements:
+                    yield f"- {statement}"
+                    for option in question.options or []:
+                        yield f"  - {option}"
+            elif question.options:
+                for option in question.options:
+                    yield f"- {option}"
+            elif question.question_type == 'open_ended':
+                yield f"- {ANSWER_LINE}"
+        yield f"**End of Block: {block.title}**"
+
+def render_survey(survey: SurveyCollector, file=None) -> None:
+    """Print the questionnaire (to stdout by default)"""
+    for line in iter_survey_lines(survey):
+        print(line, file=file or sys.stdout)
+
+def run_analysis(definition: Union[str, Path] = SURVEY_DEFINITION):
     try:
-        # Create survey collector
-        survey = SurveyCollector("PSY_492", "Election Experience Survey")
-        
-        # Create and populate blocks
-        demographics = Block("demographics", "Demographics")
-        political_block = Block("political_views", "Political Views and Affiliation")
-        efficacy_block = Block("efficacy", "Political Efficacy and Participation") 
-        trust_block = Block("trust", "Trust in Government")
-        closing_block = Block("closing", "Closing")
-        
-        # Add questions to blocks (add your existing questions here)
-        # ...
-        
-        # Add blocks to survey
-        for block in [demographics, political_block, efficacy_block, trust_block, closing_block]:
-            survey.add_block(block)
+        # Create survey collector from the survey definition
+        survey = load_survey_definition(definition)
         
         # Add sample response for testing
         sample_response = {
             "Age": "23",
-            "Political_Views": 4,
+            "Year": "Junior (3)",
+            "Ethnicity": "No (2)",
+            "Race": ["White or Caucasian (1)", "Other (6)"],
+            "Household_Income": "Prefer not to say (7)",
+            "Election": "Yes (1)",
             "Party_Affiliation": "Democrat (2)",
-            "Trust_Government": 3,
-            # Add other fields as needed
+            "R_Strength": "Not very strong (2)",
+            "D_Strength": "Strong (1)",
+            "Independent_Lean": "Democratic (2)",
+            "Political_Views": 4,
+            "Party_Registration": "Democratic (2)",
+            "P_Efficacy": 3,
+            "P_Knowledge_1": "Vice President",
+            "P_Knowledge_2": "Supreme Court",
+            "P_Knowledge_3": "Two-thirds",
+            "P_Knowledge_4": "Democratic",
+            "P_Knowledge_5": "Republican",
+            "ABC_News": 4,
+            "Social_Media": 5,
+            "News_1": "Television (2)",
+            "News_frequency": "A few times a week",
+            "Disinfo_threat": 8,
+            "Disinfo_Res": "Social Media Companies",
+            "Trust_Government": 3
         }
         survey.collect_response(sample_response)
         
@@ -611,6 +2076,113 @@ def run_analysis():
         logging.error(f"Analysis failed: {e}")
         raise
 
+def build_synthetic_survey(n_items: int, n_responses: int, block_size: int = 50, seed: int = 0):
+    """Survey with ``n_items`` questions cycling through the question types, plus random responses"""
+    rng = random.Random(seed)
+    question_types = ['multiple_choice', 'likert_scale', 'scale', 'open_ended']
+    synthetic = SurveyCollector("SYNTHETIC", "Synthetic Survey")
+    questions = []
+    for start in range(0, n_items, block_size):
+        block = Block(f"Block_{start // block_size}", f"Block {start // block_size}")
+        synthetic.add_block(block)
+        for number in range(start, min(start + block_size, n_items)):
+            question_type = question_types[number % len(question_types)]
+            if question_type == 'multiple_choice':
+                options = [f"Option {i} ({i})" for i in range(1, 6)]
+            elif question_type == 'likert_scale':
+                options = ["Strongly disagree (1)", "Disagree (2)", "Neutral (3)", "Agree (4)", "Strongly agree (5)"]
+            elif question_type == 'scale':
+                options = [str(i) for i in range(11)]
+            else:
+                options = None
+            question = Question(f"Q{number}", f"Question {number}", question_type, options)
+            block.add_question(question)
+            questions.append(question)
+
+    def answer(question):
+        if question.question_type == 'multiple_choice':
+            return rng.choice(question.options)
+        if question.question_type == 'likert_scale':
+            return rng.randint(1, 5)
+        if question.question_type == 'scale':
+            return rng.randint(0, 10)
+        return rng.choice(["Yes", "No", "Not sure", "It depends on the source"])
+
+    responses = [{question.question_id: answer(question) for question in questions} for _ in range(n_responses)]
+    return synthetic, responses
+
+def benchmark_survey_model(item_counts: List[int], n_responses: int) -> pd.DataFrame:
+    """Time question lookup, validation and the per-question export summary on synthetic surveys"""
+    rows = []
+    for n_items in item_counts:
+        start = time.perf_counter()
+        synthetic, responses = build_synthetic_survey(n_items, n_responses)
+        timings = {'build': time.perf_counter() - start}
+
+        start = time.perf_counter()
+        for response in responses:
+            synthetic.collect_response(response)
+        timings['collect'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for question in synthetic.iter_questions():
+            synthetic.get_question(question.question_id)
+        timings['lookup_all'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        valid = sum(synthetic.validate_response(response) for response in responses)
+        timings['validate'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_valid = int((synthetic.validate_batch(synthetic.to_dataframe()) == 0).sum())
+        timings['validate_batch'] = time.perf_counter() - start
+
+        analyzer = ResponseAnalyzer(synthetic)
+        start = time.perf_counter()
+        for question in synthetic.iter_questions():
+            analyzer.analyze_question(question.question_id)
+        timings['export_summary'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ResponseAnalyzer(synthetic).summarize()
+        timings['batch_summary'] = time.perf_counter() - start
+
+        for stage, seconds in timings.items():
+            rows.append({'items': n_items, 'responses': n_responses, 'stage': stage, 'seconds': seconds})
+        logging.info(f"{n_items} items: {valid}/{n_responses} responses valid ({batch_valid} in batch)")
+    return pd.DataFrame(rows).pivot(index='stage', columns='items', values='seconds')
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the survey analysis or benchmark the survey model.")
+    parser.add_argument('--benchmark', action='store_true', help='Benchmark lookup, validation and export summaries on synthetic surveys')
+    parser.add_argument('--benchmark_items', type=int, nargs='+', default=[100, 1000, 5000], help='Survey sizes (number of questions) to benchmark')
+    parser.add_argument('--benchmark_responses', type=int, default=200, help='Responses per synthetic survey')
+    parser.add_argument('--survey_definition', type=str, default=str(SURVEY_DEFINITION), help='Path to the JSON survey definition')
+    parser.add_argument('--render', action='store_true', help='Print the questionnaire and exit')
+    parser.add_argument('--import_file', type=str, help='Bulk import a Qualtrics-style CSV/XLSX export and print its summary')
+    parser.add_argument('--chunksize', type=int, default=10_000, help='Rows read per chunk when importing')
+    parser.add_argument('--serve', action='store_true', help='Collect responses over HTTP (POST /responses, GET /stats) until interrupted')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Address the ingestion service binds to')
+    parser.add_argument('--port', type=int, default=8765, help='Port the ingestion service listens on')
+    parser.add_argument('--flush_interval', type=float, default=0.05, help='Seconds between batched validation and collection of buffered responses')
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO)
-    run_analysis()
+    if args.benchmark:
+        print(benchmark_survey_model(args.benchmark_items, args.benchmark_responses).to_string(float_format=lambda value: f"{value:.4f}"))
+    elif args.render:
+        render_survey(load_survey_definition(args.survey_definition))
+    elif args.import_file:
+        survey = load_survey_definition(args.survey_definition)
+        report = survey.import_file(args.import_file, chunksize=args.chunksize)
+        print(f"Imported {report.rows_imported} of {report.rows_read} rows ({report.rows_rejected} rejected)")
+        for (question_id, error), count in report.errors.most_common():
+            print(f"  {question_id}: {error} x{count}")
+        print(survey.analyzer.summarize().to_string(index=False))
+    elif args.serve:
+        survey = load_survey_definition(args.survey_definition)
+        serve(survey, args.host, args.port, flush_interval=args.flush_interval)
+        if len(survey.store):
+            print(survey.analyzer.summarize().to_string(index=False))
+    else:
+        run_analysis(args.survey_definition)
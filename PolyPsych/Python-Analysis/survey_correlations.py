@@ -0,0 +1,297 @@
+"""
+Online item-item correlations for survey scale and Likert items.
+
+CorrelationEngine keeps pairwise-deletion co-moments (count, means, M2 and co-moment per item
+pair) that are merged batch by batch with Chan et al.'s update, so Pearson correlations over
+thousands of items refresh without revisiting old responses. Likert items additionally keep a
+contingency table per item pair, from which Spearman (midrank) and polychoric correlations are
+computed. Updates and the table-based correlations are split into item-block tiles processed
+in parallel threads; numpy and scipy release the GIL for the heavy array work.
+
+The engine is fed with update(values), or attached to a SurveyCollector (see StoreListener).
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri, owens_t
+
+from survey_listeners import StoreListener
+
+METHODS = ('pearson', 'spearman', 'polychoric')
+
+class CorrelationEngine(StoreListener):
+    """Pairwise-deletion Pearson correlations for ``item_ids`` and table-based Spearman and
+    polychoric correlations for the subset ``likert_ids``, whose answers are integer codes in
+    ``likert_range``. Answers outside that range are left out of the tables only.
+
+    Memory is six float64 matrices over all items plus one count table of
+    (len(likert_ids) * levels) ** 2 entries, see memory_bytes(). Engines needing more than
+    ``max_bytes`` are refused with ValueError; correlate a subset of the items instead."""
+    MAX_BYTES = 512 * 2 ** 20
+
+    def __init__(self, item_ids: Sequence[str], likert_ids: Sequence[str] = (),
+                 likert_range: Tuple[int, int] = (1, 7), tile_size: int = 256,
+                 max_workers: Optional[int] = None, batch_size: int = 1000,
+                 max_bytes: Optional[int] = MAX_BYTES):
+        self.item_ids = list(item_ids)
+        self._position = {item_id: index for index, item_id in enumerate(self.item_ids)}
+        unknown = [item_id for item_id in likert_ids if item_id not in self._position]
+        if unknown:
+            raise ValueError(f"Likert items {unknown} are not among the engine's items")
+        self.likert_ids = list(likert_ids)
+        self._likert_position = {item_id: index for index, item_id in enumerate(self.likert_ids)}
+        self._likert_columns = np.array([self._position[item_id] for item_id in self.likert_ids], dtype=np.intp)
+        self.low, self.high = likert_range
+        self.levels = self.high - self.low + 1
+        needed = self.memory_bytes(len(self.item_ids), len(self.likert_ids), self.levels)
+        if max_bytes is not None and needed > max_bytes:
+            raise ValueError(f"A correlation engine over {len(self.item_ids)} items ({len(self.likert_ids)} Likert) "
+                             f"needs {needed / 2 ** 20:,.0f} MiB, above max_bytes ({max_bytes / 2 ** 20:,.0f} MiB)")
+        self.tile_size = tile_size
+        self.max_workers = max_workers
+        super().__init__(batch_size)
+
+        size = len(self.item_ids)
+        self._n = np.zeros((size, size))
+        self._mean_i = np.zeros((size, size))  # Mean of row item i over rows where j is also answered
+        self._mean_j = np.zeros((size, size))  # Mean of column item j over the same rows
+        self._m2_i = np.zeros((size, size))
+        self._m2_j = np.zeros((size, size))
+        self._comoment = np.zeros((size, size))
+        cells = len(self.likert_ids) * self.levels
+        self._tables = np.zeros((cells, cells))
+
+    @staticmethod
+    def memory_bytes(items: int, likert_items: int = 0, levels: int = 7) -> int:
+        """Bytes held by an engine's co-moment matrices and Likert contingency table"""
+        return 8 * (6 * items ** 2 + (likert_items * levels) ** 2)
+
+    # Feeding
+
+    def _pull(self, store: Any, start: int, stop: int) -> None:
+        self.update(store.numeric_matrix(self.item_ids, start, stop))
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold in a batch of responses: one row per response, one column per item, NaN = missing"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != len(self.item_ids):
+            raise ValueError(f"Expected an (n, {len(self.item_ids)}) array, got {values.shape}")
+        if not len(values):
+            return
+        present = ~np.isnan(values)
+        with np.errstate(invalid='ignore'):
+            # Shifting by the batch means keeps the within-batch sums well conditioned
+            counts = present.sum(axis=0)
+            shift = np.where(counts > 0, np.where(present, values, 0).sum(axis=0) / np.maximum(counts, 1), 0)
+        centered = np.where(present, values - shift, 0)
+        mask = present.astype(np.float64)
+        tiles = self._tiles(len(self.item_ids))
+        self._run([(rows, columns) for rows in tiles for columns in tiles],
+                  lambda tile: self._merge_moments(centered, mask, shift, *tile))
+        if self.likert_ids:
+            self._update_tables(values[:, self._likert_columns])
+        self.rows_seen += len(values)
+
+    def _tiles(self, size: int) -> List[slice]:
+        return [slice(start, min(start + self.tile_size, size)) for start in range(0, size, self.tile_size)]
+
+    def _run(self, tiles: List[Any], work) -> None:
+        if len(tiles) == 1 or self.max_workers == 1:
+            for tile in tiles:
+                work(tile)
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for _ in pool.map(work, tiles):
+                pass
+
+    def _merge_moments(self, centered: np.ndarray, mask: np.ndarray, shift: np.ndarray,
+                       rows: slice, columns: slice) -> None:
+        """Chan merge of one tile's batch co-moments into the running ones (tiles are disjoint)"""
+        z_i, z_j = centered[:, rows], centered[:, columns]
+        m_i, m_j = mask[:, rows], mask[:, columns]
+        n_b = m_i.T @ m_j
+        sum_i, sum_j = z_i.T @ m_j, m_i.T @ z_j
+        safe = np.maximum(n_b, 1)
+        mean_i_b, mean_j_b = sum_i / safe, sum_j / safe
+        m2_i_b = (z_i * z_i).T @ m_j - sum_i * mean_i_b
+        m2_j_b = m_i.T @ (z_j * z_j) - sum_j * mean_j_b
+        comoment_b = z_i.T @ z_j - sum_i * mean_j_b
+        mean_i_b += shift[rows, None]
+        mean_j_b += shift[None, columns]
+
+        n_a = self._n[rows, columns]
+        total = n_a + n_b
+        safe_total = np.maximum(total, 1)
+        weight = n_a * n_b / safe_total
+        fraction = n_b / safe_total
+        delta_i = mean_i_b - self._mean_i[rows, columns]
+        delta_j = mean_j_b - self._mean_j[rows, columns]
+        self._comoment[rows, columns] += comoment_b + delta_i * delta_j * weight
+        self._m2_i[rows, columns] += m2_i_b + delta_i * delta_i * weight
+        self._m2_j[rows, columns] += m2_j_b + delta_j * delta_j * weight
+        self._mean_i[rows, columns] += delta_i * fraction
+        self._mean_j[rows, columns] += delta_j * fraction
+        self._n[rows, columns] = total
+
+    def _update_tables(self, likert: np.ndarray) -> None:
+        """Add the batch's answer combinations to every Likert pair's contingency table"""
+        codes = np.rint(likert) - self.low
+        valid = (likert == np.rint(likert)) & (codes >= 0) & (codes < self.levels)
+        items = len(self.likert_ids)
+        tiles = self._tiles(items)
+        # One-hot rows are built in slices so the indicator matrix stays around 32 MiB
+        step = max(1, (1 << 23) // (items * self.levels))
+        for start in range(0, len(likert), step):
+            block_valid = valid[start:start + step]
+            rows, columns = np.nonzero(block_valid)
+            onehot = np.zeros((len(block_valid), items, self.levels), dtype=np.float32)
+            onehot[rows, columns, codes[start:start + step][rows, columns].astype(np.intp)] = 1
+            onehot = onehot.reshape(len(block_valid), items * self.levels)
+
+            def add(tile, onehot=onehot):
+                row_items, column_items = tile
+                row_cells = slice(row_items.start * self.levels, row_items.stop * self.levels)
+                column_cells = slice(column_items.start * self.levels, column_items.stop * self.levels)
+                self._tables[row_cells, column_cells] += onehot[:, row_cells].T @ onehot[:, column_cells]
+
+            self._run([(row_items, column_items) for row_items in tiles for column_items in tiles], add)
+
+    # Queries
+
+    def _indices(self, item_ids: Optional[Sequence[str]], position: Dict[str, int], kind: str) -> Tuple[List[str], np.ndarray]:
+        item_ids = list(position) if item_ids is None else list(item_ids)
+        missing = [item_id for item_id in item_ids if item_id not in position]
+        if missing:
+            raise ValueError(f"No {kind} accumulators for {missing}")
+        return item_ids, np.array([position[item_id] for item_id in item_ids], dtype=np.intp)
+
+    def pair_counts(self, item_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Number of responses answering both items of each pair"""
+        self.refresh()
+        item_ids, index = self._indices(item_ids, self._position, 'item')
+        return pd.DataFrame(self._n[np.ix_(index, index)].astype(np.int64), index=item_ids, columns=item_ids)
+
+    def pearson(self, item_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Pearson correlations with pairwise deletion; NaN for pairs with fewer than two shared
+        responses or no variance"""
+        self.refresh()
+        item_ids, index = self._indices(item_ids, self._position, 'item')
+        grid = np.ix_(index, index)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = self._comoment[grid] / np.sqrt(self._m2_i[grid] * self._m2_j[grid])
+        r[self._n[grid] < 2] = np.nan
+        return pd.DataFrame(np.clip(r, -1, 1), index=item_ids, columns=item_ids)
+
+    def _pair_tables(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Contingency tables for the Likert item pairs rows x columns, shaped (r, c, levels, levels)"""
+        tables = self._tables.reshape(len(self.likert_ids), self.levels, len(self.likert_ids), self.levels)
+        return tables[np.ix_(rows, np.arange(self.levels), columns, np.arange(self.levels))].transpose(0, 2, 1, 3)
+
+    def _table_matrix(self, item_ids: Optional[Sequence[str]], compute, unit_diagonal: bool = False) -> pd.DataFrame:
+        self.refresh()
+        item_ids, index = self._indices(item_ids, self._likert_position, 'Likert')
+        result = np.full((len(index), len(index)), np.nan)
+        tiles = self._tiles(len(index))
+
+        def work(tile):
+            rows, columns = tile
+            result[rows, columns] = compute(self._pair_tables(index[rows], index[columns]))
+            if rows != columns:
+                result[columns, rows] = result[rows, columns].T
+
+        self._run([(rows, columns) for a, rows in enumerate(tiles) for columns in tiles[a:]], work)
+        if unit_diagonal:  # The likelihood search stops just short of an item's correlation with itself
+            diagonal = np.diag_indices_from(result)
+            result[diagonal] = np.where(np.isnan(result[diagonal]), np.nan, 1.0)
+        return pd.DataFrame(result, index=item_ids, columns=item_ids)
+
+    def spearman(self, item_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Spearman correlations of Likert items from their contingency tables (tied answers share
+        their midrank, as in scipy.stats.spearmanr)"""
+        return self._table_matrix(item_ids, spearman_from_tables)
+
+    def polychoric(self, item_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Maximum-likelihood polychoric correlations of Likert items, with thresholds fixed from
+        each pair's marginals"""
+        return self._table_matrix(item_ids, polychoric_from_tables, unit_diagonal=True)
+
+    def correlation(self, item_ids: Optional[Sequence[str]] = None, method: str = 'pearson') -> pd.DataFrame:
+        if method == 'pearson':
+            return self.pearson(item_ids)
+        if method == 'spearman':
+            return self.spearman(item_ids)
+        if method == 'polychoric':
+            return self.polychoric(item_ids)
+        raise ValueError(f"Unsupported method {method!r}. Please use one of {METHODS}.")
+
+def spearman_from_tables(tables: np.ndarray) -> np.ndarray:
+    """Spearman correlation per contingency table (..., levels_a, levels_b)"""
+    rows, columns = tables.sum(axis=-1), tables.sum(axis=-2)
+    n = rows.sum(axis=-1)
+    row_ranks = np.cumsum(rows, axis=-1) - (rows - 1) / 2
+    column_ranks = np.cumsum(columns, axis=-1) - (columns - 1) / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_row = (rows * row_ranks).sum(axis=-1) / n
+        mean_column = (columns * column_ranks).sum(axis=-1) / n
+        var_row = (rows * row_ranks ** 2).sum(axis=-1) / n - mean_row ** 2
+        var_column = (columns * column_ranks ** 2).sum(axis=-1) / n - mean_column ** 2
+        cross = np.einsum('...ab,...a,...b->...', tables, row_ranks, column_ranks) / n
+        rho = (cross - mean_row * mean_column) / np.sqrt(var_row * var_column)
+    rho[(n < 2) | (var_row <= 0) | (var_column <= 0)] = np.nan
+    return np.clip(rho, -1, 1)
+
+THRESHOLD_LIMIT = 8.0  # Stands in for +-infinity; the normal tail beyond it is below 1e-15
+
+def bivariate_normal_cdf(h: np.ndarray, k: np.ndarray, rho: np.ndarray) -> np.ndarray:
+    """P(X <= h, Y <= k) for standard normals with correlation ``rho`` (|rho| < 1), via Owen's T"""
+    h = np.where(h == 0, 1e-12, h)
+    k = np.where(k == 0, 1e-12, k)
+    root = np.sqrt(1 - rho * rho)
+    return (0.5 * (ndtr(h) + ndtr(k))
+            - owens_t(h, (k - rho * h) / (h * root))
+            - owens_t(k, (h - rho * k) / (k * root))
+            - 0.5 * (h * k < 0))
+
+def _thresholds(marginals: np.ndarray) -> np.ndarray:
+    """Normal thresholds from category counts (..., levels), padded with -+THRESHOLD_LIMIT"""
+    cumulative = np.cumsum(marginals, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        proportions = cumulative[..., :-1] / cumulative[..., -1:]
+    inner = np.clip(ndtri(np.nan_to_num(proportions)), -THRESHOLD_LIMIT, THRESHOLD_LIMIT)
+    pad = np.full(inner.shape[:-1] + (1,), THRESHOLD_LIMIT)
+    return np.concatenate([-pad, inner, pad], axis=-1)
+
+def polychoric_from_tables(tables: np.ndarray, iterations: int = 40) -> np.ndarray:
+    """Polychoric correlation per contingency table (..., levels, levels). The likelihood in rho
+    is maximized by a golden-section search run for all tables at once."""
+    shape = tables.shape[:-2]
+    tables = tables.reshape((-1,) + tables.shape[-2:])
+    h = _thresholds(tables.sum(axis=-1))[:, :, None]
+    k = _thresholds(tables.sum(axis=-2))[:, None, :]
+
+    def log_likelihood(rho):
+        cdf = bivariate_normal_cdf(h, k, rho[:, None, None])
+        cells = cdf[:, 1:, 1:] - cdf[:, :-1, 1:] - cdf[:, 1:, :-1] + cdf[:, :-1, :-1]
+        return np.where(tables > 0, tables * np.log(np.maximum(cells, 1e-300)), 0).sum(axis=(1, 2))
+
+    ratio = (math.sqrt(5) - 1) / 2
+    low, high = np.full(len(tables), -0.999), np.full(len(tables), 0.999)
+    left, right = high - ratio * (high - low), low + ratio * (high - low)
+    f_left, f_right = log_likelihood(left), log_likelihood(right)
+    for _ in range(iterations):
+        move_up = f_left < f_right  # The maximum lies in [left, high]
+        low = np.where(move_up, left, low)
+        high = np.where(move_up, high, right)
+        left, right = np.where(move_up, right, high - ratio * (high - low)), np.where(move_up, low + ratio * (high - low), left)
+        f_new = log_likelihood(np.where(move_up, right, left))
+        f_left, f_right = np.where(move_up, f_right, f_new), np.where(move_up, f_new, f_left)
+    rho = (low + high) / 2
+
+    rows, columns = tables.sum(axis=-1), tables.sum(axis=-2)
+    degenerate = ((rows > 0).sum(axis=-1) < 2) | ((columns > 0).sum(axis=-1) < 2)
+    rho[degenerate] = np.nan
+    return rho.reshape(shape)
@@ -0,0 +1,305 @@
+"""
+Local HTTP ingestion service for collecting survey responses from many clients at once.
+
+Request handlers never touch the SurveyCollector. They drop responses into a sharded buffer and
+await a future. A single flusher task drains the buffer every ``flush_interval`` seconds, or
+sooner once ``max_batch`` responses are waiting. It validates the whole batch with the survey's
+compiled ValidationPlan (the rules behind validate_response()) and bulk-appends the valid rows
+with collect_frame(). The validation and the append run in a worker thread under ``lock``, so
+other threads touching the collector should hold the same lock. collect_frame() is all or
+nothing, so a batch that fails is retried submission by submission and only the failing
+submissions are answered with a 500 (none of their responses stored).
+
+Endpoints:
+    POST /responses  one response object, or a list of them
+    GET  /stats      ingestion counters and the number of stored responses
+
+Usage (the CLI lives with the survey model):
+    python survey-questions.py --serve --port 8765
+"""
+
+import json
+import time
+import asyncio
+import logging
+import itertools
+import threading
+from collections import Counter, deque
+from http import HTTPStatus
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN_QUESTION = 'unknown question'
+
+class ShardedBuffer:
+    """Pending items spread round-robin over deques. deque.append and popleft are atomic, so
+    producers on any thread append without a shared lock while one consumer drains. Drains visit
+    the shards in turn, so submissions from different clients may be collected out of arrival order."""
+    def __init__(self, shards: int = 8):
+        self._shards: List[Deque[Any]] = [deque() for _ in range(shards)]
+        self._next = itertools.count()
+
+    def append(self, item: Any, size: int = 1) -> None:
+        self._shards[next(self._next) % len(self._shards)].append((item, size))
+
+    def drain(self) -> List[Any]:
+        """Remove and return the items present when each shard is visited"""
+        items = []
+        for shard in self._shards:
+            for _ in range(len(shard)):
+                items.append(shard.popleft()[0])
+        return items
+
+    def pending(self) -> int:
+        """Responses waiting across all shards (approximate while producers append)"""
+        return sum(size for shard in self._shards for _, size in list(shard))
+
+class IngestionService:
+    """Buffers POSTed responses and validates and collects them in periodic batches.
+
+    Each submission resolves to one result per response: ``{'accepted': True}``, or
+    ``{'accepted': False, 'errors': {question_id: [error names]}}``."""
+    def __init__(self, survey: Any, flush_interval: float = 0.05, max_batch: int = 5000,
+                 shards: int = 8, max_pending: int = 100_000, max_body: int = 1 << 20):
+        self.survey = survey
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_body = max_body
+        self.lock = threading.Lock()
+        self.buffer = ShardedBuffer(shards)
+        self.question_ids = {question.question_id for question in survey.iter_questions()}
+        self._pending = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.errors: Counter = Counter()
+        self.started = time.monotonic()
+
+    # Batching
+
+    async def submit(self, responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Queue responses for the next flush and wait for their results"""
+        if self._flusher is None:
+            raise RuntimeError("The ingestion service is not running")
+        future = asyncio.get_running_loop().create_future()
+        self.buffer.append((responses, future), len(responses))
+        self._pending += len(responses)
+        if self._pending >= self.max_batch:
+            self._wakeup.set()
+        return await future
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Validate and collect everything buffered so far, then resolve the waiting futures"""
+        items = self.buffer.drain()
+        if not items:
+            return
+        self._pending -= sum(len(batch) for batch, _ in items)
+        await self._resolve(items)
+
+    async def _resolve(self, items: List[Tuple[List[Dict[str, Any]], asyncio.Future]]) -> None:
+        responses = [response for batch, _ in items for response in batch]
+        try:
+            results = await asyncio.to_thread(self._collect, responses)
+        except Exception as e:
+            if len(items) > 1:
+                # Nothing was collected; retry submission by submission so only the failing ones see the error
+                for item in items:
+                    await self._resolve([item])
+                return
+            logging.error(f"Collecting a submission of {len(responses)} responses failed: {e}")
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        offset = 0
+        for batch, future in items:
+            if not future.done():
+                future.set_result(results[offset:offset + len(batch)])
+            offset += len(batch)
+
+    def _collect(self, responses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        frame = pd.DataFrame(responses, index=pd.RangeIndex(len(responses)))
+        with self.lock:
+            plan = self.survey.validation_plan
+            codes = plan.question_errors(frame)
+            unknown = [question_id for question_id in frame.columns if question_id not in self.question_ids]
+            invalid = np.zeros(len(frame), dtype=bool)
+            if not codes.columns.empty:
+                invalid |= np.bitwise_or.reduce(codes.to_numpy(), axis=1) > 0
+            for question_id in unknown:
+                invalid |= frame[question_id].notna().to_numpy()
+            valid = frame.loc[~invalid, [question_id for question_id in frame.columns if question_id not in unknown]]
+            if len(valid):
+                self.survey.collect_frame(valid.reset_index(drop=True))
+
+            results: List[Dict[str, Any]] = [{'accepted': True} for _ in range(len(frame))]
+            answered = {question_id: frame[question_id].notna().to_numpy() for question_id in unknown}
+            for row in np.flatnonzero(invalid):
+                errors = {question_id: plan.describe(int(code)) for question_id, code in codes.iloc[row].items() if code}
+                errors.update({question_id: [UNKNOWN_QUESTION] for question_id in unknown if answered[question_id][row]})
+                for question_id, names in errors.items():
+                    self.errors.update((question_id, name) for name in names)
+                results[row] = {'accepted': False, 'errors': errors}
+            rejected = int(invalid.sum())
+            self.rejected += rejected
+            self.accepted += len(frame) - rejected
+            self.flushes += 1
+            self.flush_seconds += time.perf_counter() - start
+        if rejected:
+            logging.warning(f"Rejected {rejected} of {len(frame)} responses in flush {self.flushes}")
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'stored_responses': len(self.survey.store),
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'pending': self.buffer.pending(),
+                'flushes': self.flushes,
+                'mean_flush_ms': self.flush_seconds / self.flushes * 1000 if self.flushes else 0,
+                'uptime_seconds': time.monotonic() - self.started,
+                'top_errors': [{'question_id': question_id, 'error': error, 'count': count}
+                               for (question_id, error), count in self.errors.most_common(10)],
+            }
+
+    # HTTP
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        self._wakeup = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop())
+        self._server = await asyncio.start_server(self._handle_connection, host, port, backlog=1024)
+        return self._server
+
+    async def stop(self) -> None:
+        """Stop accepting connections and collect whatever is still buffered"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        self._flusher = None
+
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        server = await self.start(host, port)
+        addresses = ', '.join(f"{name[0]}:{name[1]}" for name in (socket.getsockname() for socket in server.sockets))
+        logging.info(f"Ingesting responses for {self.survey.survey_id} on http://{addresses}/responses")
+        try:
+            await server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """HTTP/1.1 with keep-alive and Content-Length bodies; one request at a time per connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                parts = request_line.decode('latin-1').split()
+                keep_alive = len(parts) == 3 and parts[2] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                if len(parts) != 3:
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': 'Malformed request line'}
+                    keep_alive = False
+                elif 'transfer-encoding' in headers:
+                    status, payload = HTTPStatus.LENGTH_REQUIRED, {'error': 'Send a Content-Length body'}
+                    keep_alive = False
+                else:
+                    try:
+                        length = int(headers.get('content-length') or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0 or length > self.max_body:
+                        status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': f"Bodies are limited to {self.max_body} bytes"}
+                        keep_alive = False
+                    else:
+                        body = await reader.readexactly(length) if length else b''
+                        try:
+                            status, payload = await self._route(parts[0], parts[1].split('?', 1)[0], body)
+                        except Exception as e:
+                            logging.error(f"{parts[0]} {parts[1]} failed: {e}")
+                            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Internal error, nothing from this request was stored'}
+
+                content = json.dumps(payload).encode('utf-8')
+                head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                        f"Content-Type: application/json\r\n"
+                        f"Content-Length: {len(content)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+                if status == HTTPStatus.SERVICE_UNAVAILABLE:
+                    head += "Retry-After: 1\r\n"
+                writer.write(head.encode('latin-1') + b'\r\n' + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Any]:
+        if path == '/responses':
+            if method != 'POST':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use POST'}
+            return await self._post_responses(body)
+        if path == '/stats':
+            if method != 'GET':
+                return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Use GET'}
+            return HTTPStatus.OK, self.stats()
+        return HTTPStatus.NOT_FOUND, {'error': f"No such endpoint: {path}"}
+
+    async def _post_responses(self, body: bytes) -> Tuple[HTTPStatus, Any]:
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': f"Invalid JSON: {e}"}
+        single = isinstance(data, dict)
+        responses = [data] if single else data
+        if not isinstance(responses, list) or not responses or not all(isinstance(response, dict) for response in responses):
+            return HTTPStatus.BAD_REQUEST, {'error': 'Expected a response object or a non-empty list of them'}
+        if self._pending + len(responses) > self.max_pending:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'Ingestion backlog is full, retry shortly'}
+
+        results = await self.submit(responses)
+        if single:
+            return (HTTPStatus.CREATED if results[0]['accepted'] else HTTPStatus.UNPROCESSABLE_ENTITY), results[0]
+        rejected = [dict(index=index, errors=result['errors']) for index, result in enumerate(results) if not result['accepted']]
+        return HTTPStatus.OK, {'accepted': len(results) - len(rejected), 'rejected': rejected}
+
+def serve(survey: Any, host: str = '127.0.0.1', port: int = 8765, **options: Any) -> IngestionService:
+    """Run an IngestionService for ``survey`` until interrupted; returns it for inspection"""
+    service = IngestionService(survey, **options)
+    try:
+        asyncio.run(service.serve_forever(host, port))
+    except KeyboardInterrupt:
+        logging.info(f"Stopped after accepting {service.accepted} and rejecting {service.rejected} responses")
+    return service
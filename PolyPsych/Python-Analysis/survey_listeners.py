@@ -0,0 +1,47 @@
+"""
+Base class for incremental views over a SurveyCollector's responses.
+
+A StoreListener registers with SurveyCollector.add_listener() and reads new rows straight from the
+survey's column store instead of receiving them one by one. It catches up once ``batch_size`` rows
+are pending, and before answering a query (refresh()), so collecting stays cheap between queries.
+"""
+
+from typing import Any
+
+class StoreListener:
+    """Subclasses implement _pull(store, start, stop), which folds rows [start, stop) of a
+    ResponseStore in and advances ``rows_seen`` (their own update methods, which can also be fed
+    directly, do the advancing)."""
+    def __init__(self, batch_size: int = 1000):
+        self.batch_size = batch_size
+        self.rows_seen = 0
+        self._source = None
+
+    def attach(self, survey: Any) -> 'StoreListener':
+        """Follow a SurveyCollector: take in its collected responses and register as a listener"""
+        self._source = survey
+        survey.add_listener(self)
+        self.refresh()
+        return self
+
+    def detach(self) -> None:
+        """Stop following the attached survey; what was taken in so far stays queryable"""
+        if self._source is not None:
+            self._source.remove_listener(self)
+            self._source = None
+
+    def on_collect(self, survey: Any, start: int, stop: int) -> None:
+        if stop - self.rows_seen >= self.batch_size:
+            self.refresh()
+
+    def refresh(self) -> None:
+        """Take in the rows collected since the last refresh from the attached survey"""
+        if self._source is None:
+            return
+        store = self._source.store
+        stop = len(store)
+        if stop > self.rows_seen:
+            self._pull(store, self.rows_seen, stop)
+
+    def _pull(self, store: Any, start: int, stop: int) -> None:
+        raise NotImplementedError
@@ -0,0 +1,210 @@
+"""
+Segmentation cube for slicing survey results by demographic questions.
+
+SegmentationCube keeps one cell per combination of (binned) dimension answers seen so far, with
+the number of responses and, for every measure question, the count, sum and sum of squares of
+its numeric answers. Any crosstab or group-by over a subset of the dimensions is a roll-up of
+those cells, so queries never revisit the raw responses.
+"""
+
+import math
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from survey_listeners import StoreListener
+
+NO_ANSWER = '(no answer)'  # Segment label for respondents who skipped a dimension question
+
+class CategoryBinner:
+    """Answers as their own segments. A multi-select answer becomes one segment labelled with
+    the tuple of its selected options, so every response lands in exactly one cell."""
+    def __call__(self, answers: pd.Series) -> pd.Series:
+        return answers.astype(object).map(lambda answer: tuple(answer) if isinstance(answer, list) else answer)
+
+class NumericBinner:
+    """Numeric (or numeric-text, e.g. Age) answers cut into intervals [edges[i], edges[i + 1])"""
+    def __init__(self, edges: Sequence[float], labels: Optional[Sequence[str]] = None):
+        self.edges = list(edges)
+        if labels is None:
+            labels = [self._label(low, high) for low, high in zip(self.edges, self.edges[1:])]
+        self.labels = list(labels)
+
+    @staticmethod
+    def _label(low: float, high: float) -> str:
+        number = lambda value: f"{value:g}"
+        if math.isinf(high):
+            return f"{number(low)}+"
+        if float(high).is_integer() and float(low).is_integer():
+            return f"{number(low)}-{number(high - 1)}"
+        return f"{number(low)}-{number(high)}"
+
+    def __call__(self, answers: pd.Series) -> pd.Series:
+        values = pd.to_numeric(answers, errors='coerce')
+        return pd.cut(values, self.edges, labels=self.labels, right=False).astype(object)
+
+class MappingBinner:
+    """Answers relabelled through ``mapping`` (e.g. collapsing party options); unmapped answers
+    fall into ``default``, or keep their own label when no default is given"""
+    def __init__(self, mapping: Dict[Any, Any], default: Any = None):
+        self.mapping = mapping
+        self.default = default
+
+    def __call__(self, answers: pd.Series) -> pd.Series:
+        mapped = answers.astype(object).map(self.mapping)
+        fallback = answers.astype(object) if self.default is None else self.default
+        return mapped.where(mapped.notna() | answers.isna(), fallback)
+
+class SegmentationCube(StoreListener):
+    """Sparse OLAP-style cube: a dict from segment key (one label per dimension) to a cell row in
+    numpy arrays of response counts and per-measure count / sum / sum of squares.
+
+    Each response falls into exactly one cell, so roll-ups are exact. Filters on a multi-select
+    dimension accept a callable over its tuple labels, e.g. ``lambda options: 'Asian (4)' in options``."""
+    def __init__(self, dimensions: Union[Iterable[str], Dict[str, Callable[[pd.Series], pd.Series]]],
+                 measures: Iterable[str] = (), batch_size: int = 1000):
+        if not isinstance(dimensions, dict):
+            dimensions = {dimension: CategoryBinner() for dimension in dimensions}
+        if not dimensions:
+            raise ValueError("A segmentation cube needs at least one dimension")
+        self.dimensions = dict(dimensions)
+        self.measures = [measure for measure in measures if measure not in self.dimensions]
+        super().__init__(batch_size)
+        self._cells: Dict[tuple, int] = {}
+        self._counts = np.zeros(16)
+        self._stats = np.zeros((16, len(self.measures), 3))  # n, sum, sum of squares
+        self._frame: Optional[pd.DataFrame] = None
+
+    # Feeding
+
+    def _pull(self, store: Any, start: int, stop: int) -> None:
+        self.update(store.to_dataframe(start, stop, list(self.dimensions) + self.measures))
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Fold in a batch of raw responses (one column per dimension and measure question)"""
+        if not len(frame):
+            return
+        missing = pd.Series(None, index=frame.index, dtype=object)
+        keys = pd.DataFrame({dimension: binner(frame[dimension] if dimension in frame else missing)
+                             for dimension, binner in self.dimensions.items()}, index=frame.index)
+        keys = keys.astype(object).where(keys.notna(), NO_ANSWER)
+
+        values = np.full((len(keys), len(self.measures)), np.nan)
+        for position, measure in enumerate(self.measures):
+            if measure in frame:
+                values[:, position] = pd.to_numeric(frame[measure], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        batch = pd.DataFrame(np.hstack([np.ones((len(keys), 1)), present, filled, filled * filled]))
+        batch.index = pd.MultiIndex.from_frame(keys.reset_index(drop=True)) if len(self.dimensions) > 1 \
+            else pd.Index(keys.iloc[:, 0].to_numpy(), name=keys.columns[0])
+        sums = batch.groupby(level=list(range(len(self.dimensions))), sort=False).sum()
+
+        measures = len(self.measures)
+        for key, row in zip(sums.index, sums.to_numpy()):
+            key = key if isinstance(key, tuple) else (key,)
+            cell = self._cells.get(key)
+            if cell is None:
+                cell = self._cells[key] = len(self._cells)
+                if cell == len(self._counts):
+                    self._counts = np.concatenate([self._counts, np.zeros(len(self._counts))])
+                    self._stats = np.concatenate([self._stats, np.zeros_like(self._stats)])
+            self._counts[cell] += row[0]
+            self._stats[cell, :, 0] += row[1:1 + measures]
+            self._stats[cell, :, 1] += row[1 + measures:1 + 2 * measures]
+            self._stats[cell, :, 2] += row[1 + 2 * measures:]
+        self.rows_seen += len(frame)
+        self._frame = None
+
+    # Queries
+
+    def cells(self) -> pd.DataFrame:
+        """One row per non-empty cell: the dimension labels, 'count', and per measure
+        '<measure>_n', '<measure>_sum' and '<measure>_sumsq'"""
+        self.refresh()
+        if self._frame is None:
+            size = len(self._cells)
+            frame = pd.DataFrame(list(self._cells), columns=list(self.dimensions))
+            frame['count'] = self._counts[:size].astype(np.int64)
+            for position, measure in enumerate(self.measures):
+                frame[f"{measure}_n"] = self._stats[:size, position, 0].astype(np.int64)
+                frame[f"{measure}_sum"] = self._stats[:size, position, 1]
+                frame[f"{measure}_sumsq"] = self._stats[:size, position, 2]
+            self._frame = frame
+        return self._frame
+
+    def _filtered(self, filters: Optional[Dict[str, Any]]) -> pd.DataFrame:
+        cells = self.cells()
+        for dimension, accepted in (filters or {}).items():
+            if dimension not in self.dimensions:
+                raise ValueError(f"{dimension} is not a dimension of this cube")
+            if callable(accepted):
+                cells = cells[cells[dimension].map(accepted).astype(bool)]
+            elif isinstance(accepted, (list, set, frozenset)):
+                cells = cells[cells[dimension].isin(list(accepted))]
+            else:
+                cells = cells[cells[dimension] == accepted]
+        return cells
+
+    def groupby(self, dimensions: Sequence[str] = (), measures: Optional[Sequence[str]] = None,
+                filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Response count plus mean, std and n of each measure per segment of ``dimensions``
+        (the whole, filtered sample when no dimensions are given)"""
+        dimensions = list(dimensions)
+        unknown = [dimension for dimension in dimensions if dimension not in self.dimensions]
+        if unknown:
+            raise ValueError(f"{unknown} are not dimensions of this cube")
+        measures = self.measures if measures is None else list(measures)
+        unknown = [measure for measure in measures if measure not in self.measures]
+        if unknown:
+            raise ValueError(f"{unknown} are not measures of this cube")
+
+        cells = self._filtered(filters)
+        columns = ['count'] + [f"{measure}_{stat}" for measure in measures for stat in ('n', 'sum', 'sumsq')]
+        if dimensions:
+            totals = cells.groupby(dimensions, sort=False)[columns].sum()
+            try:
+                totals = totals.sort_index()
+            except TypeError:  # Labels of mixed types (e.g. numbers and NO_ANSWER) keep first-seen order
+                pass
+        else:
+            totals = cells[columns].sum().to_frame('all').T
+        result = totals[['count']].astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for measure in measures:
+                n = totals[f"{measure}_n"].astype(np.float64)
+                total, squares = totals[f"{measure}_sum"], totals[f"{measure}_sumsq"]
+                result[f"{measure}_mean"] = (total / n).where(n > 0)
+                result[f"{measure}_std"] = np.sqrt(((squares - total * total / n) / (n - 1)).clip(lower=0)).where(n > 1)
+                result[f"{measure}_n"] = n.astype(np.int64)
+        return result
+
+    def crosstab(self, rows: Union[str, Sequence[str]], columns: Union[str, Sequence[str], None] = None,
+                 measure: Optional[str] = None, stat: str = 'count', normalize: Union[bool, str] = False,
+                 filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Table of ``stat`` ('count', or 'mean' / 'std' / 'n' of ``measure``) with ``rows`` down
+        the side and ``columns`` across. Counts can be normalized to percentages like pd.crosstab
+        (True for the whole table, 'index' within rows, 'columns' within columns)."""
+        rows = [rows] if isinstance(rows, str) else list(rows)
+        columns = [] if columns is None else [columns] if isinstance(columns, str) else list(columns)
+        if stat == 'count':
+            value = 'count'
+        elif measure is None:
+            raise ValueError(f"stat {stat!r} needs a measure")
+        elif stat in ('mean', 'std', 'n'):
+            value = f"{measure}_{stat}"
+        else:
+            raise ValueError("Unsupported stat. Please use 'count', 'mean', 'std' or 'n'.")
+
+        grouped = self.groupby(rows + columns, [measure] if measure else [], filters)[value]
+        table = grouped.unstack(columns) if columns else grouped.to_frame(value)
+        if stat == 'count':
+            table = table.fillna(0).astype(np.int64)
+            if normalize is True or normalize == 'all':
+                table = table / table.to_numpy().sum() * 100
+            elif normalize == 'index':
+                table = table.div(table.sum(axis=1), axis=0) * 100
+            elif normalize == 'columns':
+                table = table.div(table.sum(axis=0), axis=1) * 100
+        return table
@@ -0,0 +1,221 @@
+"""
+Incremental index over the free-text answers of one survey question.
+
+TextResponseIndex dedupes answers by a hash of their normalized text, keeps an inverted token
+index for searching, running n-gram frequencies, and MinHash signatures bucketed with
+locality-sensitive hashing so that near-duplicate answers are clustered as they arrive.
+Indexing is pure Python, so build an index for the questions you want to search or cluster
+(SurveyCollector.text_index()) rather than for every open-ended question.
+"""
+
+import re
+import hashlib
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from survey_listeners import StoreListener
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'to', 'in', 'on', 'at', 'by', 'for', 'with',
+    'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'it', 'its', 'that', 'this', 'these',
+    'those', 'i', 'me', 'my', 'you', 'your', 'he', 'she', 'we', 'our', 'they', 'their', 'them',
+    'so', 'do', 'did', 'would', 'could', 'should', 'will', 'can', 'there', 'what', 'which', 'who',
+    'about', 'more', 'than', 'just', 'also', 'very', 'have', 'has', 'had',
+})
+
+MINHASH_PRIME = 4294967311  # Smallest prime above 2 ** 32
+
+class TextResponseIndex(StoreListener):
+    """Deduplicated, searchable free-text answers with n-gram counts and near-duplicate clusters.
+
+    Near-duplicates are answers whose word-bigram Jaccard similarity, estimated from ``bands`` x
+    ``rows`` MinHash values, reaches ``threshold``. Candidates come from LSH buckets, so only
+    answers sharing a band are ever compared."""
+    def __init__(self, question_id: Optional[str] = None, max_ngram: int = 3,
+                 stop_words: Iterable[str] = STOP_WORDS, threshold: float = 0.7,
+                 bands: int = 16, rows: int = 4, batch_size: int = 100, seed: int = 0):
+        self.question_id = question_id
+        self.max_ngram = max_ngram
+        self.stop_words = frozenset(stop_words)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        super().__init__(batch_size)
+
+        self.texts: List[str] = []  # First spelling of each distinct answer
+        self.counts: List[int] = []  # Responses per distinct answer
+        self.responses = 0
+        self.total_length = 0
+        self._documents: Dict[bytes, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self.ngram_counts: Dict[int, Counter] = {n: Counter() for n in range(1, max_ngram + 1)}
+
+        rng = np.random.default_rng(seed)
+        permutations = bands * rows
+        self._a = rng.integers(1, 2 ** 32 - 1, size=permutations, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32 - 1, size=permutations, dtype=np.uint64)
+        self._signatures = np.zeros((16, permutations), dtype=np.uint64)
+        self._has_signature: List[bool] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._parent: List[int] = []
+
+    # Feeding
+
+    def attach(self, survey: Any, question_id: Optional[str] = None) -> 'TextResponseIndex':
+        """Follow one question of a SurveyCollector"""
+        self.question_id = question_id or self.question_id
+        if self.question_id is None:
+            raise ValueError("An attached text index needs a question_id")
+        return super().attach(survey)
+
+    def _pull(self, store: Any, start: int, stop: int) -> None:
+        self.add_many(store.to_dataframe(start, stop, [self.question_id])[self.question_id])
+
+    def add_many(self, answers: Iterable[Any]) -> None:
+        """Index a batch of answers; missing (None/NA) and blank answers are skipped"""
+        for answer in answers:
+            self.rows_seen += 1
+            if answer is None or answer is pd.NA or (isinstance(answer, float) and answer != answer):
+                continue
+            self.add(str(answer))
+
+    def add(self, text: str) -> int:
+        """Index one answer, returning the id of its distinct text (-1 when blank)"""
+        normalized = ' '.join(text.lower().split())
+        if not normalized:
+            return -1
+        self.responses += 1
+        self.total_length += len(text)
+        key = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+        document = self._documents.get(key)
+        tokens = TOKEN_PATTERN.findall(normalized)
+        terms = [token for token in tokens if token not in self.stop_words]
+        for n, counter in self.ngram_counts.items():
+            counter.update(' '.join(terms[i:i + n]) for i in range(len(terms) - n + 1))
+        if document is not None:
+            self.counts[document] += 1
+            return document
+
+        document = self._documents[key] = len(self.texts)
+        self.texts.append(text)
+        self.counts.append(1)
+        for term in dict.fromkeys(terms):
+            self._postings.setdefault(term, []).append(document)
+        self._parent.append(document)
+        self._add_signature(document, tokens)
+        return document
+
+    # Near-duplicates
+
+    def _shingles(self, tokens: List[str]) -> np.ndarray:
+        shingles = [f"{first} {second}" for first, second in zip(tokens, tokens[1:])] or tokens
+        return np.array([zlib.crc32(shingle.encode('utf-8')) for shingle in shingles], dtype=np.uint64)
+
+    def _add_signature(self, document: int, tokens: List[str]) -> None:
+        if document == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.zeros_like(self._signatures)])
+        if not tokens:
+            self._has_signature.append(False)
+            return
+        hashes = self._shingles(tokens)
+        signature = ((np.outer(hashes, self._a) + self._b) % np.uint64(MINHASH_PRIME)).min(axis=0)
+        self._signatures[document] = signature
+        self._has_signature.append(True)
+
+        candidates = set()
+        for band, buckets in enumerate(self._buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            bucket = buckets.setdefault(key, [])
+            candidates.update(bucket)
+            bucket.append(document)
+        if candidates:
+            others = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+            similarity = (self._signatures[others] == signature).mean(axis=1)
+            for other in others[similarity >= self.threshold]:
+                self._union(document, int(other))
+
+    def _find(self, document: int) -> int:
+        parent = self._parent
+        while parent[document] != document:
+            parent[document] = parent[parent[document]]
+            document = parent[document]
+        return document
+
+    def _union(self, first: int, second: int) -> None:
+        first, second = self._find(first), self._find(second)
+        if first != second:
+            self._parent[max(first, second)] = min(first, second)
+
+    def similarity(self, first: str, second: str) -> float:
+        """MinHash estimate of the word-bigram Jaccard similarity of two texts"""
+        signatures = []
+        for text in (first, second):
+            hashes = self._shingles(TOKEN_PATTERN.findall(' '.join(text.lower().split())))
+            if not len(hashes):
+                return 0.0
+            signatures.append(((np.outer(hashes, self._a) + self._b) % np.uint64(MINHASH_PRIME)).min(axis=0))
+        return float((signatures[0] == signatures[1]).mean())
+
+    # Queries
+
+    def search(self, query: str, limit: Optional[int] = 20, match: str = 'all') -> pd.DataFrame:
+        """Distinct answers containing all (``match='all'``) or any (``'any'``) of the query's
+        terms, most frequent first"""
+        self.refresh()
+        terms = [term for term in dict.fromkeys(TOKEN_PATTERN.findall(query.lower())) if term not in self.stop_words]
+        postings = sorted((self._postings.get(term, []) for term in terms), key=len)
+        if not postings:
+            documents = set()
+        elif match == 'all':
+            documents = set(postings[0])
+            for posting in postings[1:]:
+                documents.intersection_update(posting)
+        elif match == 'any':
+            documents = set().union(*postings)
+        else:
+            raise ValueError("Unsupported match. Please use 'all' or 'any'.")
+        ranked = sorted(documents, key=lambda document: (-self.counts[document], document))[:limit]
+        return pd.DataFrame({'text': [self.texts[document] for document in ranked],
+                             'responses': [self.counts[document] for document in ranked]})
+
+    def top_ngrams(self, n: int = 1, limit: int = 20) -> pd.DataFrame:
+        """Most frequent n-grams of non-stop-word terms, counted per response"""
+        self.refresh()
+        if n not in self.ngram_counts:
+            raise ValueError(f"n-grams are counted up to n={self.max_ngram}")
+        return pd.DataFrame(self.ngram_counts[n].most_common(limit), columns=['ngram', 'count'])
+
+    def clusters(self, min_size: int = 2) -> pd.DataFrame:
+        """Near-duplicate clusters of at least ``min_size`` distinct answers, largest (by
+        responses) first: one row per answer with its cluster number"""
+        self.refresh()
+        members: Dict[int, List[int]] = {}
+        for document in range(len(self.texts)):
+            if self._has_signature[document]:
+                members.setdefault(self._find(document), []).append(document)
+        groups = [group for group in members.values() if len(group) >= min_size]
+        groups.sort(key=lambda group: (-sum(self.counts[document] for document in group), group[0]))
+        rows = [(number, self.texts[document], self.counts[document])
+                for number, group in enumerate(groups)
+                for document in sorted(group, key=lambda document: -self.counts[document])]
+        return pd.DataFrame(rows, columns=['cluster', 'text', 'responses'])
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        self.refresh()
+        clusters = self.clusters()
+        return {
+            'response_count': self.responses,
+            'unique_responses': len(self.texts),
+            'avg_length': self.total_length / self.responses if self.responses else 0,
+            'top_terms': dict(self.ngram_counts[1].most_common(top)),
+            'top_phrases': dict(self.ngram_counts[min(2, self.max_ngram)].most_common(top)),
+            'near_duplicate_clusters': int(clusters['cluster'].nunique()) if len(clusters) else 0,
+            'sample_responses': [self.texts[document] for document in
+                                 sorted(range(len(self.texts)), key=lambda document: -self.counts[document])[:5]],
+        }
@@ -0,0 +1,22 @@
+import sys
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ANALYSIS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ANALYSIS_DIR))
+
+@pytest.fixture(scope='session')
+def sq():
+    """survey-questions.py loaded as a module (its file name is not importable)"""
+    spec = importlib.util.spec_from_file_location('survey_questions', ANALYSIS_DIR / 'survey-questions.py')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['survey_questions'] = module
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture
+def survey(sq):
+    """Fresh collector for the shipped JSON survey definition"""
+    return sq.load_survey_definition(use_cache=False)
@@ -0,0 +1,83 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+def test_numeric_aggregate_matches_numpy(sq):
+    values = np.random.default_rng(0).integers(0, 11, size=501).tolist()
+    aggregate = sq.NumericAggregate()
+    for value in values:
+        aggregate.add(value)
+    aggregate.add(True)  # Booleans and text are not numbers to a scale question
+    aggregate.add('n/a')
+    summary = aggregate.summary()
+    assert summary['count'] == len(values)
+    assert summary['mean'] == pytest.approx(np.mean(values))
+    assert summary['variance'] == pytest.approx(np.var(values, ddof=1))
+    assert summary['std'] == pytest.approx(np.std(values, ddof=1))
+    assert summary['median'] == np.median(values)
+    assert summary['mode'] == Counter(values).most_common(1)[0][0]
+
+def test_numeric_batches_merge_like_one_pass(sq):
+    values = np.random.default_rng(1).normal(4, 2, size=1000)
+    one_pass = sq.NumericAggregate()
+    for value in values:
+        one_pass.add(float(value))
+    batched = sq.NumericAggregate()
+    for chunk in np.array_split(values, 7):
+        batched.add_many(pd.Series(chunk))
+    assert batched.count == one_pass.count
+    assert batched.mean == pytest.approx(one_pass.mean)
+    assert batched.variance == pytest.approx(one_pass.variance)
+    assert batched.median() == pytest.approx(np.median(values))
+
+def test_even_count_median(sq):
+    aggregate = sq.NumericAggregate()
+    aggregate.add_many(pd.Series([1, 2, 3, 10, np.nan]))
+    assert aggregate.median() == 2.5
+    assert sq.NumericAggregate().summary()['median'] is None
+
+def test_multi_select_counts_each_respondent_once(survey):
+    survey.collect_response({'Race': ['Asian (4)', 'Other (6)']})
+    survey.collect_response({'Race': ['Asian (4)']})
+    survey.collect_response({'Race': 'Other (6)'})
+    survey.collect_frame(pd.DataFrame({'Race': [['Asian (4)', 'White or Caucasian (1)'], None]}))
+    counts = survey.process_responses()['Race']
+    assert counts == {'Asian (4)': 3, 'Other (6)': 2, 'White or Caucasian (1)': 1}
+
+def test_multi_select_aggregate_ignores_repeated_options(sq):
+    aggregate = sq.MultiSelectAggregate()
+    aggregate.add(['Asian (4)', 'Asian (4)', 'Other (6)'])
+    aggregate.add_many(pd.Series([['Other (6)'], None, ['Other (6)', 'Other (6)']], dtype=object))
+    assert aggregate.summary() == {'Asian (4)': 1, 'Other (6)': 3}
+
+def test_aggregates_match_the_responses(survey):
+    rng = np.random.default_rng(2)
+    years = survey.get_question('Year').options
+    for _ in range(200):
+        survey.collect_response({'Year': years[rng.integers(len(years))], 'Political_Views': int(rng.integers(0, 8)),
+                                 'Feedback': str(rng.choice(['yes', 'no', 'maybe']))})
+    survey.collect_frame(pd.DataFrame({'Year': [years[0], None], 'Political_Views': [7.0, np.nan]}))
+
+    rows = list(survey.responses)
+    summary = survey.process_responses()
+    assert summary['Year'] == Counter(row['Year'] for row in rows if 'Year' in row)
+    assert summary['Feedback'] == Counter(row['Feedback'] for row in rows if 'Feedback' in row)
+    views = [row['Political_Views'] for row in rows if 'Political_Views' in row]
+    assert summary['Political_Views']['count'] == len(views) == 201
+    assert summary['Political_Views']['mean'] == pytest.approx(np.mean(views))
+    assert math.isclose(summary['Political_Views']['variance'], np.var(views, ddof=1))
+
+def test_responses_cannot_be_edited_behind_the_aggregates(survey):
+    survey.collect_response({'Year': 'Junior (3)'})
+    with pytest.raises(AttributeError):
+        survey.responses = []
+    with pytest.raises(AttributeError):
+        survey.responses.append({'Year': 'Senior (4)'})
+    with pytest.raises(TypeError):
+        survey.responses[0] = {'Year': 'Senior (4)'}
+    survey.responses[0]['Year'] = 'Senior (4)'  # Rows are rebuilt on access, so this edits a copy
+    assert survey.responses[0] == {'Year': 'Junior (3)'}
+    assert survey.process_responses() == {'Year': {'Junior (3)': 1}}
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+def test_skipped_text_answer_keeps_cached_result_valid(sq, survey):
+    for answer in ['Parking', 'More parking', 'Parking']:
+        survey.collect_response({'Feedback': answer, 'Year': 'Junior (3)'})
+    analyzer = sq.ResponseAnalyzer(survey)
+    first = analyzer.analyze_question('Feedback')
+    survey.collect_response({'Year': 'Senior (4)'})  # Skips Feedback, so its column version stays
+    cached = analyzer.analyze_question('Feedback')
+    fresh = sq.ResponseAnalyzer(survey).analyze_question('Feedback')
+    assert cached == fresh == first
+    assert fresh['unique_responses'] == 2
+    assert fresh['sample_responses'] == ['Parking', 'More parking']
+
+QUESTIONS = ['P_Efficacy', 'ABC_News', 'Political_Views', 'Disinfo_threat', 'Year', 'Household_Income', 'Race', 'Age', 'Feedback']
+
+@pytest.fixture
+def answered(survey):
+    """Random valid answers to questions of every type, each skipped by some respondents"""
+    rng = np.random.default_rng(0)
+    plan = survey.validation_plan
+    for _ in range(300):
+        response = {}
+        for question_id in QUESTIONS:
+            if rng.random() < 0.15:
+                continue
+            question = survey.get_question(question_id)
+            if question.question_type in ('likert_scale', 'scale'):
+                low, high = plan.ranges[question_id]
+                response[question_id] = int(rng.integers(low, high + 1))
+            elif question.multi_select:
+                chosen = rng.choice(len(question.options), size=int(rng.integers(1, 3)), replace=False)
+                response[question_id] = [question.options[position] for position in sorted(chosen)]
+            elif question.options:
+                response[question_id] = question.options[rng.integers(len(question.options))]
+            else:
+                response[question_id] = str(rng.choice(['18', '19', '20', 'Great', 'More parking please']))
+        survey.collect_response(response)
+    return survey
+
+def summary_as_results(summary, question_id):
+    """One question's rows of the tidy summary in analyze_question()'s shape"""
+    rows = summary[summary['question_id'] == question_id]
+    result = {}
+    for statistic, category, value in rows[['statistic', 'category', 'value']].itertuples(index=False):
+        if statistic == 'sample_response':
+            result.setdefault('sample_responses', []).append(value)
+        elif category is None or (isinstance(category, float) and np.isnan(category)):
+            result[statistic] = value
+        else:
+            key = {'count': 'counts', 'percentage': 'percentages'}.get(statistic, statistic)
+            result.setdefault(key, {})[category] = value
+    return result
+
+@pytest.mark.parametrize('question_id', QUESTIONS)
+def test_summary_matches_analyze_question(sq, answered, question_id):
+    analyzer = sq.ResponseAnalyzer(answered)
+    expected = analyzer.analyze_question(question_id)
+    actual = summary_as_results(analyzer.summarize(), question_id)
+    assert set(actual) == set(expected)
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            assert actual[key].keys() == value.keys(), key
+            assert np.allclose([actual[key][category] for category in value], list(value.values())), key
+        elif isinstance(value, list):
+            assert actual[key] == value, key
+        elif isinstance(value, str):
+            assert actual[key] == value, key
+        else:
+            assert actual[key] == pytest.approx(value), key
+
+def test_summary_covers_every_answered_question_type(sq, answered):
+    summary = sq.ResponseAnalyzer(answered).summarize()
+    types = dict(zip(summary['question_id'], summary['question_type']))
+    assert types == {question_id: answered.get_question(question_id).question_type for question_id in QUESTIONS}
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from survey_correlations import CorrelationEngine
+
+@pytest.fixture
+def likert_frame():
+    rng = np.random.default_rng(0)
+    latent = rng.multivariate_normal(np.zeros(4), 0.5 * np.eye(4) + 0.5, size=3000)
+    codes = np.clip(np.rint(latent * 1.5 + 4), 1, 7)
+    codes[rng.random(codes.shape) < 0.1] = np.nan
+    return pd.DataFrame(codes, columns=['a', 'b', 'c', 'd'])
+
+def test_pearson_matches_pandas(likert_frame):
+    engine = CorrelationEngine(list(likert_frame.columns), tile_size=2)
+    for chunk in np.array_split(likert_frame.to_numpy(), 7):
+        engine.update(chunk)
+    pd.testing.assert_frame_equal(engine.pearson(), likert_frame.corr(), check_exact=False, atol=1e-12)
+
+def test_spearman_matches_pandas(likert_frame):
+    engine = CorrelationEngine(list(likert_frame.columns), list(likert_frame.columns), (1, 7))
+    engine.update(likert_frame.to_numpy())
+    pd.testing.assert_frame_equal(engine.spearman(), likert_frame.corr('spearman'), check_exact=False, atol=1e-12)
+
+def test_polychoric_recovers_latent_correlation(likert_frame):
+    engine = CorrelationEngine(list(likert_frame.columns), list(likert_frame.columns), (1, 7))
+    engine.update(likert_frame.to_numpy())
+    rho = engine.polychoric().to_numpy()
+    assert np.allclose(np.diag(rho), 1)
+    assert np.allclose(rho, rho.T)
+    off_diagonal = rho[~np.eye(4, dtype=bool)]
+    assert np.all(np.abs(off_diagonal - 0.5) < 0.06)
+
+def test_memory_limit():
+    assert CorrelationEngine.memory_bytes(2500, 2500, 7) > CorrelationEngine.MAX_BYTES
+    with pytest.raises(ValueError, match='max_bytes'):
+        CorrelationEngine([f"q{i}" for i in range(1500)], [f"q{i}" for i in range(1500)], (1, 7))
+    CorrelationEngine([f"q{i}" for i in range(1000)], max_bytes=None)
+
+def test_calculate_correlations_uses_subset_engine(survey):
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        survey.collect_response({'P_Efficacy': int(rng.integers(1, 6)), 'Trust_Government': int(rng.integers(1, 6)),
+                                 'Political_Views': int(rng.integers(0, 8)), 'Year': 'Junior (3)'})
+    analyzer = survey.analyzer
+    result = analyzer.calculate_correlations(['P_Efficacy', 'Political_Views'])
+    expected = survey.to_dataframe()[['P_Efficacy', 'Political_Views']].corr()
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, atol=1e-12)
+
+    engine = survey.correlation_engine(['P_Efficacy', 'Political_Views'])
+    assert engine.item_ids == ['P_Efficacy', 'Political_Views']
+    assert engine in survey._listeners
+    spearman = analyzer.calculate_correlations(['P_Efficacy', 'Trust_Government'], 'spearman')
+    assert spearman.shape == (2, 2)
+    with pytest.raises(ValueError):
+        analyzer.calculate_correlations(['P_Efficacy', 'Political_Views'], 'polychoric')
+
+def test_engine_cache_is_bounded(sq, survey):
+    pairs = [['P_Efficacy', other] for other in ('ABC_News', 'Social_Media', 'Election_Outcome',
+                                                  'Political_Efficacy', 'Trust_Government')]
+    engines = [survey.correlation_engine(pair) for pair in pairs]
+    assert len(survey._correlation_engines) == sq.SurveyCollector.CORRELATION_ENGINES
+    assert engines[0] not in survey._listeners
+    assert survey.correlation_engine(pairs[-1]) is engines[-1]
@@ -0,0 +1,48 @@
+import csv
+import json
+
+import pytest
+
+COLUMNS = ['ResponseId', 'Age', 'Race', 'Household_Income', 'P_Efficacy', 'Disinfo_threat', 'Year', 'Feedback']
+
+ROWS = [
+    ['R_1', '21', 'White or Caucasian (1),Other (6)', '$25,000-$49,999 (2)', 'Strongly agree (5)',
+     '10 (Extreme risk)', '3', 'More parking, please'],
+    ['R_2', '22', '4,6', '2', '3', '0 (No risk)', 'Senior (4)', ''],
+    ['R_3', '23', 'Asian (4)', 'Less than $25,000 (1)', '4', '11', 'Junior (3)', 'ok'],
+    ['R_4', '24', '', '$25,000', 'Somewhat disagree (2)', '5', '', ''],
+]
+
+@pytest.fixture
+def export(tmp_path, survey):
+    """Qualtrics-style CSV: ids, then question texts, then ImportIds above the answers"""
+    path = tmp_path / 'export.csv'
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(COLUMNS)
+        writer.writerow(['Response ID'] + [survey.get_question(column).question_text for column in COLUMNS[1:]])
+        writer.writerow([json.dumps({'ImportId': f"QID{position}"}) for position in range(len(COLUMNS))])
+        writer.writerows(ROWS)
+    return path
+
+@pytest.mark.parametrize('chunksize', [2, 100])
+def test_import_qualtrics_csv(survey, export, chunksize):
+    report = survey.import_file(str(export), chunksize=chunksize)
+    assert report.header_rows_skipped == 2
+    assert report.unmapped_columns == ['ResponseId']
+    assert (report.rows_read, report.rows_imported, report.rows_rejected) == (4, 2, 2)
+    assert report.rejected_rows == [2, 3]
+    assert report.errors == {('Disinfo_threat', 'out of range'): 1, ('Household_Income', 'invalid option'): 1}
+    assert list(survey.responses) == [
+        {'Age': '21', 'Race': ['White or Caucasian (1)', 'Other (6)'], 'Household_Income': '$25,000-$49,999 (2)',
+         'P_Efficacy': 5, 'Disinfo_threat': 10, 'Year': 'Junior (3)', 'Feedback': 'More parking, please'},
+        {'Age': '22', 'Race': ['Asian (4)', 'Other (6)'], 'Household_Income': '$25,000-$49,999 (2)',
+         'P_Efficacy': 3, 'Disinfo_threat': 0, 'Year': 'Senior (4)'},
+    ]
+
+def test_import_without_validation_keeps_every_row(survey, export):
+    report = survey.import_file(str(export), validate=False)
+    assert (report.rows_imported, report.rows_rejected) == (4, 0)
+    assert survey.responses[2]['Race'] == ['Asian (4)']  # Race is multi-select even for one option
+    assert survey.responses[3]['Household_Income'] == '$25,000'
+    assert survey.process_responses()['Race']['Other (6)'] == 2
@@ -0,0 +1,76 @@
+import json
+import asyncio
+
+import pytest
+
+from load_test_ingest import ResponseGenerator
+from survey_ingest import IngestionService
+
+async def request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status_line, _, rest = (await reader.read()).partition(b'\r\n')
+    writer.close()
+    return int(status_line.split()[1]), json.loads(rest.partition(b'\r\n\r\n')[2])
+
+def run(survey, *requests):
+    """Start a service on an ephemeral port, send ``requests`` concurrently and return the replies"""
+    async def main():
+        service = IngestionService(survey, flush_interval=0.01)
+        server = await service.start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(*(request(port, *arguments) for arguments in requests))
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+@pytest.mark.parametrize('response, accepted', [
+    ({'Year': None, 'Political_Views': 3.0}, True),
+    ({'Political_Views': True}, False),
+    ({'Political_Views': '3'}, False),
+    ({'Year': 'Junior (3)', 'Race': ['Asian (4)', 'Other (6)']}, True),
+    ({'Year': 'Sophomore'}, False),
+    ({'Feedback': {'x': [1]}}, False),
+    ({'Feedback': ['a', 'b']}, False),
+    ({'No_Such_Question': 1}, False),
+])
+def test_single_response_follows_validate_response(survey, response, accepted):
+    (status, payload), = run(survey, ('POST', '/responses', response))
+    assert status == (201 if accepted else 422)
+    assert payload['accepted'] is accepted
+    assert survey.validate_response(response) is accepted or 'No_Such_Question' in response
+    assert len(survey.store) == int(accepted)
+
+def test_batch_reports_rejected_indexes(survey):
+    batch = [{'Political_Views': 4}, {'Political_Views': 99}, {'Feedback': 'Great survey'}]
+    (status, payload), = run(survey, ('POST', '/responses', batch))
+    assert status == 200
+    assert payload == {'accepted': 2, 'rejected': [{'index': 1, 'errors': {'Political_Views': ['out of range']}}]}
+    assert survey.responses[1] == {'Feedback': 'Great survey'}
+
+def test_failed_collect_answers_500_and_stores_nothing(survey, monkeypatch):
+    def fail(frame):
+        if 'Feedback' in frame.columns:
+            raise RuntimeError('disk full')
+        return collect_frame(frame)
+    collect_frame = survey.collect_frame
+    monkeypatch.setattr(survey, 'collect_frame', fail)
+    replies = run(survey, ('POST', '/responses', {'Political_Views': 4}),
+                  ('POST', '/responses', [{'Feedback': 'lost'}, {'Political_Views': 5}]))
+    assert sorted(status for status, _ in replies) == [201, 500]
+    assert 'error' in dict(replies)[500]
+    assert [row['Political_Views'] for row in survey.responses] == [4]
+
+def test_bad_requests(survey):
+    replies = run(survey, ('POST', '/responses', []), ('GET', '/responses'), ('GET', '/nowhere'))
+    assert [status for status, _ in replies] == [400, 405, 404]
+
+@pytest.mark.parametrize('invalid_rate', [0.0, 0.3])
+def test_load_test_responses_are_valid_unless_asked(survey, invalid_rate):
+    generator = ResponseGenerator(survey, invalid_rate, seed=1)
+    responses = [generator.response() for _ in range(2000)]
+    invalid = sum(bool(survey.validation_plan.check(response)) for response in responses) / len(responses)
+    assert invalid == pytest.approx(invalid_rate, abs=0.03)
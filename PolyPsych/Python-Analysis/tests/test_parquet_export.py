@@ -0,0 +1,29 @@
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+def test_multi_select_typed_from_definition(sq, survey, tmp_path):
+    path = tmp_path / 'responses.parquet'
+    with survey.stream_to_parquet(str(path), row_group_size=2) as writer:
+        survey.collect_response({'Race': 'Asian (4)', 'Year': 'Junior (3)'})
+        survey.collect_response({'Year': 'Senior (4)'})  # First row group written here
+        survey.collect_response({'Race': ['Asian (4)', 'Other (6)'], 'Political_Views': 3})
+    assert pa.types.is_list(writer.schema.field('Race').type)
+    df = sq.read_parquet_responses(str(path), columns=['Race', 'Year', 'Political_Views'])
+    assert [None if value is None else list(value) for value in df['Race']] == \
+        [['Asian (4)'], None, ['Asian (4)', 'Other (6)']]
+    assert df['Year'].tolist()[:2] == ['Junior (3)', 'Senior (4)']
+
+def test_column_type_change_is_conformed(sq, survey, tmp_path, caplog):
+    path = tmp_path / 'responses.parquet'
+    writer = survey.stream_to_parquet(str(path), row_group_size=1)
+    survey.collect_response({'Year': 'Junior (3)', 'Political_Views': 3})
+    survey.collect_response({'Year': ['Junior (3)', 'Senior (4)'], 'Political_Views': True})
+    survey.collect_response({'Year': 'Senior (4)', 'Political_Views': 'n/a'})
+    writer.close()
+    assert len(survey.store) == 3
+    df = sq.read_parquet_responses(str(path), columns=['Year', 'Political_Views'])
+    assert df['Year'].astype(object).tolist() == ['Junior (3)', 'Junior (3), Senior (4)', 'Senior (4)']
+    assert df['Political_Views'].tolist()[0] == 3.0
+    assert df['Political_Views'].isna().tolist() == [False, True, True]
+    assert 'no longer fit' in caplog.text
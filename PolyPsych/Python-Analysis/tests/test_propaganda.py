@@ -0,0 +1,65 @@
+import json
+import time
+import random
+import logging
+
+import pytest
+
+from propaganda import StageProfiler, TextPreprocessor, configure_logging, logger
+from benchmark_propaganda import STUB_STOP_WORDS, SuffixLemmatizer
+
+@pytest.fixture
+def preprocessor():
+    return TextPreprocessor(stop_words=STUB_STOP_WORDS, lemmatizer=SuffixLemmatizer())
+
+def test_batch_matches_single(preprocessor):
+    texts = ["Fake news spreads on Social Media!", "", "Check www.example.org first", "100% true"]
+    assert preprocessor.preprocess_batch(texts) == [preprocessor.preprocess(text) for text in texts]
+
+@pytest.mark.parametrize('texts', [["a\n1\x1e", "b"], ["one\n\x1etwo", "three"], ["x\n", "\x1ey"]])
+def test_batch_separator_in_text(preprocessor, texts):
+    assert preprocessor.tokenize_batch(texts) == [preprocessor.clean_text(text).split() for text in texts]
+
+def test_batch_fuzz_stays_aligned(preprocessor):
+    rng = random.Random(1)
+    alphabet = 'ab 1\n\x1e.,http:/wX'
+    for _ in range(2000):
+        texts = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(1, 5))]
+        assert preprocessor.preprocess_batch(texts) == [preprocessor.preprocess(text) for text in texts]
+
+def test_logging_through_queue_writes_sampled_json_lines(tmp_path):
+    log_file = tmp_path / 'processing.log'
+    listener = configure_logging(str(log_file), level=logging.DEBUG, debug_sample_rate=5)
+    try:
+        for number in range(100):
+            logger.debug("Coded response %d", number, extra={'fields': {'response': number}})
+        for number in range(3):
+            logger.info("Stage %s done", number)
+        logger.warning("Skipped a row", extra={'fields': {'row': 7, 'reason': 'empty'}})
+    finally:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        logger.handlers.clear()
+
+    entries = [json.loads(line) for line in log_file.read_text(encoding='utf-8').splitlines()]
+    debug = [entry for entry in entries if entry['level'] == 'DEBUG']
+    assert [entry['response'] for entry in debug] == list(range(0, 100, 5))
+    assert debug[1]['message'] == 'Coded response 5'
+    assert [entry['message'] for entry in entries if entry['level'] == 'INFO'] == [f"Stage {number} done" for number in range(3)]
+    assert entries[-1] == {**entries[-1], 'level': 'WARNING', 'logger': 'propaganda', 'row': 7, 'reason': 'empty'}
+    assert all({'time', 'level', 'logger', 'message'} <= entry.keys() for entry in entries)
+
+def test_stage_times_are_per_response():
+    profiler = StageProfiler()
+    with profiler.stage('read_responses', lambda: len(responses)):
+        responses = ['a'] * 40
+    with profiler.stage('plotting', len(responses)):
+        time.sleep(0.01)
+    for response in responses:
+        profiler.call('count_steps', len, response)
+    breakdown = profiler.breakdown()
+    assert breakdown['responses'].to_dict() == {'plotting': 40, 'read_responses': 40, 'count_steps': 40}
+    plotting = breakdown.loc['plotting']
+    assert plotting['mean_us'] == pytest.approx(plotting['total_s'] * 1e6 / 40)
+    assert breakdown['p50_us'].notna().to_dict() == {'plotting': False, 'read_responses': False, 'count_steps': True}
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+def test_none_answer_is_missing(survey, sq):
+    survey.collect_response({'Year': 'Junior (3)', 'Political_Views': 4, 'Race': ['Asian (4)']})
+    survey.collect_response({'Year': None, 'Political_Views': None, 'Race': None, 'Feedback': None})
+    columns = survey.store.columns
+    assert isinstance(columns['Year'], sq.CategoricalColumn)
+    assert isinstance(columns['Political_Views'], sq.NumericColumn)
+    assert isinstance(columns['Race'], sq.MultiSelectColumn)
+    assert 'Feedback' not in columns
+    assert columns['Year'].categories.count(None) == 0
+    assert columns['Year'].version == 1
+
+    df = survey.to_dataframe()
+    assert df['Year'].isna().tolist() == [False, True]
+    assert df['Political_Views'].isna().tolist() == [False, True]
+    assert survey.responses[1] == {}
+    assert survey.process_responses()['Year'] == {'Junior (3)': 1}
+
+def test_first_answer_none_then_answered(survey):
+    survey.collect_response({'Year': None})
+    survey.collect_response({'Year': 'Senior (4)'})
+    assert survey.to_dataframe()['Year'].tolist()[1] == 'Senior (4)'
+    assert pd.isna(survey.to_dataframe()['Year'].tolist()[0])
+
+def test_unmentioned_columns_are_padded(survey):
+    survey.collect_response({'Year': 'Junior (3)', 'Age': '20'})
+    survey.collect_response({'Year': 'Senior (4)', 'Feedback': None})
+    assert all(column.length == 2 for column in survey.store.columns.values())
+    assert survey.responses[1] == {'Year': 'Senior (4)'}
+
+def test_row_round_trip(survey):
+    responses = [
+        {'Age': '21', 'Year': 'Junior (3)', 'Race': ['White or Caucasian (1)', 'Asian (4)'], 'Political_Views': 3},
+        {'Age': '35', 'Race': 'Other (6)', 'P_Efficacy': 5},
+        {'Year': 'First Year (1)', 'Political_Views': 0, 'Feedback': 'Thanks'},
+    ]
+    for response in responses:
+        survey.collect_response(response)
+    expected = [dict(response) for response in responses]
+    expected[1]['Race'] = ['Other (6)']  # A single option is stored as a one-option selection
+    assert list(survey.responses) == expected
+
+def test_promotion_keeps_answers(survey, sq):
+    survey.collect_response({'Political_Views': 3})
+    survey.collect_response({'Political_Views': True})
+    survey.collect_response({'Political_Views': 'n/a'})
+    assert isinstance(survey.store.columns['Political_Views'], sq.ObjectColumn)
+    assert [row['Political_Views'] for row in survey.responses] == [3, True, 'n/a']
+
+def test_categorical_promotes_to_multi_select(survey, sq):
+    survey.collect_response({'Race': 'Asian (4)'})
+    survey.collect_response({'Race': ['Asian (4)', 'Other (6)']})
+    assert isinstance(survey.store.columns['Race'], sq.MultiSelectColumn)
+    assert [row['Race'] for row in survey.responses] == [['Asian (4)'], ['Asian (4)', 'Other (6)']]
+
+def test_collect_frame_matches_collect_response(sq):
+    frame = pd.DataFrame({
+        'Year': pd.Categorical(['Junior (3)', None, 'Senior (4)']),
+        'Political_Views': [1.0, np.nan, 7.0],
+        'Feedback': pd.array(['ok', None, 'fine'], dtype='string'),
+    })
+    bulk = sq.load_survey_definition(use_cache=False)
+    bulk.collect_frame(frame)
+    single = sq.load_survey_definition(use_cache=False)
+    for row in frame.astype(object).to_dict('records'):
+        single.collect_response({key: None if pd.isna(value) else value for key, value in row.items()})
+    assert list(bulk.responses) == list(single.responses)
+    assert bulk.process_responses() == single.process_responses()
+
+def test_dataframe_views_share_store_buffers(survey):
+    survey.collect_frame(pd.DataFrame({
+        'Feedback': ['a', 'b', None],
+        'Political_Views': [1.0, 2.0, 3.0],
+        'Year': pd.Categorical(['Junior (3)', 'Senior (4)', None]),
+    }))
+    df = survey.analyzer.create_dataframe()
+    columns = survey.store.columns
+    assert df['Feedback'].dtype == object
+    assert np.shares_memory(df['Feedback'].to_numpy(), columns['Feedback']._data)
+    assert np.shares_memory(df['Political_Views'].to_numpy(), columns['Political_Views']._data)
+    assert np.shares_memory(df['Year'].array.codes, columns['Year']._data)
+
+def test_failed_collect_frame_changes_nothing(survey):
+    survey.collect_frame(pd.DataFrame({'Political_Views': [3.0, 4.0], 'Feedback': ['ok', None]}))
+    before = (survey.version, survey.to_dataframe().copy(), survey.process_responses())
+    bad = pd.DataFrame({'Political_Views': [5.5, 6.0], 'Year': ['Junior (3)', None], 'Feedback': ['fine', {'not': 'hashable'}]})
+    with pytest.raises(TypeError):
+        survey.collect_frame(bad)
+    assert survey.version == before[0]
+    pd.testing.assert_frame_equal(survey.to_dataframe(), before[1])
+    assert survey.process_responses() == before[2]
+    assert survey.responses[1] == {'Political_Views': 4}
+
+def test_store_extend_rolls_back(survey, sq, monkeypatch):
+    survey.collect_response({'Political_Views': 3, 'Feedback': 'ok'})
+    store = survey.store
+    def fail(column, answers):
+        raise MemoryError
+    monkeypatch.setattr(sq.ObjectColumn, 'extend', fail)
+    with pytest.raises(MemoryError):
+        store.extend(pd.DataFrame({'Political_Views': [4.5], 'Age': ['20'], 'Feedback': ['late']}))
+    assert len(store) == 1 and set(store.columns) == {'Political_Views', 'Feedback'}
+    assert all(column.length == 1 and column.version == 1 for column in store.columns.values())
+    assert store.columns['Political_Views'].integral
+    assert store.row(0) == {'Political_Views': 3, 'Feedback': 'ok'}
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from survey_segments import NO_ANSWER, NumericBinner, SegmentationCube
+
+DIMENSIONS = ['Year', 'Household_Income']
+MEASURES = ['Political_Views', 'P_Efficacy']
+
+def collect(survey, count, seed):
+    """Random valid answers, each question skipped by some respondents"""
+    rng = np.random.default_rng(seed)
+    years = survey.get_question('Year').options
+    incomes = survey.get_question('Household_Income').options
+    for _ in range(count):
+        response = {'Year': years[rng.integers(len(years))], 'Household_Income': incomes[rng.integers(len(incomes))],
+                    'Political_Views': int(rng.integers(0, 8)), 'P_Efficacy': int(rng.integers(1, 6)),
+                    'Age': str(rng.integers(17, 40))}
+        survey.collect_response({question_id: answer for question_id, answer in response.items() if rng.random() > 0.1})
+
+def segments(frame, dimension):
+    return frame[dimension].astype(object).where(frame[dimension].notna(), NO_ANSWER).rename(dimension)
+
+def expected_groupby(survey, dimensions):
+    frame = survey.to_dataframe()
+    grouped = frame.groupby([segments(frame, dimension) for dimension in dimensions])
+    expected = grouped.size().rename('count').to_frame()
+    for measure in MEASURES:
+        expected[f"{measure}_mean"] = grouped[measure].mean()
+        expected[f"{measure}_std"] = grouped[measure].std()
+        expected[f"{measure}_n"] = grouped[measure].count()
+    return expected
+
+def assert_matches_pandas(cube, survey):
+    for dimensions in (['Year'], ['Household_Income'], DIMENSIONS):
+        actual = cube.groupby(dimensions)
+        expected = expected_groupby(survey, dimensions)
+        assert sorted(actual.index) == sorted(expected.index)
+        expected = expected.reindex(actual.index)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_names=False)
+    frame = survey.to_dataframe()
+    expected = pd.crosstab(segments(frame, 'Year'), segments(frame, 'Household_Income'), normalize='index') * 100
+    actual = cube.crosstab('Year', 'Household_Income', normalize='index')
+    pd.testing.assert_frame_equal(actual, expected.loc[actual.index, actual.columns], check_names=False)
+
+@pytest.fixture
+def cube(survey):
+    collect(survey, 500, seed=0)
+    return survey.segmentation_cube(DIMENSIONS, MEASURES, batch_size=64)
+
+def test_matches_pandas(cube, survey):
+    assert cube.groupby()['count'].iloc[0] == 500
+    assert_matches_pandas(cube, survey)
+
+def test_stays_correct_as_responses_arrive(cube, survey):
+    assert_matches_pandas(cube, survey)
+    collect(survey, 300, seed=1)  # Some batches are pulled on collect, the rest on the next query
+    years = survey.get_question('Year').options
+    survey.collect_frame(pd.DataFrame({'Year': [years[0], None], 'Political_Views': [7.0, 2.0]}))
+    assert cube.groupby()['count'].iloc[0] == 802
+    assert_matches_pandas(cube, survey)
+
+def test_mean_crosstab_and_filters(cube, survey):
+    frame = survey.to_dataframe()
+    expected = pd.crosstab(segments(frame, 'Year'), segments(frame, 'Household_Income'),
+                           values=frame['Political_Views'], aggfunc='mean')
+    actual = cube.crosstab('Year', 'Household_Income', measure='Political_Views', stat='mean')
+    pd.testing.assert_frame_equal(actual, expected.loc[actual.index, actual.columns], check_names=False)
+
+    junior = frame[frame['Year'] == 'Junior (3)']
+    filtered = cube.groupby(['Household_Income'], filters={'Year': 'Junior (3)'})
+    assert filtered['count'].sum() == len(junior)
+    assert filtered['P_Efficacy_n'].sum() == junior['P_Efficacy'].count()
+
+def test_numeric_binner_matches_cut(survey):
+    collect(survey, 400, seed=2)
+    binner = NumericBinner([0, 21, 25, float('inf')])
+    cube = SegmentationCube({'Age': binner}, ['Political_Views']).attach(survey)
+    frame = survey.to_dataframe()
+    ages = pd.cut(pd.to_numeric(frame['Age']), [0, 21, 25, float('inf')], right=False, labels=binner.labels)
+    expected = ages.astype(object).where(ages.notna(), NO_ANSWER).value_counts()
+    assert cube.groupby(['Age'])['count'].to_dict() == expected.to_dict()
+    assert binner.labels == ['0-20', '21-24', '25+']
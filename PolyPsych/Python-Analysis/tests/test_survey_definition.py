@@ -0,0 +1,55 @@
+import os
+import json
+import shutil
+
+import pytest
+
+@pytest.fixture
+def definition(sq, tmp_path):
+    path = tmp_path / 'survey_definition.json'
+    shutil.copyfile(sq.SURVEY_DEFINITION, path)
+    return path
+
+def cache_files(path):
+    return sorted((path.parent / '__pycache__').glob(f"{path.stem}.*.pickle"))
+
+def no_parsing(spec):
+    raise AssertionError("The definition was parsed instead of read from the cache")
+
+def test_cache_hit_skips_parsing(sq, definition, monkeypatch):
+    survey = sq.load_survey_definition(definition)
+    assert len(cache_files(definition)) == 1
+    monkeypatch.setattr(sq, 'build_survey', no_parsing)
+    cached = sq.load_survey_definition(definition)
+    assert [question.question_id for question in cached.iter_questions()] == \
+           [question.question_id for question in survey.iter_questions()]
+    assert cached.validation_plan.ranges == survey.validation_plan.ranges
+    assert cached.validate_response({'Political_Views': 7}) and not cached.validate_response({'Political_Views': 8})
+
+def test_touching_the_file_keeps_the_cache(sq, definition, monkeypatch):
+    sq.load_survey_definition(definition)
+    stat = definition.stat()
+    os.utime(definition, (stat.st_atime + 60, stat.st_mtime + 60))
+    monkeypatch.setattr(sq, 'build_survey', no_parsing)
+    sq.load_survey_definition(definition)
+
+def test_changed_content_is_reloaded(sq, definition):
+    sq.load_survey_definition(definition)
+    spec = json.loads(definition.read_text(encoding='utf-8'))
+    spec['title'] = 'Edited Survey'
+    definition.write_text(json.dumps(spec), encoding='utf-8')
+    survey = sq.load_survey_definition(definition)
+    assert survey.title == 'Edited Survey'
+    assert len(cache_files(definition)) == 2
+    assert sq.load_survey_definition(definition).title == 'Edited Survey'
+
+def test_unreadable_cache_is_rebuilt(sq, definition):
+    sq.load_survey_definition(definition)
+    cache, = cache_files(definition)
+    cache.write_bytes(b'not a pickle')
+    assert sq.load_survey_definition(definition).survey_id == sq.load_survey_definition(definition, use_cache=False).survey_id
+    assert cache.read_bytes() != b'not a pickle'
+
+def test_use_cache_false_writes_nothing(sq, definition):
+    sq.load_survey_definition(definition, use_cache=False)
+    assert cache_files(definition) == []
@@ -0,0 +1,48 @@
+from survey_text_index import TextResponseIndex
+
+ANSWERS = [
+    'More parking near the library please',
+    'more parking  near the LIBRARY please',
+    'More parking near the library, please!',
+    'The dining hall food is too expensive',
+    None,
+    '   ',
+]
+
+def test_dedupe_and_search():
+    index = TextResponseIndex()
+    index.add_many(ANSWERS)
+    assert index.rows_seen == len(ANSWERS)
+    assert index.responses == 4
+    assert len(index.texts) == 3  # The first two differ only in case and spacing
+    found = index.search('parking library')
+    assert list(found['responses']) == [2, 1]
+    assert index.search('parking food').empty
+    assert len(index.search('parking food', match='any')) == 3
+    assert index.top_ngrams(2, limit=1).iloc[0].tolist() == ['parking near', 3]
+
+def test_near_duplicates_cluster():
+    index = TextResponseIndex()
+    index.add_many(ANSWERS)
+    clusters = index.clusters()
+    assert set(clusters['text']) == {ANSWERS[0], ANSWERS[2]}
+    assert clusters['cluster'].nunique() == 1
+
+def test_collector_index_follows_responses(survey):
+    index = survey.text_index('Feedback')
+    assert survey.text_index('Feedback') is index
+    for answer in ANSWERS:
+        survey.collect_response({'Feedback': answer})
+    assert index.summary()['unique_responses'] == 3
+    index.detach()
+    survey.collect_response({'Feedback': 'Extend the library hours'})
+    assert index.search('hours').empty
+
+def test_analysis_does_not_build_an_index(sq, survey):
+    for answer in ANSWERS:
+        survey.collect_response({'Feedback': answer})
+    analyzer = sq.ResponseAnalyzer(survey)
+    result = analyzer.analyze_question('Feedback')
+    assert result['response_count'] == 5  # The cheap summary counts the blank answer
+    assert analyzer.analyze_text_responses('Feedback') == result
+    assert not survey._text_indexes and not survey._listeners
@@ -0,0 +1,92 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ANSWERS = [None, float('nan'), pd.NA, 0, 1, 3, 5, 7, 9, 11, -1, 3.0, 3.5, True, '3', '', '  ', 'text',
+           ['Asian (4)'], ['Asian (4)', 'nope'], {'x': [1]}, [1], 'Junior (3)', 'Asian (4)',
+           np.int64(4), np.float64(2.0), float('inf')]
+QUESTIONS = ['Year', 'Race', 'Political_Views', 'P_Efficacy', 'Disinfo_threat', 'Feedback', 'Age']
+
+@pytest.fixture
+def plan(survey):
+    return survey.validation_plan
+
+def test_ranges_come_from_option_codes(plan):
+    assert plan.ranges['P_Efficacy'] == (1, 5)
+    assert plan.ranges['Social_Media'] == (1, 7)
+    assert plan.ranges['Disinfo_threat'] == (0, 10)
+
+@pytest.mark.parametrize('response, expected', [
+    ({'P_Efficacy': 5}, {}),
+    ({'P_Efficacy': 9}, {'P_Efficacy': 8}),
+    ({'P_Efficacy': 0}, {'P_Efficacy': 8}),
+    ({'P_Efficacy': 4.0}, {}),
+    ({'P_Efficacy': 4.5}, {'P_Efficacy': 4}),
+    ({'P_Efficacy': True}, {'P_Efficacy': 4}),
+    ({'P_Efficacy': '4'}, {'P_Efficacy': 4}),
+    ({'Year': None, 'P_Efficacy': float('nan')}, {}),
+    ({'Year': 'Junior (3)', 'Race': ['Asian (4)', 'Other (6)']}, {}),
+    ({'Year': 'Junior'}, {'Year': 1}),
+    ({'Race': ['Asian (4)', 'nope']}, {'Race': 1}),
+    ({'Feedback': ''}, {'Feedback': 2}),
+    ({'Feedback': {'x': [1]}}, {'Feedback': 32}),
+    ({'Feedback': ['a']}, {'Feedback': 32}),
+    ({'Age': 21}, {}),
+    ({'Unknown': object()}, {}),
+])
+def test_check(plan, response, expected):
+    assert plan.check(response) == expected
+
+def test_required(sq, survey):
+    survey.get_question('Year').required = True
+    plan = sq.ValidationPlan(survey.iter_questions())
+    assert plan.check({'Year': None}) == {'Year': plan.MISSING_REQUIRED}
+    assert plan.check({}) == {'Year': plan.MISSING_REQUIRED}
+    assert plan.validate_batch([{'Year': None}, {'Year': 'Junior (3)'}, {}]).tolist() == [16, 0, 16]
+
+def test_describe(sq):
+    assert sq.ValidationPlan.describe(1 | 8) == ['invalid option', 'out of range']
+
+def test_batch_matches_single(plan):
+    rng = random.Random(0)
+    rows = [{question: rng.choice(ANSWERS) for question in QUESTIONS if rng.random() < 0.8} for _ in range(3000)]
+    single = [plan.validate(row) for row in rows]
+    assert plan.validate_batch(rows).tolist() == single
+    assert plan.validate_batch(pd.DataFrame(rows, dtype=object)).tolist() == single
+
+def test_batch_typed_columns_match_single(plan):
+    rows = [
+        {'Year': 'Junior (3)', 'P_Efficacy': 4.0, 'Feedback': 'good'},
+        {'Year': 'Junior', 'P_Efficacy': 4.5, 'Feedback': ' '},
+        {'Year': None, 'P_Efficacy': 9.0, 'Feedback': None},
+        {'Year': 'Senior (4)', 'P_Efficacy': np.nan, 'Feedback': ''},
+    ]
+    frame = pd.DataFrame({
+        'Year': pd.Categorical([row['Year'] for row in rows]),
+        'P_Efficacy': np.array([row['P_Efficacy'] for row in rows], dtype=np.float64),
+        'Feedback': pd.array([row['Feedback'] for row in rows], dtype='string'),
+    })
+    assert plan.validate_batch(frame).tolist() == [plan.validate(row) for row in rows] == [0, 1 | 2 | 4, 8, 2]
+
+def test_collector_validate_response(survey):
+    assert survey.validate_response({'Year': 'Junior (3)', 'P_Efficacy': 3})
+    assert not survey.validate_response({'P_Efficacy': 9})
+
+def test_question_validate_response_matches_plan(survey, plan):
+    for question_id in QUESTIONS:
+        question = survey.get_question(question_id)
+        for answer in ANSWERS:
+            expected = plan.check({question_id: answer}).get(question_id, 0)
+            if expected:
+                with pytest.raises(ValueError, match=plan.describe(expected)[0]):
+                    question.validate_response(answer)
+            else:
+                assert question.validate_response(answer)
+
+def test_question_validate_response_uses_option_range(survey):
+    question = survey.get_question('Political_Views')
+    assert question.validate_response(7)
+    with pytest.raises(ValueError, match='between 0 and 7'):
+        question.validate_response(9)